@@ -8,7 +8,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 from utils.decorators import role_required
-from utils.helpers import success_response, error_response
+from utils.helpers import success_response, error_response, ref_id
 from models.challenge import (
     Challenge, ChallengedQuestion, ChallengeResolution, ScoreChange
 )
@@ -16,6 +16,7 @@ from models.evaluation import Evaluation
 from models.exam import Exam
 from models.answer_sheet import AnswerSheet
 from models.user import User
+from services.statistics_service import StatisticsService, counted_score
 
 
 challenge_bp = Blueprint('challenges', __name__, url_prefix='/challenges')
@@ -126,7 +127,7 @@ def submit_challenge():
         try:
             from services.notification_service import notify_challenge_received
             student = User.objects(id=student_id).first()
-            teacher = User.objects(id=exam.teacher_id.id).first() if exam else None
+            teacher = User.objects(id=ref_id(exam, 'teacher_id')).first() if exam else None
             if teacher and student:
                 notify_challenge_received(
                     teacher_email=teacher.email,
@@ -193,7 +194,7 @@ def list_challenges():
 
             # Enrich with exam and student info
             try:
-                exam = Exam.objects(id=ch.exam_id.id).first()
+                exam = Exam.objects(id=ref_id(ch, 'exam_id')).first()
                 if exam:
                     ch_data['exam_title'] = exam.title
                     ch_data['exam_subject'] = exam.subject
@@ -201,7 +202,7 @@ def list_challenges():
                 pass
 
             try:
-                student = User.objects(id=ch.student_id.id).first()
+                student = User.objects(id=ref_id(ch, 'student_id')).first()
                 if student:
                     ch_data['student_name'] = student.profile.get('name', '')
                     ch_data['student_roll'] = student.profile.get('roll_number', '')
@@ -233,18 +234,18 @@ def get_challenge(challenge_id):
 
         # Verify access: student owns it, or teacher owns the exam
         user = User.objects(id=user_id).first()
-        if user.role == 'student' and str(challenge.student_id.id) != user_id:
+        if user.role == 'student' and str(ref_id(challenge, 'student_id')) != user_id:
             return error_response("Access denied", 403)
         elif user.role == 'teacher':
-            exam = Exam.objects(id=challenge.exam_id.id).first()
-            if not exam or str(exam.teacher_id.id) != user_id:
+            exam = Exam.objects(id=ref_id(challenge, 'exam_id')).first()
+            if not exam or str(ref_id(exam, 'teacher_id')) != user_id:
                 return error_response("Access denied", 403)
 
         ch_data = challenge.to_dict()
 
         # Enrich with evaluation details for teacher review
         try:
-            evaluation = Evaluation.objects(id=challenge.evaluation_id.id).first()
+            evaluation = Evaluation.objects(id=ref_id(challenge, 'evaluation_id')).first()
             if evaluation:
                 for cq in ch_data.get('challenged_questions', []):
                     for qe in (evaluation.question_evaluations or []):
@@ -283,8 +284,8 @@ def resolve_challenge(challenge_id):
             return error_response("Challenge not found", 404)
 
         # Verify teacher owns the exam
-        exam = Exam.objects(id=challenge.exam_id.id).first()
-        if not exam or str(exam.teacher_id.id) != teacher_id:
+        exam = Exam.objects(id=ref_id(challenge, 'exam_id')).first()
+        if not exam or str(ref_id(exam, 'teacher_id')) != teacher_id:
             return error_response("Access denied", 403)
 
         if challenge.status in ('accepted', 'rejected'):
@@ -304,7 +305,7 @@ def resolve_challenge(challenge_id):
         score_change_list = []
         if decision == 'accepted':
             raw_changes = data.get('score_changes', [])
-            evaluation = Evaluation.objects(id=challenge.evaluation_id.id).first()
+            evaluation = Evaluation.objects(id=ref_id(challenge, 'evaluation_id')).first()
             if not evaluation:
                 return error_response("Evaluation not found", 404)
 
@@ -351,6 +352,7 @@ def resolve_challenge(challenge_id):
                 ))
 
             # Recalculate totals
+            previous_score = counted_score(evaluation)
             total_awarded = sum(
                 qe.marks_awarded for qe in evaluation.question_evaluations
             )
@@ -361,6 +363,7 @@ def resolve_challenge(challenge_id):
             )
             evaluation.status = 'overridden'
             evaluation.save()
+            StatisticsService.record_score(exam.id, previous_score, counted_score(evaluation))
 
         # Create resolution
         teacher = User.objects(id=teacher_id).first()
@@ -377,7 +380,7 @@ def resolve_challenge(challenge_id):
         # Notify student of resolution
         try:
             from services.notification_service import notify_challenge_resolved
-            student = User.objects(id=challenge.student_id.id).first()
+            student = User.objects(id=ref_id(challenge, 'student_id')).first()
             if student:
                 sc_dicts = [
                     {'question_number': sc.question_number,
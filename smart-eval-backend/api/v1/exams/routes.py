@@ -3,6 +3,7 @@ Exam API Routes
 
 RESTful endpoints for exam management
 """
+from datetime import datetime
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import ValidationError as MarshmallowValidationError
@@ -11,6 +12,7 @@ from services.exam_service import ExamService
 from services.storage_service import StorageService
 from services.ocr_service import OCRService
 from services.llm_service import LLMService
+from services.statistics_service import StatisticsService
 from api.v1.exams.schemas import (
     CreateExamSchema,
     UpdateExamSchema,
@@ -18,7 +20,7 @@ from api.v1.exams.schemas import (
     UpdateStatusSchema
 )
 from utils.decorators import role_required
-from utils.helpers import success_response, error_response
+from utils.helpers import success_response, error_response, ref_id
 from utils.exceptions import ValidationError, NotFoundError, ForbiddenError
 from models.exam import QuestionPaper, ModelAnswer, ParsedAnswer, GradingConfig
 from models.answer_sheet import AnswerSheet as AnswerSheetDoc, OriginalFile
@@ -512,6 +514,7 @@ def save_parsed_model_answers(exam_id):
 
         exam.model_answer.parsed_answers = parsed_list
         exam.save()
+        LLMService.invalidate_cache(exam.id)
 
         return success_response(
             data={'exam': exam.to_dict()},
@@ -536,7 +539,8 @@ def update_grading_config(exam_id):
     Update grading configuration for an exam.
 
     PUT /api/v1/exams/:exam_id/grading-config
-    Body: { strictness: 'lenient'|'moderate'|'strict', keyword_mode: 'exact'|'synonyms' }
+    Body: { strictness: 'lenient'|'moderate'|'strict', keyword_mode: 'exact'|'synonyms',
+            grading_mode: 'per_question'|'batched' }
     """
     try:
         current_user_id = get_jwt_identity()
@@ -561,11 +565,18 @@ def update_grading_config(exam_id):
                 return error_response("keyword_mode must be 'exact' or 'synonyms'", 400)
             exam.grading_config.keyword_mode = keyword_mode
 
+        grading_mode = data.get('grading_mode')
+        if grading_mode:
+            if grading_mode not in ('per_question', 'batched'):
+                return error_response("grading_mode must be 'per_question' or 'batched'", 400)
+            exam.grading_config.grading_mode = grading_mode
+
         holistic_params = data.get('holistic_params')
         if holistic_params is not None:
             exam.grading_config.holistic_params = holistic_params
 
         exam.save()
+        LLMService.invalidate_cache(exam.id)
 
         return success_response(
             data={'exam': exam.to_dict()},
@@ -660,44 +671,17 @@ def publish_preview(exam_id):
     Returns summary: total sheets, graded count, score distribution, etc.
     """
     try:
-        from models.evaluation import Evaluation
-
         current_user_id = get_jwt_identity()
         exam = ExamService.get_exam_by_id(exam_id, teacher_id=current_user_id)
 
         sheets = AnswerSheetDoc.objects(exam_id=exam.id)
         total_sheets = sheets.count()
+        # Sheets still assigned to the teacher haven't been matched to a student
+        assigned_students = sheets.filter(student_id__ne=ref_id(exam, 'teacher_id')).count()
 
-        evaluations = Evaluation.objects(exam_id=exam.id, status__in=['completed', 'overridden'])
-        graded_count = evaluations.count()
-
-        # Score distribution
-        scores = []
-        assigned_students = 0
-        for ev in evaluations:
-            scores.append(ev.percentage)
-
-        for s in sheets:
-            if s.student_id and str(s.student_id.id) != str(exam.teacher_id.id):
-                assigned_students += 1
-
-        avg_score = sum(scores) / len(scores) if scores else 0
-        max_score = max(scores) if scores else 0
-        min_score = min(scores) if scores else 0
-
-        # Distribution buckets
-        dist = {'90_100': 0, '75_89': 0, '50_74': 0, '33_49': 0, 'below_33': 0}
-        for pct in scores:
-            if pct >= 90:
-                dist['90_100'] += 1
-            elif pct >= 75:
-                dist['75_89'] += 1
-            elif pct >= 50:
-                dist['50_74'] += 1
-            elif pct >= 33:
-                dist['33_49'] += 1
-            else:
-                dist['below_33'] += 1
+        # Count, mean, min/max and distribution in one aggregation
+        summary = StatisticsService.score_summary(exam.id)
+        graded_count = summary['count']
 
         return success_response(data={
             'exam_id': str(exam.id),
@@ -708,10 +692,11 @@ def publish_preview(exam_id):
             'ungraded_count': total_sheets - graded_count,
             'assigned_students': assigned_students,
             'unassigned_sheets': total_sheets - assigned_students,
-            'average_score': round(avg_score, 1),
-            'highest_score': round(max_score, 1),
-            'lowest_score': round(min_score, 1),
-            'distribution': dist,
+            'average_score': round(summary['mean'], 1),
+            'highest_score': round(summary['max'], 1),
+            'lowest_score': round(summary['min'], 1),
+            'percentiles': summary['percentiles'],
+            'distribution': summary['distribution'],
             'ready_to_publish': graded_count > 0 and assigned_students > 0,
         })
 
@@ -753,8 +738,8 @@ def publish_results(exam_id):
             sheets = AnswerSheetDoc.objects(exam_id=exam.id)
             student_ids = set()
             for s in sheets:
-                if s.student_id and str(s.student_id.id) != str(exam.teacher_id.id):
-                    student_ids.add(s.student_id.id)
+                if s.student_id and str(ref_id(s, 'student_id')) != str(ref_id(exam, 'teacher_id')):
+                    student_ids.add(ref_id(s, 'student_id'))
             if student_ids:
                 students = User.objects(id__in=list(student_ids)).only('email')
                 emails = [st.email for st in students if st.email]
@@ -883,16 +868,17 @@ def bulk_assign_sheets(exam_id):
                 f"No student found with email {data['student_email']}", 404
             )
 
-        sheets = AnswerSheetDoc.objects(exam_id=exam.id)
-        count = 0
-        for sheet in sheets:
-            sheet.student_id = student
-            sheet.save()
-            count += 1
+        result = AnswerSheetDoc.objects(exam_id=exam.id).update(
+            set__student_id=student,
+            set__updated_at=datetime.utcnow(),
+            full_result=True
+        )
+        count = result.matched_count
 
         return jsonify(success_response(
             data={
                 'assigned_count': count,
+                'modified_count': result.modified_count,
                 'student_email': student.email,
                 'student_name': student.profile.get('name', ''),
             },
@@ -7,20 +7,153 @@ Endpoints for triggering OCR processing, LLM grading, and retrieving results.
 from flask import Blueprint, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
+import json
 import threading
 
 from services.exam_service import ExamService
 from services.grading_service import GradingService
-from models.answer_sheet import AnswerSheet
+from services.grading_run_service import GradingRunService
+from services.statistics_service import StatisticsService, counted_score
+from models.answer_sheet import AnswerSheet, ProcessingLog
 from models.exam import Exam
 from models.evaluation import Evaluation
+from models.grading_run import GradingRun
 from utils.decorators import role_required
-from utils.helpers import success_response, error_response
-from utils.exceptions import NotFoundError, ForbiddenError, ValidationError
+from utils.helpers import (
+    success_response, error_response, ref_id, paginate_newest_first, parse_fields
+)
+from utils.exceptions import (
+    NotFoundError, ForbiddenError, ValidationError, ConflictError, AuthenticationError
+)
 
 
 grading_bp = Blueprint('grading', __name__, url_prefix='/grading')
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Selectable via ?fields= on the listing endpoints
+SHEET_LIST_FIELDS = (
+    'id', 'exam_id', 'student_id', 'status', 'original_file', 'created_at', 'updated_at',
+    'processing_log', 'score', 'marks_awarded', 'max_marks', 'ocr_results',
+)
+EVALUATION_LIST_FIELDS = (
+    'id', 'answer_sheet_id', 'exam_id', 'total_marks_awarded', 'total_max_marks', 'percentage',
+    'overall_feedback', 'overall_confidence', 'strictness', 'status', 'graded_at', 'created_at',
+    'updated_at', 'question_evaluations',
+)
+
+
+def _listing_params(allowed_fields):
+    """
+    Parse the paging/projection query parameters shared by listing endpoints.
+
+    ?limit=N&cursor=... pages newest-first (cursor from the previous page's
+    meta.next_cursor); without either, the full list is returned.
+    ?view=summary selects the compact shape; ?fields=a,b returns only those keys.
+
+    Returns:
+        Tuple (limit or None, cursor, view, fields or None)
+
+    Raises:
+        ValueError: On an invalid limit, view or field name
+    """
+    limit = request.args.get('limit', type=int)
+    cursor = request.args.get('cursor')
+    if limit is None and cursor:
+        limit = DEFAULT_PAGE_SIZE
+    if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    view = request.args.get('view', 'full')
+    if view not in ('full', 'summary'):
+        raise ValueError("view must be 'full' or 'summary'")
+
+    fields = parse_fields(request.args.get('fields'), allowed_fields)
+    return limit, cursor, view, fields
+
+
+def _fetch_listing(queryset, document, limit, cursor, load_fields=None):
+    """
+    Apply the .only() projection and paging to a listing queryset.
+
+    Returns:
+        Tuple (documents, meta or None)
+    """
+    if load_fields:
+        # created_at is the paging key
+        queryset = queryset.only(*({'id', 'created_at'} | (set(load_fields) & set(document._fields))))
+
+    if limit is None:
+        return list(queryset.order_by('-created_at')), None
+
+    documents, next_cursor = paginate_newest_first(queryset, cursor, limit)
+    return documents, {'limit': limit, 'next_cursor': next_cursor, 'has_more': next_cursor is not None}
+
+
+def _select_fields(data, fields):
+    """Keep only the requested keys (plus id) of a serialised document."""
+    if not fields:
+        return data
+    return {key: data[key] for key in ['id', *fields] if key in data}
+
+
+def _dispatch_run(run, sheet_ids):
+    """
+    Queue a grading run's sheets on Celery; without a reachable broker
+    (development without Redis) run them in a background thread here.
+
+    Returns:
+        The Celery task id, or None when running in a thread
+    """
+    exam_id = str(ref_id(run, 'exam_id'))
+    run_id = str(run.id)
+    try:
+        if run.kind == 'ocr':
+            from tasks.ocr_tasks import process_exam_task
+            task = process_exam_task.delay(exam_id, run_id, sheet_ids)
+        elif run.kind == 'pipeline':
+            from tasks.grading_tasks import process_and_grade_exam_task
+            task = process_and_grade_exam_task.delay(exam_id, run.force, run_id, sheet_ids)
+        else:
+            from tasks.grading_tasks import grade_exam_task
+            task = grade_exam_task.delay(exam_id, run.force, run_id, sheet_ids)
+        GradingRun.objects(id=run.id).update_one(set__task_id=task.id)
+        return task.id
+    except Exception as e:
+        print(f"[GradingRoutes] Task queue unavailable ({e}); running {run.kind} in a background thread")
+
+    from flask import current_app
+    app = current_app._get_current_object()
+    targets = {
+        'ocr': lambda: GradingService.process_exam_sheets(
+            exam_id, run_id=run_id, sheet_ids=sheet_ids),
+        'pipeline': lambda: GradingService.process_and_grade_exam(
+            exam_id, force=run.force, run_id=run_id, sheet_ids=sheet_ids),
+        'grading': lambda: GradingService.grade_exam_sheets(
+            exam_id, force=run.force, run_id=run_id, sheet_ids=sheet_ids),
+    }
+
+    def run_in_background():
+        with app.app_context():
+            try:
+                targets[run.kind]()
+            except Exception as e:
+                print(f"[GradingThread] Error: {e}")
+
+    thread = threading.Thread(target=run_in_background, daemon=True)
+    thread.start()
+    return None
+
+
+def _get_owned_run(run_id, teacher_id):
+    """Load a grading run, checking the teacher owns its exam."""
+    run = GradingRun.objects(id=run_id).first()
+    if not run:
+        raise NotFoundError("Grading run not found")
+    ExamService.get_exam_by_id(str(ref_id(run, 'exam_id')), teacher_id=teacher_id)
+    return run
+
 
 # ------------------------------------------------------------------
 # Trigger OCR
@@ -45,17 +178,20 @@ def start_ocr_processing(exam_id):
         exam = ExamService.get_exam_by_id(exam_id, teacher_id=current_user_id)
 
         use_async = request.args.get('async', 'false').lower() == 'true'
+        sheet_ids = [str(i) for i in AnswerSheet.objects(
+            exam_id=exam, status__in=['uploaded', 'failed']).scalar('id')]
+        run = GradingRunService.start(exam, 'ocr', sheet_ids, user_id=current_user_id)
 
         if use_async:
-            from tasks.ocr_tasks import process_exam_task
-            task = process_exam_task.delay(exam_id)
+            task_id = _dispatch_run(run, sheet_ids)
             return success_response(
-                data={'task_id': task.id, 'status': 'queued'},
+                data={'task_id': task_id, 'run_id': str(run.id), 'status': 'queued'},
                 message="OCR processing queued"
             )
 
         # Synchronous (default)
-        result = GradingService.process_exam_sheets(exam_id)
+        result = GradingService.process_exam_sheets(exam_id, run_id=str(run.id), sheet_ids=sheet_ids)
+        result['run_id'] = str(run.id)
         return success_response(data=result, message="OCR processing complete")
 
     except NotFoundError as e:
@@ -83,7 +219,7 @@ def process_single_sheet(sheet_id):
             return error_response("Answer sheet not found", 404)
 
         # Verify ownership through exam
-        ExamService.get_exam_by_id(str(sheet.exam_id.id), teacher_id=current_user_id)
+        ExamService.get_exam_by_id(str(ref_id(sheet, 'exam_id')), teacher_id=current_user_id)
 
         use_async = request.args.get('async', 'false').lower() == 'true'
 
@@ -120,22 +256,53 @@ def list_answer_sheets(exam_id):
     GET /api/v1/grading/exams/:exam_id/sheets
     Query: ?status=uploaded|processing|ocr_completed|graded|failed
            &include_ocr=true (include OCR text — large payload)
+           &limit=50&cursor=... (page newest-first; next cursor in meta)
+           &view=summary (status and score only) or &fields=status,score
     """
     try:
         current_user_id = get_jwt_identity()
         exam = ExamService.get_exam_by_id(exam_id, teacher_id=current_user_id)
 
+        limit, cursor, view, fields = _listing_params(SHEET_LIST_FIELDS)
+
         query = {'exam_id': exam}
         status_filter = request.args.get('status')
         if status_filter:
             query['status'] = status_filter
 
-        sheets = AnswerSheet.objects(**query).order_by('-created_at')
         include_ocr = request.args.get('include_ocr', 'false').lower() == 'true'
+        if fields:
+            include_ocr = 'ocr_results' in fields
+            load_fields = ['status', *fields]  # status decides whether a score applies
+        elif view == 'summary':
+            load_fields = AnswerSheet.SUMMARY_FIELDS
+        else:
+            load_fields = None
+
+        sheets, meta = _fetch_listing(AnswerSheet.objects(**query), AnswerSheet, limit, cursor, load_fields)
 
-        data = [s.to_dict(include_ocr=include_ocr) for s in sheets]
-        return success_response(data=data)
+        # One query each for scores (and OCR pages) instead of one per sheet
+        wants_score = not fields or {'score', 'marks_awarded', 'max_marks'} & set(fields)
+        evaluation_summaries = Evaluation.summaries_for_sheets(
+            s.pk for s in sheets if wants_score and s.status in ('graded', 'reviewed', 'overridden')
+        )
+        ocr_pages = AnswerSheet.prefetch_ocr_pages(sheets) if include_ocr else None
 
+        if view == 'summary' and not fields:
+            data = [s.to_summary_dict(evaluation_summaries=evaluation_summaries) for s in sheets]
+        else:
+            data = [
+                _select_fields(
+                    s.to_dict(include_ocr=include_ocr, evaluation_summaries=evaluation_summaries,
+                              ocr_pages=ocr_pages),
+                    fields
+                )
+                for s in sheets
+            ]
+        return success_response(data=data, meta=meta)
+
+    except ValueError as e:
+        return error_response(str(e), 400)
     except NotFoundError as e:
         return error_response(str(e), 404)
     except ForbiddenError as e:
@@ -161,7 +328,7 @@ def get_answer_sheet(sheet_id):
             return error_response("Answer sheet not found", 404)
 
         # Verify ownership
-        ExamService.get_exam_by_id(str(sheet.exam_id.id), teacher_id=current_user_id)
+        ExamService.get_exam_by_id(str(ref_id(sheet, 'exam_id')), teacher_id=current_user_id)
 
         return success_response(data=sheet.to_dict(include_ocr=True))
 
@@ -204,6 +371,239 @@ def get_task_status(task_id):
         return error_response(f"Failed to get task status: {str(e)}", 500)
 
 
+@grading_bp.route('/cache/stats', methods=['GET'])
+@jwt_required()
+@role_required(['teacher'])
+def get_cache_stats():
+    """
+    Hit/miss counters for the provider result cache (OCR pages, ...).
+
+    GET /api/v1/grading/cache/stats
+    Counters are per worker process; 'entries' is the stored entry count.
+    """
+    try:
+        from services.cache_service import CacheService
+        return success_response(data=CacheService.stats())
+
+    except Exception as e:
+        return error_response(f"Failed to get cache stats: {str(e)}", 500)
+
+
+@grading_bp.route('/providers/latency', methods=['GET'])
+@jwt_required()
+@role_required(['teacher'])
+def get_provider_latency():
+    """
+    Latency histograms of the vision/LLM providers, which set the hedge thresholds.
+
+    GET /api/v1/grading/providers/latency
+    Histograms are per worker process; bucket keys are upper bounds in seconds.
+    """
+    try:
+        from services.provider_chain import ProviderChain
+        return success_response(data={'providers': ProviderChain.stats()})
+
+    except Exception as e:
+        return error_response(f"Failed to get provider latency: {str(e)}", 500)
+
+
+@grading_bp.route('/exams/<exam_id>/progress/token', methods=['POST'])
+@jwt_required()
+@role_required(['teacher'])
+def issue_progress_token(exam_id):
+    """
+    Short-lived token for opening an exam's progress stream.
+
+    POST /api/v1/grading/exams/:exam_id/progress/token
+    EventSource cannot send headers, so the stream takes this token as
+    ?token=<token> instead of the access token, which would be written to
+    access logs. It only opens this exam's stream, for
+    PROGRESS_STREAM_TOKEN_SECONDS.
+    """
+    try:
+        from flask import current_app
+        from services.progress_service import ProgressService
+
+        current_user_id = get_jwt_identity()
+        exam = ExamService.get_exam_by_id(exam_id, teacher_id=current_user_id)
+        return success_response(data={
+            'token': ProgressService.stream_token(exam.id, current_user_id),
+            'expires_in': current_app.config.get('PROGRESS_STREAM_TOKEN_SECONDS', 60),
+        })
+
+    except NotFoundError as e:
+        return error_response(str(e), 404)
+    except ForbiddenError as e:
+        return error_response(str(e), 403)
+    except Exception as e:
+        return error_response(f"Failed to issue progress token: {str(e)}", 500)
+
+
+@grading_bp.route('/exams/<exam_id>/progress/stream', methods=['GET'])
+def stream_progress(exam_id):
+    """
+    Live OCR/grading progress for an exam as Server-Sent Events.
+
+    GET /api/v1/grading/exams/:exam_id/progress/stream?token=<token>
+    The token comes from POST .../progress/token. The first event is a
+    'snapshot' of sheet counts by status; after that one event per sheet
+    started, page OCR'd, question graded and sheet finished (see
+    ProgressService). After PROGRESS_STREAM_MAX_SECONDS the stream sends a
+    'reconnect' event with a fresh token and closes.
+    """
+    from flask import Response, current_app, stream_with_context
+    from services.progress_service import ProgressService
+
+    try:
+        current_user_id = ProgressService.verify_stream_token(request.args.get('token'), exam_id)
+        exam = ExamService.get_exam_by_id(exam_id, teacher_id=current_user_id)
+
+        counts = {
+            row['_id']: row['count']
+            for row in AnswerSheet.objects(exam_id=exam.id).aggregate([
+                {'$group': {'_id': '$status', 'count': {'$sum': 1}}}
+            ])
+        }
+        snapshot = {'exam_id': exam_id, 'total': sum(counts.values()), 'status_counts': counts}
+
+        if not ProgressService.open_stream():
+            body, status = error_response("Too many open progress streams, try again shortly", 503)
+            return body, status, {'Retry-After': '5'}
+
+        heartbeat = current_app.config.get('PROGRESS_HEARTBEAT_SECONDS', 15)
+        max_seconds = current_app.config.get('PROGRESS_STREAM_MAX_SECONDS', 300)
+
+        def events():
+            yield from ProgressService.stream(exam.id, heartbeat=heartbeat, snapshot=snapshot,
+                                              max_seconds=max_seconds)
+            token = ProgressService.stream_token(exam.id, current_user_id)
+            yield ProgressService.format_event('reconnect', json.dumps({'token': token}))
+
+        response = Response(
+            stream_with_context(events()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+        )
+        response.call_on_close(ProgressService.close_stream)
+        return response
+
+    except AuthenticationError as e:
+        return error_response(e.message, 401)
+    except NotFoundError as e:
+        return error_response(str(e), 404)
+    except ForbiddenError as e:
+        return error_response(str(e), 403)
+    except Exception as e:
+        return error_response(f"Failed to open progress stream: {str(e)}", 500)
+
+
+# ------------------------------------------------------------------
+# Grading runs (cancel / resume)
+# ------------------------------------------------------------------
+
+@grading_bp.route('/exams/<exam_id>/runs', methods=['GET'])
+@jwt_required()
+@role_required(['teacher'])
+def list_grading_runs(exam_id):
+    """
+    Recent OCR/grading runs of an exam, newest first.
+
+    GET /api/v1/grading/exams/:exam_id/runs?limit=20
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        exam = ExamService.get_exam_by_id(exam_id, teacher_id=current_user_id)
+        limit = min(request.args.get('limit', 20, type=int), MAX_PAGE_SIZE)
+        runs = GradingRun.objects(exam_id=exam.id).exclude('checkpoints').order_by('-created_at').limit(limit)
+        return success_response(data=[run.to_dict() for run in runs])
+
+    except NotFoundError as e:
+        return error_response(e.message, 404)
+    except ForbiddenError as e:
+        return error_response(e.message, 403)
+    except Exception as e:
+        return error_response(f"Failed to list runs: {str(e)}", 500)
+
+
+@grading_bp.route('/runs/<run_id>', methods=['GET'])
+@jwt_required()
+@role_required(['teacher'])
+def get_grading_run(run_id):
+    """
+    GET /api/v1/grading/runs/:run_id
+    """
+    try:
+        run = _get_owned_run(run_id, get_jwt_identity())
+        return success_response(data=run.to_dict())
+
+    except NotFoundError as e:
+        return error_response(e.message, 404)
+    except ForbiddenError as e:
+        return error_response(e.message, 403)
+    except Exception as e:
+        return error_response(f"Failed to get run: {str(e)}", 500)
+
+
+@grading_bp.route('/runs/<run_id>/cancel', methods=['POST'])
+@jwt_required()
+@role_required(['teacher'])
+def cancel_grading_run(run_id):
+    """
+    Cancel a running OCR/grading run. Workers stop before their next
+    provider call; calls already in flight finish. Sheets not reached are
+    put back to their pre-run status once the run reports back.
+
+    POST /api/v1/grading/runs/:run_id/cancel
+    """
+    try:
+        run = _get_owned_run(run_id, get_jwt_identity())
+        run = GradingRunService.cancel(run)
+        return success_response(data=run.to_dict(), message=f"Run {run.status}")
+
+    except NotFoundError as e:
+        return error_response(e.message, 404)
+    except ForbiddenError as e:
+        return error_response(e.message, 403)
+    except ValidationError as e:
+        return error_response(e.message, 400)
+    except Exception as e:
+        return error_response(f"Failed to cancel run: {str(e)}", 500)
+
+
+@grading_bp.route('/runs/<run_id>/resume', methods=['POST'])
+@jwt_required()
+@role_required(['teacher'])
+def resume_grading_run(run_id):
+    """
+    Resume a cancelled, interrupted (worker died) or partly failed run:
+    only sheets it did not finish are queued again, and a sheet stopped
+    mid-grade keeps the questions it had already graded.
+
+    POST /api/v1/grading/runs/:run_id/resume
+    """
+    try:
+        run = _get_owned_run(run_id, get_jwt_identity())
+        sheet_ids = GradingRunService.prepare_resume(run)
+        task_id = _dispatch_run(run, sheet_ids)
+
+        data = run.to_dict()
+        data['sheets_queued'] = len(sheet_ids)
+        if task_id:
+            data['task_id'] = task_id
+        return success_response(data=data, message="Run resumed")
+
+    except NotFoundError as e:
+        return error_response(e.message, 404)
+    except ForbiddenError as e:
+        return error_response(e.message, 403)
+    except ValidationError as e:
+        return error_response(e.message, 400)
+    except ConflictError as e:
+        return error_response(e.message, 409)
+    except Exception as e:
+        return error_response(f"Failed to resume run: {str(e)}", 500)
+
+
 # ------------------------------------------------------------------
 # LLM Grading (Sprint 5)
 # ------------------------------------------------------------------
@@ -214,13 +614,17 @@ def get_task_status(task_id):
 def start_grading(exam_id):
     """
     Trigger LLM grading for all OCR-completed answer sheets of an exam.
-    Runs asynchronously in a background thread so it survives tab close.
+    Queued as Celery tasks (one per sheet) so it survives tab close and web
+    worker restarts. Without a reachable broker (development without Redis)
+    it falls back to a background thread in this process.
 
     POST /api/v1/grading/exams/:exam_id/grade
+    Query param: ?force=true  →  ignore cached grading results
     """
     try:
         current_user_id = get_jwt_identity()
         exam = ExamService.get_exam_by_id(exam_id, teacher_id=current_user_id)
+        force = request.args.get('force', 'false').lower() == 'true'
 
         # Mark all eligible sheets as 'processing' immediately
         from models.answer_sheet import AnswerSheet
@@ -228,29 +632,24 @@ def start_grading(exam_id):
             exam_id=exam,
             status__in=['ocr_completed', 'failed']
         )
-        count = eligible.count()
+        previous = {str(sheet_id): status for sheet_id, status in eligible.scalar('id', 'status')}
+        count = len(previous)
         if count == 0:
             return error_response("No sheets ready for grading", 400)
 
         eligible.update(set__status='processing')
 
-        # Run grading in background thread with app context
-        from flask import current_app
-        app = current_app._get_current_object()
-
-        def run_grading():
-            with app.app_context():
-                try:
-                    GradingService.grade_exam_sheets(exam_id)
-                except Exception as e:
-                    print(f"[GradingThread] Error: {e}")
-
-        thread = threading.Thread(target=run_grading, daemon=True)
-        thread.start()
+        sheet_ids = GradingService.gradable_sheet_ids(exam)
+        run = GradingRunService.start(exam, 'grading', sheet_ids, force=force, user_id=current_user_id,
+                                      sheet_statuses=previous)
+        task_id = _dispatch_run(run, sheet_ids)
 
+        data = {'status': 'grading_started', 'sheets_queued': count, 'run_id': str(run.id)}
+        if task_id:
+            data['task_id'] = task_id
         return success_response(
-            data={'status': 'grading_started', 'sheets_queued': count},
-            message="Grading started in background"
+            data=data,
+            message="Grading queued" if task_id else "Grading started in background"
         )
 
     except NotFoundError as e:
@@ -263,6 +662,50 @@ def start_grading(exam_id):
         return error_response(f"Grading failed: {str(e)}", 500)
 
 
+@grading_bp.route('/exams/<exam_id>/process-and-grade', methods=['POST'])
+@jwt_required()
+@role_required(['teacher'])
+def start_pipeline(exam_id):
+    """
+    Run OCR and grading for an exam as one pipeline: each sheet is graded
+    as soon as its own OCR completes. Queued on Celery (OCR and grading on
+    separate queues); falls back to a background thread without a broker.
+
+    POST /api/v1/grading/exams/:exam_id/process-and-grade
+    Query param: ?force=true  →  ignore cached grading results
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        exam = ExamService.get_exam_by_id(exam_id, teacher_id=current_user_id)
+        force = request.args.get('force', 'false').lower() == 'true'
+
+        sheet_ids = [str(i) for i in AnswerSheet.objects(
+            exam_id=exam,
+            status__in=['uploaded', 'failed', 'ocr_completed', 'graded']
+        ).scalar('id')]
+        count = len(sheet_ids)
+        if count == 0:
+            return error_response("No sheets to process", 400)
+
+        run = GradingRunService.start(exam, 'pipeline', sheet_ids, force=force, user_id=current_user_id)
+        task_id = _dispatch_run(run, sheet_ids)
+
+        data = {'status': 'pipeline_started', 'sheets_queued': count, 'run_id': str(run.id)}
+        if task_id:
+            data['task_id'] = task_id
+        return success_response(
+            data=data,
+            message="OCR and grading queued" if task_id else "OCR and grading started in background"
+        )
+
+    except NotFoundError as e:
+        return error_response(str(e), 404)
+    except ForbiddenError as e:
+        return error_response(str(e), 403)
+    except Exception as e:
+        return error_response(f"Pipeline failed: {str(e)}", 500)
+
+
 @grading_bp.route('/sheets/<sheet_id>/grade', methods=['POST'])
 @jwt_required()
 @role_required(['teacher'])
@@ -271,6 +714,7 @@ def grade_single_sheet(sheet_id):
     Trigger LLM grading for a single answer sheet.
 
     POST /api/v1/grading/sheets/:sheet_id/grade
+    Query param: ?force=true  →  ignore cached grading results
     """
     try:
         current_user_id = get_jwt_identity()
@@ -279,9 +723,10 @@ def grade_single_sheet(sheet_id):
         if not sheet:
             return error_response("Answer sheet not found", 404)
 
-        ExamService.get_exam_by_id(str(sheet.exam_id.id), teacher_id=current_user_id)
+        ExamService.get_exam_by_id(str(ref_id(sheet, 'exam_id')), teacher_id=current_user_id)
 
-        result = GradingService.grade_answer_sheet(sheet_id)
+        force = request.args.get('force', 'false').lower() == 'true'
+        result = GradingService.grade_answer_sheet(sheet_id, force=force)
         return success_response(data=result, message="Grading complete")
 
     except NotFoundError as e:
@@ -310,7 +755,7 @@ def get_evaluation(sheet_id):
         if not sheet:
             return error_response("Answer sheet not found", 404)
 
-        ExamService.get_exam_by_id(str(sheet.exam_id.id), teacher_id=current_user_id)
+        ExamService.get_exam_by_id(str(ref_id(sheet, 'exam_id')), teacher_id=current_user_id)
 
         evaluation = Evaluation.objects(answer_sheet_id=sheet).first()
         if not evaluation:
@@ -334,15 +779,31 @@ def list_evaluations(exam_id):
     List all evaluations for an exam.
 
     GET /api/v1/grading/exams/:exam_id/evaluations
+    Query: ?limit=50&cursor=... (page newest-first; next cursor in meta)
+           &view=summary (totals only) or &fields=percentage,status
     """
     try:
         current_user_id = get_jwt_identity()
         exam = ExamService.get_exam_by_id(exam_id, teacher_id=current_user_id)
 
-        evaluations = Evaluation.objects(exam_id=exam).order_by('-created_at')
-        data = [e.to_dict() for e in evaluations]
-        return success_response(data=data)
+        limit, cursor, view, fields = _listing_params(EVALUATION_LIST_FIELDS)
+        if fields:
+            load_fields = fields
+        elif view == 'summary':
+            load_fields = Evaluation.SUMMARY_FIELDS
+        else:
+            load_fields = None
+
+        evaluations, meta = _fetch_listing(Evaluation.objects(exam_id=exam), Evaluation, limit, cursor, load_fields)
 
+        if view == 'summary' and not fields:
+            data = [e.to_summary_dict() for e in evaluations]
+        else:
+            data = [_select_fields(e.to_dict(), fields) for e in evaluations]
+        return success_response(data=data, meta=meta)
+
+    except ValueError as e:
+        return error_response(str(e), 400)
     except NotFoundError as e:
         return error_response(str(e), 404)
     except ForbiddenError as e:
@@ -373,7 +834,7 @@ def override_question_grade(sheet_id, q_num):
             return error_response("Answer sheet not found", 404)
 
         # Verify ownership
-        ExamService.get_exam_by_id(str(sheet.exam_id.id), teacher_id=current_user_id)
+        ExamService.get_exam_by_id(str(ref_id(sheet, 'exam_id')), teacher_id=current_user_id)
 
         evaluation = Evaluation.objects(answer_sheet_id=sheet).first()
         if not evaluation:
@@ -417,12 +878,14 @@ def override_question_grade(sheet_id, q_num):
         target_qe.overridden_at = datetime.utcnow()
 
         # Recalculate totals
+        previous_score = counted_score(evaluation)
         total = sum(qe.marks_awarded for qe in evaluation.question_evaluations)
         evaluation.total_marks_awarded = total
         if evaluation.total_max_marks > 0:
             evaluation.percentage = round(total / evaluation.total_max_marks * 100, 2)
         evaluation.status = 'overridden'
         evaluation.save()
+        StatisticsService.record_score(ref_id(evaluation, 'exam_id'), previous_score, counted_score(evaluation))
 
         return success_response(
             data=evaluation.to_dict(),
@@ -453,7 +916,7 @@ def approve_sheet(sheet_id):
         if not sheet:
             return error_response("Answer sheet not found", 404)
 
-        exam = ExamService.get_exam_by_id(str(sheet.exam_id.id), teacher_id=current_user_id)
+        exam = ExamService.get_exam_by_id(str(ref_id(sheet, 'exam_id')), teacher_id=current_user_id)
 
         if sheet.status not in ('graded', 'reviewed'):
             return error_response(
@@ -466,12 +929,7 @@ def approve_sheet(sheet_id):
         sheet.status = 'reviewed'
         sheet.add_processing_log('review', 'approved', {'approved_by': current_user_id})
 
-        # Update exam statistics
-        from models.exam import ExamStatistics
-        if not exam.statistics:
-            exam.statistics = ExamStatistics()
-        exam.statistics.reviewed = (exam.statistics.reviewed or 0) + 1
-        exam.save()
+        StatisticsService.record_review(exam.id)
 
         return success_response(
             data=sheet.to_dict(),
@@ -503,41 +961,38 @@ def bulk_approve(exam_id):
         body = request.get_json() or {}
         sheet_ids = body.get('sheet_ids', [])
 
+        sheets = AnswerSheet.objects(exam_id=exam)
         if sheet_ids:
-            sheets = AnswerSheet.objects(id__in=sheet_ids, exam_id=exam)
+            sheets = sheets.filter(id__in=sheet_ids)
+            # Tally the requested sheets that won't be approved before the update
+            selected = sheets.count()
+            already_reviewed = sheets.filter(status='reviewed').count()
         else:
-            sheets = AnswerSheet.objects(exam_id=exam, status='graded')
-
-        approved_count = 0
-        already_reviewed = 0
-        failed = 0
-
-        for s in sheets:
-            if s.status == 'reviewed':
-                already_reviewed += 1
-                continue
-            if s.status not in ('graded',):
-                failed += 1
-                continue
-            s.status = 'reviewed'
-            s.add_processing_log('review', 'approved', {'approved_by': current_user_id})
-            approved_count += 1
-
-        # Update exam statistics
-        reviewed_total = AnswerSheet.objects(
-            exam_id=exam, status='reviewed'
-        ).count()
-        from models.exam import ExamStatistics
-        if not exam.statistics:
-            exam.statistics = ExamStatistics()
-        exam.statistics.reviewed = reviewed_total
-        exam.save()
+            selected = already_reviewed = 0
+
+        # One conditional update: only sheets still 'graded' move to 'reviewed'
+        now = datetime.utcnow()
+        result = sheets.filter(status='graded').update(
+            set__status='reviewed',
+            set__updated_at=now,
+            push__processing_log=ProcessingLog(
+                stage='review', status='approved', timestamp=now,
+                details={'approved_by': current_user_id}
+            ),
+            full_result=True
+        )
+        approved_count = result.modified_count
+        failed = max(selected - approved_count - already_reviewed, 0)
+
+        StatisticsService.record_review(exam.id, approved_count)
 
         return success_response(
             data={
                 'approved_count': approved_count,
                 'already_reviewed': already_reviewed,
-                'failed': failed
+                'failed': failed,
+                'matched_count': result.matched_count,
+                'modified_count': result.modified_count,
             },
             message=f"Bulk approve complete: {approved_count} approved"
         )
@@ -7,7 +7,7 @@ from flask import Blueprint, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 from utils.decorators import role_required
-from utils.helpers import success_response, error_response
+from utils.helpers import success_response, error_response, ref_id
 from models.exam import Exam
 from models.answer_sheet import AnswerSheet
 from models.evaluation import Evaluation
@@ -36,7 +36,7 @@ def list_results():
             return jsonify(success_response(data=[])), 200
 
         # Collect unique exam IDs
-        exam_ids = list(set(str(s.exam_id.id) for s in sheets))
+        exam_ids = list(set(str(ref_id(s, 'exam_id')) for s in sheets))
 
         # Find published exams among those
         published_exams = Exam.objects(
@@ -32,6 +32,8 @@ class Config:
     JWT_TOKEN_LOCATION = ['headers']
     JWT_HEADER_NAME = 'Authorization'
     JWT_HEADER_TYPE = 'Bearer'
+    # Seconds a user's role is trusted before role_required re-checks the database (0 = every request)
+    AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', 30))
     
     # File Upload
     MAX_CONTENT_LENGTH = 100 * 1024 * 1024  # 100MB
@@ -54,6 +56,8 @@ class Config:
     LLM_PROVIDER = os.getenv('LLM_PROVIDER', 'ollama')  # 'ollama', 'openai', 'lmstudio', 'openrouter', 'groqcloud'
     LLM_API_URL = os.getenv('LLM_API_URL', 'http://localhost:11434/api/chat')
     LLM_MODEL = os.getenv('LLM_MODEL', 'llama3')
+    # Ask the LLM to split a sheet into answers when question labels can't be found locally
+    SEGMENTATION_LLM_FALLBACK = os.getenv('SEGMENTATION_LLM_FALLBACK', 'true').lower() == 'true'
     
     # OpenRouter (cloud API - used when VISION_PROVIDER or LLM_PROVIDER is 'openrouter')
     OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY', '')
@@ -63,6 +67,59 @@ class Config:
     GROQ_VISION_MODEL = os.getenv('GROQ_VISION_MODEL', 'meta-llama/llama-4-scout-17b-16e-instruct')
     GROQ_LLM_MODEL = os.getenv('GROQ_LLM_MODEL', 'openai/gpt-oss-120b')
 
+    # Provider concurrency (max in-flight requests per provider, per worker process)
+    # Local servers process one request at a time; cloud APIs accept several.
+    PROVIDER_MAX_CONCURRENCY = {
+        'ollama': 1,
+        'lmstudio': 1,
+        'openai': 2,
+        'openrouter': 4,
+        'groqcloud': 4,
+    }
+    VISION_MAX_CONCURRENCY = int(os.getenv('VISION_MAX_CONCURRENCY', 0))  # 0 = provider default
+    LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', 0))  # 0 = provider default
+
+    # Provider request rate (token bucket per provider host/model, adapted from 429s and
+    # rate-limit headers). Starting rates for cloud quotas; other providers are unpaced until a 429.
+    PROVIDER_REQUESTS_PER_MINUTE = {
+        'groqcloud': 30,
+        'openrouter': 20,
+        'openai': 60,
+    }
+    VISION_REQUESTS_PER_MINUTE = float(os.getenv('VISION_REQUESTS_PER_MINUTE', 0))  # 0 = provider default
+    LLM_REQUESTS_PER_MINUTE = float(os.getenv('LLM_REQUESTS_PER_MINUTE', 0))  # 0 = provider default
+    PROVIDER_RATE_LIMIT_RETRIES = int(os.getenv('PROVIDER_RATE_LIMIT_RETRIES', 5))  # 429 retries per request
+    PROVIDER_RATE_LIMIT_MAX_WAIT = float(os.getenv('PROVIDER_RATE_LIMIT_MAX_WAIT', 300))  # max seconds queued
+
+    # Provider chains: fallbacks after VISION_PROVIDER / LLM_PROVIDER, comma-separated
+    # 'provider' or 'provider|api_url|model'. Slow requests are hedged to the next provider
+    # after PROVIDER_HEDGE_PERCENTILE of its recent latencies; failed ones fail over.
+    VISION_FALLBACK_PROVIDERS = os.getenv('VISION_FALLBACK_PROVIDERS', '')
+    LLM_FALLBACK_PROVIDERS = os.getenv('LLM_FALLBACK_PROVIDERS', '')
+    PROVIDER_HEDGE_PERCENTILE = float(os.getenv('PROVIDER_HEDGE_PERCENTILE', 95))  # 0 = failover only
+    PROVIDER_HEDGE_MIN_SAMPLES = int(os.getenv('PROVIDER_HEDGE_MIN_SAMPLES', 20))
+    VISION_HEDGE_DELAY = float(os.getenv('VISION_HEDGE_DELAY', 120))  # seconds, until enough samples
+    LLM_HEDGE_DELAY = float(os.getenv('LLM_HEDGE_DELAY', 60))  # seconds, until enough samples
+
+    # Provider HTTP client (pooled keep-alive sessions per provider host)
+    PROVIDER_POOL_MAXSIZE = int(os.getenv('PROVIDER_POOL_MAXSIZE', 10))  # connections kept per host
+    PROVIDER_CONNECT_TIMEOUT = float(os.getenv('PROVIDER_CONNECT_TIMEOUT', 10))
+    VISION_REQUEST_TIMEOUT = float(os.getenv('VISION_REQUEST_TIMEOUT', 600))  # 10 min per page
+    LLM_REQUEST_TIMEOUT = float(os.getenv('LLM_REQUEST_TIMEOUT', 300))  # 5 min per call
+
+    # Result cache (entries expire RESULT_CACHE_TTL_SECONDS after last use)
+    OCR_CACHE_ENABLED = os.getenv('OCR_CACHE_ENABLED', 'true').lower() == 'true'
+    GRADING_CACHE_ENABLED = os.getenv('GRADING_CACHE_ENABLED', 'true').lower() == 'true'
+
+    # Progress stream (SSE): seconds of silence before a keep-alive comment is sent
+    PROGRESS_HEARTBEAT_SECONDS = float(os.getenv('PROGRESS_HEARTBEAT_SECONDS', 15))
+    # A stream closes after this long (sending a fresh token to reconnect with)
+    PROGRESS_STREAM_MAX_SECONDS = float(os.getenv('PROGRESS_STREAM_MAX_SECONDS', 300))
+    # Lifetime of the ?token= a stream is opened with
+    PROGRESS_STREAM_TOKEN_SECONDS = int(os.getenv('PROGRESS_STREAM_TOKEN_SECONDS', 60))
+    # Open streams per web process; keep below gunicorn --threads so API requests still get a thread
+    PROGRESS_MAX_STREAMS = int(os.getenv('PROGRESS_MAX_STREAMS', 4))
+
     # Email (Flask-Mail)
     MAIL_SERVER = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
     MAIL_PORT = int(os.getenv('MAIL_PORT', 587))
@@ -91,6 +148,8 @@ class TestingConfig(Config):
         'host': 'mongodb://localhost:27017/smarteval_test',
         'connect': False
     }
+    OCR_CACHE_ENABLED = False
+    GRADING_CACHE_ENABLED = False
 
 
 class ProductionConfig(Config):
@@ -4,5 +4,6 @@ Models package
 from models.user import User
 from models.exam import Exam
 from models.answer_sheet import AnswerSheet
+from models.ocr_page import OCRPage
 
-__all__ = ['User', 'Exam', 'AnswerSheet']
+__all__ = ['User', 'Exam', 'AnswerSheet', 'OCRPage']
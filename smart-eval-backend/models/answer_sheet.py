@@ -5,6 +5,7 @@ Represents a student's answer sheet for an exam
 """
 
 from datetime import datetime
+from pymongo import ReplaceOne
 from mongoengine import (
     Document,
     StringField,
@@ -14,11 +15,11 @@ from mongoengine import (
     EmbeddedDocumentField,
     ListField,
     IntField,
-    FloatField,
     DictField
 )
 from models.user import User
 from models.exam import Exam
+from utils.helpers import ref_id
 
 
 class OriginalFile(EmbeddedDocument):
@@ -28,14 +29,6 @@ class OriginalFile(EmbeddedDocument):
     uploaded_at = DateTimeField(default=datetime.utcnow)
 
 
-class OCRResult(EmbeddedDocument):
-    """Embedded document for OCR results per page"""
-    page_number = IntField(required=True)
-    text = StringField()
-    confidence = FloatField(default=0.0)
-    processed_at = DateTimeField(default=datetime.utcnow)
-
-
 class ProcessingLog(EmbeddedDocument):
     """Embedded document for processing log entries"""
     stage = StringField(required=True)
@@ -58,8 +51,7 @@ class AnswerSheet(Document):
     # File information
     original_file = EmbeddedDocumentField(OriginalFile, required=True)
     
-    # OCR Results
-    ocr_results = ListField(EmbeddedDocumentField(OCRResult))
+    # OCR text lives in the ocr_pages collection (see models.ocr_page)
     
     # Status tracking
     status = StringField(
@@ -82,22 +74,34 @@ class AnswerSheet(Document):
             'student_id',
             'status',
             '-created_at',
-            ('exam_id', 'student_id')  # Compound index
+            ('exam_id', 'student_id'),  # Compound index
+            ('exam_id', '-created_at', '-id')  # Paginated listings (keyset on created_at, _id)
         ],
-        'ordering': ['-created_at']
+        'ordering': ['-created_at'],
+        # Tolerate legacy embedded ocr_results until scripts/migrate_ocr_pages.py has run
+        'strict': False
     }
     
+    # Fields to load for to_summary_dict()
+    SUMMARY_FIELDS = ('id', 'exam_id', 'student_id', 'status', 'created_at', 'updated_at')
+
     def save(self, *args, **kwargs):
         """Override save to update timestamps"""
         self.updated_at = datetime.utcnow()
         return super(AnswerSheet, self).save(*args, **kwargs)
     
-    def to_dict(self, include_ocr=False):
-        """Convert answer sheet to dictionary for JSON response"""
+    def to_dict(self, include_ocr=False, evaluation_summaries=None, ocr_pages=None):
+        """
+        Convert answer sheet to dictionary for JSON response.
+
+        Listings pass evaluation_summaries ({sheet_id: summary}, see
+        Evaluation.summaries_for_sheets) and ocr_pages ({sheet_id: [OCRPage]})
+        prefetched for all sheets, instead of one query per sheet.
+        """
         data = {
             'id': str(self.id),
-            'exam_id': str(self.exam_id.id),
-            'student_id': str(self.student_id.id),
+            'exam_id': str(ref_id(self, 'exam_id')),
+            'student_id': str(ref_id(self, 'student_id')),
             'status': self.status,
             'original_file': {
                 'url': self.original_file.url,
@@ -109,25 +113,13 @@ class AnswerSheet(Document):
         }
 
         # Include score from evaluation if graded or reviewed
-        if self.status in ('graded', 'reviewed', 'overridden'):
-            from models.evaluation import Evaluation
-            evaluation = Evaluation.objects(answer_sheet_id=self).first()
-            if evaluation:
-                data['score'] = evaluation.percentage
-                data['marks_awarded'] = evaluation.total_marks_awarded
-                data['max_marks'] = evaluation.total_max_marks
+        data.update(self._score_fields(evaluation_summaries))
         
-        # Include OCR results if requested (can be large)
-        if include_ocr and self.ocr_results:
-            data['ocr_results'] = [
-                {
-                    'page_number': ocr.page_number,
-                    'text': ocr.text,
-                    'confidence': ocr.confidence,
-                    'processed_at': ocr.processed_at.isoformat() if ocr.processed_at else None
-                }
-                for ocr in self.ocr_results
-            ]
+        # Include OCR results if requested (can be large, loaded from ocr_pages)
+        if include_ocr:
+            pages = ocr_pages.get(self.pk) if ocr_pages is not None else self.load_ocr_pages()
+            if pages:
+                data['ocr_results'] = [page.to_dict() for page in pages]
         
         # Include processing log
         if self.processing_log:
@@ -143,8 +135,116 @@ class AnswerSheet(Document):
         
         return data
     
-    def add_processing_log(self, stage, status, details=None):
-        """Add entry to processing log"""
+    def load_ocr_pages(self):
+        """Load this sheet's OCR pages in page order."""
+        from models.ocr_page import OCRPage
+        pages = list(OCRPage.objects(sheet_id=self.pk).order_by('page_number'))
+        if pages:
+            return pages
+
+        # Not yet migrated: read the legacy embedded array directly
+        raw = AnswerSheet._get_collection().find_one({'_id': self.pk}, {'ocr_results': 1}) or {}
+        return AnswerSheet._legacy_ocr_pages(self.pk, raw)
+
+    @staticmethod
+    def prefetch_ocr_pages(sheets):
+        """{sheet_id: [OCRPage]} for many sheets in one query (plus one for legacy sheets)."""
+        from models.ocr_page import OCRPage
+        by_sheet = {}
+        ids = [sheet.pk for sheet in sheets]
+        for page in OCRPage.objects(sheet_id__in=ids).no_dereference().order_by('sheet_id', 'page_number'):
+            by_sheet.setdefault(page._data['sheet_id'].id, []).append(page)
+
+        # Sheets not yet migrated, or not OCR'd yet: one query for all of them
+        remaining = [sheet_id for sheet_id in ids if sheet_id not in by_sheet]
+        if remaining:
+            for raw in AnswerSheet._get_collection().find({'_id': {'$in': remaining}}, {'ocr_results': 1}):
+                by_sheet[raw['_id']] = AnswerSheet._legacy_ocr_pages(raw['_id'], raw)
+            for sheet_id in remaining:
+                by_sheet.setdefault(sheet_id, [])
+        return by_sheet
+
+    @staticmethod
+    def _legacy_ocr_pages(sheet_id, raw):
+        """OCRPage objects (unsaved) from a raw document's embedded ocr_results array."""
+        from models.ocr_page import OCRPage
+        return [
+            OCRPage(
+                sheet_id=sheet_id,
+                page_number=entry.get('page_number'),
+                text=entry.get('text'),
+                confidence=entry.get('confidence', 0.0),
+                processed_at=entry.get('processed_at'),
+            )
+            for entry in sorted(raw.get('ocr_results') or [], key=lambda e: e.get('page_number') or 0)
+        ]
+
+    def load_ocr_text(self):
+        """All OCR page text joined in page order."""
+        return '\n'.join(page.text for page in self.load_ocr_pages() if page.text)
+
+    def save_ocr_pages(self, pages):
+        """
+        Replace this sheet's OCR pages with the given OCRPage documents.
+
+        Pages are upserted by (sheet_id, page_number) before any page beyond
+        the new set is deleted, so an interrupted save or a concurrent reader
+        never finds the sheet without OCR text.
+        """
+        from models.ocr_page import OCRPage
+        writes = []
+        for page in pages or []:
+            page.sheet_id = self
+            doc = page.to_mongo().to_dict()
+            doc.pop('_id', None)
+            writes.append(ReplaceOne({'sheet_id': self.pk, 'page_number': page.page_number}, doc, upsert=True))
+        if writes:
+            OCRPage._get_collection().bulk_write(writes, ordered=False)
+        OCRPage.objects(
+            sheet_id=self.pk, page_number__nin=[page.page_number for page in pages or []]
+        ).delete()
+
+    def to_summary_dict(self, evaluation_summaries=None):
+        """
+        Compact listing shape: status and score only, no file details or
+        processing log. Needs only id, exam_id, student_id, status and
+        timestamps loaded (see SUMMARY_FIELDS).
+        """
+        data = {
+            'id': str(self.id),
+            'exam_id': str(ref_id(self, 'exam_id')),
+            'student_id': str(ref_id(self, 'student_id')),
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+        data.update(self._score_fields(evaluation_summaries))
+        return data
+
+    def _score_fields(self, evaluation_summaries=None):
+        """score / marks_awarded / max_marks from the sheet's evaluation, if graded."""
+        if self.status not in ('graded', 'reviewed', 'overridden'):
+            return {}
+        if evaluation_summaries is None:
+            from models.evaluation import Evaluation
+            evaluation_summaries = Evaluation.summaries_for_sheets([self.pk])
+        summary = evaluation_summaries.get(self.pk)
+        if not summary:
+            return {}
+        return {
+            'score': summary['percentage'],
+            'marks_awarded': summary['total_marks_awarded'],
+            'max_marks': summary['total_max_marks'],
+        }
+
+    def add_processing_log(self, stage, status, details=None, flush=True):
+        """
+        Add entry to processing log.
+
+        The entry is buffered and, unless flush=False, written together with
+        any status change via flush_updates() — one small atomic update
+        instead of a full save().
+        """
         log_entry = ProcessingLog(
             stage=stage,
             status=status,
@@ -153,8 +253,49 @@ class AnswerSheet(Document):
         if not self.processing_log:
             self.processing_log = []
         self.processing_log.append(log_entry)
-        self.save()
-    
+        if getattr(self, '_pending_logs', None) is None:
+            self._pending_logs = []
+        self._pending_logs.append(log_entry)
+        if flush:
+            self.flush_updates()
+
+    def flush_updates(self, *fields):
+        """
+        Write buffered log entries, a changed status and the given fields in
+        one atomic update ($push $each on processing_log, $set for the rest).
+
+        Args:
+            fields: extra field paths to $set from their in-memory values,
+                    e.g. 'original_file.pages'
+        """
+        if self.pk is None:
+            self.save()
+            self._pending_logs = []
+            return
+
+        now = datetime.utcnow()
+        updates = {'set__updated_at': now}
+        if 'status' in self._changed_fields:
+            updates['set__status'] = self.status
+        for path in fields:
+            value = self
+            for part in path.split('.'):
+                value = getattr(value, part)
+            updates['set__' + path.replace('.', '__')] = value
+
+        pending = getattr(self, '_pending_logs', None) or []
+        if pending:
+            updates['push_all__processing_log'] = pending
+
+        AnswerSheet.objects(id=self.pk).update_one(**updates)
+
+        self.updated_at = now
+        self._pending_logs = []
+        written = {'status', 'processing_log', 'updated_at'} | {p.split('.')[0] for p in fields}
+        self._changed_fields = [
+            f for f in self._changed_fields if f.split('.')[0] not in written
+        ]
+
     def update_status(self, new_status):
         """Update answer sheet status"""
         valid_statuses = ['uploaded', 'processing', 'ocr_completed', 'graded', 'reviewed', 'challenged', 'failed']
@@ -167,4 +308,3 @@ class AnswerSheet(Document):
             status='success',
             details={'new_status': new_status}
         )
-        self.save()
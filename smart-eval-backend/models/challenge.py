@@ -20,6 +20,7 @@ from mongoengine import (
 from models.user import User
 from models.exam import Exam
 from models.evaluation import Evaluation
+from utils.helpers import ref_id
 
 
 class ChallengedQuestion(EmbeddedDocument):
@@ -97,9 +98,9 @@ class Challenge(Document):
     def to_dict(self):
         data = {
             'id': str(self.id),
-            'evaluation_id': str(self.evaluation_id.id),
-            'student_id': str(self.student_id.id),
-            'exam_id': str(self.exam_id.id),
+            'evaluation_id': str(ref_id(self, 'evaluation_id')),
+            'student_id': str(ref_id(self, 'student_id')),
+            'exam_id': str(ref_id(self, 'exam_id')),
             'status': self.status,
             'challenged_questions': [
                 {
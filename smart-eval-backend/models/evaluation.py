@@ -21,6 +21,7 @@ from mongoengine import (
 )
 from models.exam import Exam
 from models.answer_sheet import AnswerSheet
+from utils.helpers import ref_id
 
 
 class QuestionEvaluation(EmbeddedDocument):
@@ -35,6 +36,9 @@ class QuestionEvaluation(EmbeddedDocument):
     concepts_covered = ListField(StringField())
     concepts_missing = ListField(StringField())
 
+    # Hash of this question's grading inputs (answer span, rubric, strictness, model)
+    input_fingerprint = StringField()
+
     # Override tracking (Sprint 6)
     override_applied = BooleanField(default=False)
     original_marks = FloatField()
@@ -68,6 +72,10 @@ class Evaluation(Document):
     # Grading config used
     strictness = StringField(choices=['lenient', 'moderate', 'strict'], default='moderate')
 
+    # Hash of the sheet's OCR text + exam rubric at the last successful grade;
+    # incremental grading skips the sheet while it still matches
+    input_fingerprint = StringField()
+
     # Status
     status = StringField(
         choices=['pending', 'completed', 'failed', 'overridden'],
@@ -85,20 +93,44 @@ class Evaluation(Document):
             'answer_sheet_id',
             'exam_id',
             'status',
+            ('exam_id', 'percentage'),  # score min/max lookups for exam statistics
+            ('exam_id', '-created_at', '-id'),  # Paginated listings (keyset on created_at, _id)
             '-created_at'
         ],
         'ordering': ['-created_at']
     }
 
+    # Fields to load for to_summary_dict()
+    SUMMARY_FIELDS = ('id', 'answer_sheet_id', 'exam_id', 'total_marks_awarded', 'total_max_marks',
+                      'percentage', 'overall_confidence', 'status', 'graded_at', 'created_at')
+
     def save(self, *args, **kwargs):
         self.updated_at = datetime.utcnow()
         return super(Evaluation, self).save(*args, **kwargs)
 
+    @staticmethod
+    def summaries_for_sheets(sheet_ids):
+        """
+        Score summaries keyed by answer sheet id, fetched with one $in query
+        projected to the summary fields.
+        """
+        rows = Evaluation.objects(answer_sheet_id__in=list(sheet_ids)).only(
+            'answer_sheet_id', 'percentage', 'total_marks_awarded', 'total_max_marks'
+        ).as_pymongo()
+        return {
+            row['answer_sheet_id']: {
+                'percentage': row.get('percentage', 0.0),
+                'total_marks_awarded': row.get('total_marks_awarded', 0.0),
+                'total_max_marks': row.get('total_max_marks', 0.0),
+            }
+            for row in rows
+        }
+
     def to_dict(self):
         data = {
             'id': str(self.id),
-            'answer_sheet_id': str(self.answer_sheet_id.id),
-            'exam_id': str(self.exam_id.id),
+            'answer_sheet_id': str(ref_id(self, 'answer_sheet_id')),
+            'exam_id': str(ref_id(self, 'exam_id')),
             'total_marks_awarded': self.total_marks_awarded,
             'total_max_marks': self.total_max_marks,
             'percentage': self.percentage,
@@ -130,3 +162,18 @@ class Evaluation(Document):
             ] if self.question_evaluations else []
         }
         return data
+
+    def to_summary_dict(self):
+        """Compact listing shape: totals only, no per-question feedback (see SUMMARY_FIELDS)."""
+        return {
+            'id': str(self.id),
+            'answer_sheet_id': str(ref_id(self, 'answer_sheet_id')),
+            'exam_id': str(ref_id(self, 'exam_id')),
+            'total_marks_awarded': self.total_marks_awarded,
+            'total_max_marks': self.total_max_marks,
+            'percentage': self.percentage,
+            'overall_confidence': self.overall_confidence,
+            'status': self.status,
+            'graded_at': self.graded_at.isoformat() if self.graded_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
@@ -64,17 +64,38 @@ class GradingConfig(EmbeddedDocument):
         choices=['exact', 'synonyms'],
         default='synonyms'
     )
+    grading_mode = StringField(
+        choices=['per_question', 'batched'],
+        default='per_question'
+    )  # 'batched' grades a whole sheet in one LLM call
 
 
 class ExamStatistics(EmbeddedDocument):
-    """Embedded document for exam statistics"""
+    """
+    Embedded document for exam statistics
+
+    Score fields are running aggregates over completed/overridden evaluations,
+    kept current by StatisticsService as evaluations change.
+    """
     total_sheets = IntField(default=0)  # Total answer sheets uploaded
     total_submissions = IntField(default=0)  # Alias for total_sheets (for compatibility)
-    graded = IntField(default=0)
+    graded = IntField(default=0)  # Evaluations counted in the score aggregates
     reviewed = IntField(default=0)
     average_score = FloatField(default=0.0)
-    highest_score = FloatField(default=0.0)
-    lowest_score = FloatField(default=0.0)
+    highest_score = FloatField()  # unset until the first score
+    lowest_score = FloatField()
+    score_sum = FloatField(default=0.0)
+    score_sum_sq = FloatField(default=0.0)
+    distribution = DictField()  # bucket key (services.statistics_service.SCORE_BUCKETS) → count
+
+    @property
+    def score_stddev(self):
+        """Population standard deviation of the counted scores."""
+        if not self.graded:
+            return 0.0
+        mean = (self.score_sum or 0.0) / self.graded
+        variance = max((self.score_sum_sq or 0.0) / self.graded - mean * mean, 0.0)
+        return round(variance ** 0.5, 2)
 
 
 class Exam(Document):
@@ -176,7 +197,8 @@ class Exam(Document):
             data['grading_config'] = {
                 'strictness': self.grading_config.strictness,
                 'holistic_params': self.grading_config.holistic_params,
-                'keyword_mode': self.grading_config.keyword_mode
+                'keyword_mode': self.grading_config.keyword_mode,
+                'grading_mode': self.grading_config.grading_mode or 'per_question'
             }
         
         # Include statistics if requested
@@ -187,8 +209,10 @@ class Exam(Document):
                 'graded': self.statistics.graded,
                 'reviewed': self.statistics.reviewed,
                 'average_score': self.statistics.average_score,
-                'highest_score': self.statistics.highest_score,
-                'lowest_score': self.statistics.lowest_score
+                'highest_score': self.statistics.highest_score or 0.0,
+                'lowest_score': self.statistics.lowest_score or 0.0,
+                'score_stddev': self.statistics.score_stddev,
+                'distribution': self.statistics.distribution or {}
             }
         
         # Include published_at if published
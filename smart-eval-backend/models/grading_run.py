@@ -0,0 +1,117 @@
+"""
+Grading Run Model
+
+One OCR, grading or OCR → grading pipeline run over an exam's sheets. The
+run is the checkpoint record that makes it cancellable and resumable:
+finished sheets are listed as they complete, and per-question grading
+results of sheets still in flight are kept in `checkpoints` until the
+sheet's evaluation is saved.
+"""
+
+import os
+from datetime import datetime, timedelta
+from mongoengine import (
+    Document,
+    StringField,
+    DateTimeField,
+    ReferenceField,
+    ListField,
+    DictField,
+    BooleanField,
+    IntField
+)
+from models.user import User
+from models.exam import Exam
+from utils.helpers import ref_id
+
+
+class GradingRun(Document):
+    """
+    Grading Run Model
+
+    status: running → completed | cancelling → cancelled. A run whose worker
+    died stops heartbeating (updated_at) and is reported as stale; cancelling
+    a stale run marks it interrupted. Any stopped or stale run with sheets
+    left unfinished (including failed ones) can be resumed.
+    """
+
+    ACTIVE_STATUSES = ('running', 'cancelling')
+
+    exam_id = ReferenceField(Exam, required=True)
+    started_by = ReferenceField(User)
+
+    kind = StringField(choices=['ocr', 'grading', 'pipeline'], required=True)
+    force = BooleanField(default=False)
+    status = StringField(
+        choices=['running', 'cancelling', 'cancelled', 'completed', 'interrupted'],
+        default='running'
+    )
+
+    # Sheets in the run, and those finished so far (str ids)
+    sheet_ids = ListField(StringField())
+    completed_sheet_ids = ListField(StringField())
+    failed_sheet_ids = ListField(StringField())
+    # {sheet_id: sheet status before the run}, restored when the run stops
+    sheet_statuses = DictField()
+
+    # {sheet_id: {question_number: grading result}} for sheets in flight
+    checkpoints = DictField()
+
+    task_id = StringField()
+    attempts = IntField(default=1)
+    summary = DictField()
+
+    created_at = DateTimeField(default=datetime.utcnow)
+    updated_at = DateTimeField(default=datetime.utcnow)  # heartbeat
+    finished_at = DateTimeField()
+
+    meta = {
+        'collection': 'grading_runs',
+        'indexes': [
+            ('exam_id', '-created_at'),
+            'status'
+        ],
+        'ordering': ['-created_at']
+    }
+
+    @property
+    def is_stale(self) -> bool:
+        """Active, but nothing was recorded for longer than GRADING_RUN_STALE_SECONDS."""
+        stale_after = timedelta(seconds=int(os.getenv('GRADING_RUN_STALE_SECONDS', 900)))
+        return (self.status in self.ACTIVE_STATUSES and self.updated_at is not None
+                and datetime.utcnow() - self.updated_at > stale_after)
+
+    @property
+    def remaining_sheet_ids(self) -> list:
+        """Sheets not finished successfully (failed ones are retried on resume)."""
+        done = set(self.completed_sheet_ids or [])
+        return [sheet_id for sheet_id in self.sheet_ids or [] if sheet_id not in done]
+
+    @property
+    def is_resumable(self) -> bool:
+        if self.status in ('cancelled', 'interrupted', 'completed'):
+            return bool(self.remaining_sheet_ids)
+        return self.is_stale
+
+    def to_dict(self):
+        return {
+            'id': str(self.id),
+            'exam_id': str(ref_id(self, 'exam_id')),
+            'started_by': str(ref_id(self, 'started_by')) if ref_id(self, 'started_by') else None,
+            'kind': self.kind,
+            'force': self.force,
+            'status': self.status,
+            'stale': self.is_stale,
+            'resumable': self.is_resumable,
+            'total': len(self.sheet_ids or []),
+            'completed': len(self.completed_sheet_ids or []),
+            'failed': len(self.failed_sheet_ids or []),
+            'remaining': len(self.remaining_sheet_ids),
+            'in_flight': len(self.checkpoints or {}),
+            'attempts': self.attempts,
+            'task_id': self.task_id,
+            'summary': self.summary or {},
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
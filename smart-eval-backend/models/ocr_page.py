@@ -0,0 +1,48 @@
+"""
+OCR Page Model
+
+Extracted text for one page of an answer sheet. Kept out of the AnswerSheet
+document so sheet list queries and status updates don't carry the OCR text;
+only grading and the sheet detail endpoint load it.
+"""
+
+from datetime import datetime
+from mongoengine import (
+    Document,
+    StringField,
+    DateTimeField,
+    ReferenceField,
+    IntField,
+    FloatField
+)
+from models.answer_sheet import AnswerSheet
+
+
+class OCRPage(Document):
+    """
+    OCR Page Model
+
+    One page of OCR output, keyed by (sheet_id, page_number).
+    """
+
+    sheet_id = ReferenceField(AnswerSheet, required=True)
+    page_number = IntField(required=True)
+    text = StringField()
+    confidence = FloatField(default=0.0)
+    processed_at = DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        'collection': 'ocr_pages',
+        'indexes': [
+            {'fields': ['sheet_id', 'page_number'], 'unique': True}
+        ],
+        'ordering': ['page_number']
+    }
+
+    def to_dict(self):
+        return {
+            'page_number': self.page_number,
+            'text': self.text,
+            'confidence': self.confidence,
+            'processed_at': self.processed_at.isoformat() if self.processed_at else None
+        }
@@ -0,0 +1,50 @@
+"""
+Result Cache Model
+
+Content-addressed store for expensive AI provider results (OCR page text,
+LLM grading output). Entries are keyed by a hash of every input that can
+change the result and expire once unused for RESULT_CACHE_TTL_SECONDS.
+"""
+
+import os
+from datetime import datetime
+from mongoengine import (
+    Document,
+    StringField,
+    DateTimeField,
+    DictField,
+    IntField,
+    ObjectIdField
+)
+
+
+class ResultCache(Document):
+    """
+    Result Cache Model
+
+    One cached provider result within a namespace ('ocr', ...).
+    """
+
+    namespace = StringField(required=True)
+    key = StringField(required=True)
+    value = DictField()
+
+    # Optional owner, used for explicit invalidation
+    exam_id = ObjectIdField()
+
+    hits = IntField(default=0)
+    created_at = DateTimeField(default=datetime.utcnow)
+    last_used_at = DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        'collection': 'result_cache',
+        'indexes': [
+            {'fields': ['namespace', 'key'], 'unique': True},
+            ('namespace', 'exam_id'),
+            # TTL on last use — entries nobody reads eventually expire (LRU-like)
+            {
+                'fields': ['last_used_at'],
+                'expireAfterSeconds': int(os.getenv('RESULT_CACHE_TTL_SECONDS', 30 * 24 * 3600))
+            }
+        ]
+    }
@@ -0,0 +1,54 @@
+"""
+Benchmark: per-task bootstrap overhead of Celery tasks.
+
+Compares the old pattern (create_app() inside every task) with the shared
+per-worker app used by FlaskTask. Both tasks have an empty body and run
+eagerly in-process, so the difference is purely app/context setup.
+
+Usage (from smart-eval-backend/):
+    python scripts/bench_task_overhead.py [iterations]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from tasks.celery_app import celery, get_flask_app  # noqa: E402
+
+
+@celery.task(name='bench.create_app_per_task')
+def create_app_per_task():
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        return None
+
+
+@celery.task(name='bench.shared_app')
+def shared_app():
+    return None
+
+
+def bench(task, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        task.apply()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    get_flask_app()  # worker_process_init equivalent
+
+    # Warm up imports for both paths
+    create_app_per_task.apply()
+    shared_app.apply()
+
+    before = bench(create_app_per_task, iterations)
+    after = bench(shared_app, iterations)
+    print(f"iterations:            {iterations}")
+    print(f"create_app per task:   {before:.3f} ms/task")
+    print(f"shared worker app:     {after:.3f} ms/task")
+    print(f"speedup:               {before / after:.1f}x")
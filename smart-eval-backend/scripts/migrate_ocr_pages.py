@@ -0,0 +1,59 @@
+"""
+Migration: move embedded AnswerSheet.ocr_results into the ocr_pages collection.
+
+Copies each sheet's legacy `ocr_results` array into OCRPage documents
+(upserted on sheet_id + page_number, so re-running is safe) and then
+$unsets the embedded array.
+
+Usage (from smart-eval-backend/):
+    python scripts/migrate_ocr_pages.py [--dry-run]
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pymongo import UpdateOne  # noqa: E402
+
+from app import create_app  # noqa: E402
+from models.answer_sheet import AnswerSheet  # noqa: E402
+from models.ocr_page import OCRPage  # noqa: E402
+
+
+def migrate(dry_run: bool = False) -> dict:
+    sheets = AnswerSheet._get_collection()
+    pages = OCRPage._get_collection()
+    OCRPage.ensure_indexes()
+
+    migrated = 0
+    page_count = 0
+    for doc in sheets.find({'ocr_results': {'$exists': True}}, {'ocr_results': 1}):
+        ops = [
+            UpdateOne(
+                {'sheet_id': doc['_id'], 'page_number': entry.get('page_number')},
+                {'$set': {
+                    'text': entry.get('text'),
+                    'confidence': entry.get('confidence', 0.0),
+                    'processed_at': entry.get('processed_at'),
+                }},
+                upsert=True
+            )
+            for entry in doc.get('ocr_results') or []
+        ]
+        if not dry_run:
+            if ops:
+                pages.bulk_write(ops, ordered=False)
+            sheets.update_one({'_id': doc['_id']}, {'$unset': {'ocr_results': ''}})
+        migrated += 1
+        page_count += len(ops)
+
+    return {'sheets': migrated, 'pages': page_count, 'dry_run': dry_run}
+
+
+if __name__ == '__main__':
+    app = create_app()
+    with app.app_context():
+        result = migrate(dry_run='--dry-run' in sys.argv)
+    print(f"[Migration] {'Would move' if result['dry_run'] else 'Moved'} "
+          f"{result['pages']} page(s) from {result['sheets']} sheet(s) into ocr_pages")
@@ -0,0 +1,38 @@
+"""
+Rebuild Exam.statistics running aggregates from evaluations.
+
+Exam statistics are maintained incrementally as evaluations change. Run
+this once to backfill exams graded before that, or to repair an exam whose
+counters have drifted. Safe to re-run.
+
+Usage (from smart-eval-backend/):
+    python scripts/rebuild_exam_statistics.py [exam_id ...]
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bson import ObjectId  # noqa: E402
+
+from app import create_app  # noqa: E402
+from models.exam import Exam  # noqa: E402
+from services.statistics_service import StatisticsService  # noqa: E402
+
+
+def rebuild(exam_ids=None) -> int:
+    ids = [ObjectId(e) for e in exam_ids] if exam_ids else Exam.objects.scalar('id')
+    count = 0
+    for exam_id in ids:
+        summary = StatisticsService.rebuild(exam_id)
+        print(f"[Statistics] Exam {exam_id}: {summary['count']} score(s), mean {summary['mean']}")
+        count += 1
+    return count
+
+
+if __name__ == '__main__':
+    app = create_app()
+    with app.app_context():
+        rebuilt = rebuild(sys.argv[1:])
+    print(f"[Statistics] Rebuilt statistics for {rebuilt} exam(s)")
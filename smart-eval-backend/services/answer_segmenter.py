@@ -0,0 +1,92 @@
+"""
+Answer Segmenter
+
+Splits the OCR text of a student's answer sheet into per-question answer
+spans using the labels students write ("Q1", "Question 2", "Ans 3", "4.",
+"5)"), so each grading prompt only carries its own answer instead of the
+whole sheet.
+
+Pure text processing — no provider calls. LLMService falls back to the
+LLM only for questions this cannot locate.
+"""
+
+import re
+
+
+# "Q1", "Q.1", "Ques 2", "Question 3:", "Ans 4", "Answer-5", "Q No. 6"
+_STRONG_LABEL = re.compile(
+    r'^[ \t>*#\-]*'
+    r'(?:q(?:ues(?:tion)?)?|ans(?:wer)?)'
+    r'\s*(?:no\.?|#)?\s*[\.:\-]?\s*'
+    r'(\d{1,3})(?![\d.]\d)',
+    re.IGNORECASE | re.MULTILINE
+)
+
+# "1." or "2)" at the start of a line (but not "1.5")
+_WEAK_LABEL = re.compile(
+    r'^[ \t>*#\-]*\(?(\d{1,3})\s*[\.\)](?=\s|$)',
+    re.MULTILINE
+)
+
+
+class AnswerSegmenter:
+    """Locates each question's answer span within a sheet's OCR text."""
+
+    @staticmethod
+    def segment(ocr_text: str, question_numbers: list) -> tuple:
+        """
+        Split OCR text into per-question spans.
+
+        Args:
+            ocr_text: Full OCR text of the sheet (all pages concatenated)
+            question_numbers: Question numbers the exam expects
+
+        Returns:
+            (segments, missing) — segments maps question_number → answer text
+            (label line included), missing lists questions with no label found.
+        """
+        expected = set(question_numbers)
+        if not ocr_text or not expected:
+            return {}, sorted(expected)
+
+        # Single-question papers: the whole sheet is the answer
+        if len(expected) == 1:
+            return {next(iter(expected)): ocr_text.strip()}, []
+
+        labels = AnswerSegmenter._find_labels(ocr_text, expected)
+        segments = {}
+        for idx, (start, number) in enumerate(labels):
+            end = labels[idx + 1][0] if idx + 1 < len(labels) else len(ocr_text)
+            segments[number] = ocr_text[start:end].strip()
+
+        missing = sorted(expected - set(segments))
+        return segments, missing
+
+    @staticmethod
+    def _find_labels(ocr_text: str, expected: set) -> list:
+        """
+        Return [(offset, question_number)] sorted by offset.
+
+        Explicit labels (Q/Question/Ans) may appear in any order. Bare
+        numbers ("1.", "2)") are only accepted in increasing order, so a
+        numbered list inside an answer is not mistaken for a new question.
+        """
+        strong = {}
+        for m in _STRONG_LABEL.finditer(ocr_text):
+            number = int(m.group(1))
+            if number in expected and number not in strong:
+                strong[number] = m.start()
+
+        if len(strong) < len(expected):
+            last = 0
+            for m in _WEAK_LABEL.finditer(ocr_text):
+                number = int(m.group(1))
+                if number in expected and number not in strong and number > last:
+                    # Keep bare labels in order relative to explicit ones too
+                    before = [n for n, pos in strong.items() if pos < m.start()]
+                    if before and max(before) > number:
+                        continue
+                    strong[number] = m.start()
+                    last = number
+
+        return sorted((pos, number) for number, pos in strong.items())
@@ -1,7 +1,10 @@
 """
 Authentication service
 """
+import threading
+import time
 from datetime import datetime
+from flask import current_app
 from flask_jwt_extended import create_access_token, create_refresh_token
 from models.user import User
 from utils.exceptions import ValidationError, AuthenticationError, ConflictError
@@ -10,6 +13,12 @@ from utils.helpers import validate_email, validate_password
 
 class AuthService:
     """Service for authentication operations"""
+
+    ROLE_CACHE_MAX_ENTRIES = 10000
+
+    # user_id -> (role or None, expires_at); per worker process
+    _role_cache = {}
+    _role_lock = threading.Lock()
     
     @staticmethod
     def register_user(email, password, role, profile=None):
@@ -85,9 +94,11 @@ class AuthService:
         user.last_login = datetime.utcnow()
         user.save()
         
-        # Generate tokens
-        access_token = create_access_token(identity=str(user.id))
-        refresh_token = create_refresh_token(identity=str(user.id))
+        # Generate tokens (role travels in the token so route guards needn't load the user)
+        claims = {'role': user.role}
+        access_token = create_access_token(identity=str(user.id), additional_claims=claims)
+        refresh_token = create_refresh_token(identity=str(user.id), additional_claims=claims)
+        AuthService._remember_role(str(user.id), user.role)
         
         return {
             'access_token': access_token,
@@ -115,7 +126,8 @@ class AuthService:
         if not user:
             raise AuthenticationError('User not found')
         
-        access_token = create_access_token(identity=str(user.id))
+        access_token = create_access_token(identity=str(user.id), additional_claims={'role': user.role})
+        AuthService._remember_role(str(user.id), user.role)
         
         return {
             'access_token': access_token,
@@ -134,3 +146,46 @@ class AuthService:
             User object or None
         """
         return User.objects(id=user_id).first()
+
+    @staticmethod
+    def cached_role(user_id):
+        """
+        Current role of a user, served from a short-lived per-process cache
+
+        Lets route guards confirm a token's role claim without a database
+        round-trip on every request. A deleted user or changed role takes
+        effect within AUTH_USER_CACHE_TTL seconds, even for access tokens
+        issued before the change.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Role string, or None if the user no longer exists
+        """
+        user_id = str(user_id)
+        now = time.monotonic()
+        with AuthService._role_lock:
+            entry = AuthService._role_cache.get(user_id)
+        if entry and entry[1] > now:
+            return entry[0]
+
+        user = User.objects(id=user_id).only('role').first()
+        role = user.role if user else None
+        AuthService._remember_role(user_id, role)
+        return role
+
+    @staticmethod
+    def _remember_role(user_id, role):
+        ttl = current_app.config.get('AUTH_USER_CACHE_TTL', 30)
+        if ttl <= 0:
+            return
+        now = time.monotonic()
+        with AuthService._role_lock:
+            cache = AuthService._role_cache
+            if len(cache) >= AuthService.ROLE_CACHE_MAX_ENTRIES:
+                for key in [k for k, (_, expires) in cache.items() if expires <= now]:
+                    del cache[key]
+                if len(cache) >= AuthService.ROLE_CACHE_MAX_ENTRIES:
+                    cache.clear()
+            cache[str(user_id)] = (role, now + ttl)
@@ -0,0 +1,107 @@
+"""
+Cache Service
+
+Persistent, content-addressed cache for AI provider results, backed by the
+ResultCache collection. Cache failures never break the caller: a lookup
+error is treated as a miss and a write error is logged and ignored.
+
+Hit/miss counters are kept per worker process and exposed via stats().
+"""
+
+import hashlib
+import json
+import threading
+from datetime import datetime
+
+from models.result_cache import ResultCache
+
+
+class CacheService:
+    """Get/put helpers and counters for the result cache."""
+
+    _counters = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """Deterministic SHA-256 over JSON-serialisable key parts."""
+        raw = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def get(namespace: str, key: str):
+        """Return the cached value dict, or None on a miss."""
+        try:
+            entry = ResultCache.objects(namespace=namespace, key=key).modify(
+                inc__hits=1,
+                set__last_used_at=datetime.utcnow(),
+                new=True
+            )
+        except Exception as e:
+            print(f"[CacheService] Lookup failed ({namespace}): {e}")
+            entry = None
+
+        CacheService._count(namespace, 'hits' if entry else 'misses')
+        return entry.value if entry else None
+
+    @staticmethod
+    def put(namespace: str, key: str, value: dict, exam_id=None):
+        """Insert or refresh a cache entry."""
+        updates = {
+            'set__value': value,
+            'set__last_used_at': datetime.utcnow(),
+            'set_on_insert__created_at': datetime.utcnow(),
+        }
+        if exam_id:
+            updates['set__exam_id'] = exam_id
+        try:
+            ResultCache.objects(namespace=namespace, key=key).update_one(upsert=True, **updates)
+        except Exception as e:
+            print(f"[CacheService] Store failed ({namespace}): {e}")
+
+    @staticmethod
+    def invalidate(namespace: str, exam_id) -> int:
+        """Delete every entry in a namespace owned by an exam; returns the count."""
+        try:
+            deleted = ResultCache.objects(namespace=namespace, exam_id=exam_id).delete()
+        except Exception as e:
+            print(f"[CacheService] Invalidate failed ({namespace}, exam {exam_id}): {e}")
+            return 0
+        if deleted:
+            print(f"[CacheService] Invalidated {deleted} {namespace} entr{'y' if deleted == 1 else 'ies'} for exam {exam_id}")
+        return deleted
+
+    @staticmethod
+    def stats() -> dict:
+        """Per-process hit/miss counters plus stored entry counts per namespace."""
+        with CacheService._lock:
+            counters = {ns: dict(c) for ns, c in CacheService._counters.items()}
+
+        try:
+            stored = {
+                row['_id']: row['count']
+                for row in ResultCache.objects.aggregate([
+                    {'$group': {'_id': '$namespace', 'count': {'$sum': 1}}}
+                ])
+            }
+        except Exception as e:
+            print(f"[CacheService] Stats query failed: {e}")
+            stored = {}
+
+        data = {}
+        for ns in set(counters) | set(stored):
+            c = counters.get(ns, {'hits': 0, 'misses': 0})
+            lookups = c['hits'] + c['misses']
+            data[ns] = {
+                'hits': c['hits'],
+                'misses': c['misses'],
+                'hit_rate': round(c['hits'] / lookups, 4) if lookups else 0.0,
+                'entries': stored.get(ns, 0),
+            }
+        return data
+
+    @staticmethod
+    def _count(namespace: str, counter: str):
+        with CacheService._lock:
+            c = CacheService._counters.setdefault(namespace, {'hits': 0, 'misses': 0})
+            c[counter] += 1
@@ -6,6 +6,7 @@ from mongoengine import DoesNotExist
 from models.exam import Exam
 from models.user import User
 from utils.exceptions import ValidationError, NotFoundError, ForbiddenError
+from utils.helpers import ref_id
 
 
 class ExamService:
@@ -137,7 +138,7 @@ class ExamService:
             raise NotFoundError("Exam not found")
         
         # Check if teacher owns this exam
-        if teacher_id and str(exam.teacher_id.id) != str(teacher_id):
+        if teacher_id and str(ref_id(exam, 'teacher_id')) != str(teacher_id):
             raise ForbiddenError("You don't have permission to access this exam")
         
         return exam
@@ -0,0 +1,256 @@
+"""
+Grading Run Service
+
+Bookkeeping for cancellable, resumable OCR/grading runs (see
+models.grading_run). Workers record each finished sheet and, while grading,
+each finished question; check() is called between provider calls and
+raises RunCancelled once the run has been cancelled. Resuming a run
+re-queues only the sheets it did not finish, and sheets interrupted
+mid-grade reuse their checkpointed question results.
+
+Every write is a single atomic update on the run document, so Celery
+workers and threads can record into the same run concurrently.
+"""
+
+import threading
+import time
+from datetime import datetime
+
+from bson import ObjectId
+
+from models.answer_sheet import AnswerSheet
+from models.grading_run import GradingRun
+from utils.exceptions import RunCancelled, ConflictError, ValidationError
+
+
+class GradingRunService:
+    """Create, checkpoint, cancel and resume grading runs."""
+
+    # Seconds a "still running" answer is reused, so per-call checks cost at
+    # most one small query per run every few seconds per process. A stopped
+    # run is never cached: a resume in another process must be seen at once.
+    CANCEL_CHECK_INTERVAL = 2.0
+
+    _cancel_checks = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def start(exam, kind: str, sheet_ids: list, force: bool = False, user_id=None,
+              sheet_statuses: dict = None) -> GradingRun:
+        """
+        Create the run record for sheets about to be queued.
+
+        sheet_statuses gives {sheet_id: status} for sheets the caller has
+        already marked 'processing'; other sheets' statuses are read here.
+        A stopped run puts its unfinished sheets back in these statuses.
+        """
+        sheet_ids = [str(s) for s in sheet_ids]
+        statuses = {str(k): v for k, v in (sheet_statuses or {}).items()}
+        unknown = [s for s in sheet_ids if s not in statuses and ObjectId.is_valid(s)]
+        if unknown:
+            statuses.update(
+                (str(sheet_id), status)
+                for sheet_id, status in AnswerSheet.objects(id__in=unknown).scalar('id', 'status')
+            )
+        run = GradingRun(
+            exam_id=exam,
+            started_by=user_id,
+            kind=kind,
+            force=force,
+            sheet_ids=sheet_ids,
+            sheet_statuses={s: statuses[s] for s in sheet_ids if s in statuses},
+        ).save()
+        print(f"[GradingRunService] Run {run.id}: {kind} over {len(run.sheet_ids)} sheet(s)")
+        return run
+
+    # ------------------------------------------------------------------
+    # Checkpoints (called by workers)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def check(run_id):
+        """Raise RunCancelled if the run has been cancelled. No-op without a run."""
+        if run_id and GradingRunService.is_cancelled(run_id):
+            raise RunCancelled(f"Grading run {run_id} was cancelled")
+
+    @staticmethod
+    def is_cancelled(run_id) -> bool:
+        key = str(run_id)
+        now = time.monotonic()
+        with GradingRunService._lock:
+            checked_at = GradingRunService._cancel_checks.get(key)
+        if checked_at is not None and now - checked_at < GradingRunService.CANCEL_CHECK_INTERVAL:
+            return False
+
+        run = GradingRun.objects(id=run_id).only('status').first()
+        cancelled = run is None or run.status not in ('running',)
+        with GradingRunService._lock:
+            if cancelled:
+                GradingRunService._cancel_checks.pop(key, None)
+            else:
+                GradingRunService._cancel_checks[key] = now
+        return cancelled
+
+    @staticmethod
+    def record_question(run_id, sheet_id, result: dict):
+        """Checkpoint one freshly graded question of a sheet in flight."""
+        if not run_id or result.get('parse_failed'):
+            return
+        GradingRun._get_collection().update_one(
+            {'_id': _object_id(run_id)},
+            {'$set': {
+                f"checkpoints.{sheet_id}.{result['question_number']}": result,
+                'updated_at': datetime.utcnow(),
+            }}
+        )
+
+    @staticmethod
+    def question_checkpoint(run_id, sheet_id) -> dict:
+        """{question_number: result} checkpointed for a sheet by an earlier attempt."""
+        if not run_id:
+            return {}
+        doc = GradingRun._get_collection().find_one(
+            {'_id': _object_id(run_id)}, {f'checkpoints.{sheet_id}': 1}
+        )
+        saved = ((doc or {}).get('checkpoints') or {}).get(str(sheet_id)) or {}
+        return {int(question_number): result for question_number, result in saved.items()}
+
+    @staticmethod
+    def record_sheet(run_id, sheet_id, failed: bool = False, stage: str = 'grading'):
+        """
+        Record a sheet as finished (or failed) and drop its question checkpoint.
+
+        OCR completing a sheet only finishes it in an OCR-only run; in a
+        pipeline run the sheet still has to be graded.
+        """
+        if not run_id:
+            return
+        sheet_id = str(sheet_id)
+        query = {'_id': _object_id(run_id)}
+        if stage == 'ocr' and not failed:
+            query['kind'] = 'ocr'
+        done, other = ('failed_sheet_ids', 'completed_sheet_ids') if failed else \
+            ('completed_sheet_ids', 'failed_sheet_ids')
+        GradingRun._get_collection().update_one(query, {
+            '$addToSet': {done: sheet_id},
+            '$pull': {other: sheet_id},
+            '$unset': {f'checkpoints.{sheet_id}': ''},
+            '$set': {'updated_at': datetime.utcnow()},
+        })
+
+    @staticmethod
+    def status_before(run_id, sheet_id):
+        """The sheet's status before the run started, or None if not recorded."""
+        if not run_id:
+            return None
+        run = GradingRun.objects(id=run_id).only('sheet_statuses').first()
+        return ((run.sheet_statuses if run else None) or {}).get(str(sheet_id))
+
+    @staticmethod
+    def touch(run_id):
+        """Heartbeat, so a long sheet isn't mistaken for a dead run."""
+        if run_id:
+            GradingRun.objects(id=run_id).update_one(set__updated_at=datetime.utcnow())
+
+    @staticmethod
+    def finish(run_id, summary: dict):
+        """Close the run once every queued sheet has reported back."""
+        if not run_id:
+            return
+        run = GradingRun.objects(id=run_id).first()
+        if not run:
+            return
+        # A cancel that arrived after the last sheet finished changes nothing
+        cancelled = bool(run.status == 'cancelling' or summary.get('cancelled')) and bool(run.remaining_sheet_ids)
+        run.status = 'cancelled' if cancelled else 'completed'
+        run.summary = {k: v for k, v in summary.items() if k != 'results'}
+        run.finished_at = run.updated_at = datetime.utcnow()
+        run.save()
+
+        if cancelled:
+            GradingRunService._release_sheets(run, run.remaining_sheet_ids)
+        print(f"[GradingRunService] Run {run.id} {run.status}: "
+              f"{len(run.completed_sheet_ids)}/{len(run.sheet_ids)} sheet(s) done")
+
+    # ------------------------------------------------------------------
+    # Cancel / resume (called by routes)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def cancel(run: GradingRun) -> GradingRun:
+        """
+        Ask workers to stop. Sheets already calling a provider finish that
+        call; nothing new is started. A stale run has no worker left to
+        notice, so it is marked interrupted straight away.
+        """
+        if run.status not in GradingRun.ACTIVE_STATUSES:
+            raise ValidationError(f"Run is already {run.status}")
+
+        if run.is_stale:
+            run.status = 'interrupted'
+            run.finished_at = datetime.utcnow()
+            run.save()
+            GradingRunService._release_sheets(run, run.remaining_sheet_ids)
+        else:
+            GradingRun.objects(id=run.id, status='running').update_one(set__status='cancelling')
+            run.reload()
+        return run
+
+    @staticmethod
+    def prepare_resume(run: GradingRun) -> list:
+        """
+        Claim a stopped run for another attempt and return the sheets to queue.
+
+        Raises ConflictError if another request resumed it first.
+        """
+        if not run.is_resumable:
+            raise ValidationError(f"Run is {run.status} and has nothing to resume")
+
+        sheet_ids = run.remaining_sheet_ids
+        claimed = GradingRun.objects(
+            id=run.id, status=run.status, updated_at=run.updated_at
+        ).update_one(
+            set__status='running',
+            set__updated_at=datetime.utcnow(),
+            set__finished_at=None,
+            set__failed_sheet_ids=[],
+            inc__attempts=1,
+        )
+        if not claimed:
+            raise ConflictError("Run was resumed or changed by another request")
+
+        GradingRunService._release_sheets(run, sheet_ids)
+        if run.kind == 'grading':
+            AnswerSheet.objects(id__in=sheet_ids, status__in=['ocr_completed', 'failed']).update(
+                set__status='processing'
+            )
+        run.reload()
+        print(f"[GradingRunService] Run {run.id}: resuming {len(sheet_ids)} sheet(s) (attempt {run.attempts})")
+        return sheet_ids
+
+    @staticmethod
+    def _release_sheets(run: GradingRun, sheet_ids: list):
+        """
+        Put sheets a stopped run left in 'processing' back in the status they
+        had before the run, keeping OCR the run completed. Sheets whose
+        earlier status is unknown go back before OCR, or ready to grade in a
+        grading run.
+        """
+        before = run.sheet_statuses or {}
+        stuck = AnswerSheet.objects(id__in=sheet_ids, status='processing').only('id', 'processing_log')
+        for sheet in stuck:
+            status = before.get(str(sheet.id))
+            if not status or status == 'processing':
+                status = 'ocr_completed' if run.kind == 'grading' else 'uploaded'
+            last_stage = next((log.stage for log in reversed(sheet.processing_log or [])
+                               if log.stage in ('ocr', 'grading')), None)
+            if run.kind != 'grading' and last_stage == 'grading' and status in ('uploaded', 'failed'):
+                status = 'ocr_completed'
+            AnswerSheet.objects(id=sheet.id, status='processing').update_one(
+                set__status=status,
+                set__updated_at=datetime.utcnow(),
+            )
+
+
+def _object_id(run_id):
+    return run_id if isinstance(run_id, ObjectId) else ObjectId(str(run_id))
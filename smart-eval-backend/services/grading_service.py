@@ -6,25 +6,35 @@ Called by Celery tasks for async processing.
 """
 
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from flask import current_app
 
-from models.answer_sheet import AnswerSheet, OCRResult
+from models.answer_sheet import AnswerSheet
+from models.ocr_page import OCRPage
 from models.exam import Exam
 from models.evaluation import Evaluation, QuestionEvaluation
 from services.ocr_service import OCRService
 from services.llm_service import LLMService
-from utils.exceptions import ValidationError, NotFoundError
+from services.grading_run_service import GradingRunService
+from services.progress_service import ProgressService
+from services.provider_limiter import ProviderLimiter
+from services.statistics_service import StatisticsService, counted_score
+from utils.exceptions import ValidationError, NotFoundError, RunCancelled
+from utils.helpers import ref_id
 
 
 class GradingService:
     """Orchestrates OCR processing and LLM grading for answer sheets."""
 
     @staticmethod
-    def process_answer_sheet(answer_sheet_id: str) -> dict:
+    def process_answer_sheet(answer_sheet_id: str, run_id=None) -> dict:
         """
         Run OCR on a single answer sheet.
 
+        Within a grading run (run_id) the sheet is skipped once the run is
+        cancelled, and OCR stops between pages if it is cancelled mid-sheet.
+
         Steps:
             1. Look up the AnswerSheet document
             2. Resolve the file on disk
@@ -35,13 +45,19 @@ class GradingService:
         Returns:
             dict summary of the processing result
         """
+        if run_id and GradingRunService.is_cancelled(run_id):
+            return {'answer_sheet_id': answer_sheet_id, 'status': 'cancelled'}
+
         sheet = AnswerSheet.objects(id=answer_sheet_id).first()
         if not sheet:
             raise NotFoundError(f"Answer sheet {answer_sheet_id} not found")
 
         # Mark processing started
+        previous_status = sheet.status
         sheet.status = 'processing'
         sheet.add_processing_log('ocr', 'started')
+        exam_id = ref_id(sheet, 'exam_id')
+        ProgressService.publish(exam_id, 'sheet_started', sheet_id=answer_sheet_id, stage='ocr')
 
         try:
             # Resolve absolute file path
@@ -58,13 +74,24 @@ class GradingService:
             print(f"[GradingService] Provider: {current_app.config.get('VISION_PROVIDER')}")
 
             # Run OCR — returns list of per-page results
-            page_results = OCRService.extract_text(abs_path)
+            def on_page(page):
+                ProgressService.publish(
+                    exam_id, 'page_done', sheet_id=answer_sheet_id,
+                    page_number=page['page_number'], cached=bool(page.get('cached')),
+                    error=page.get('error')
+                )
+                GradingRunService.touch(run_id)
+
+            page_results = OCRService.extract_text(
+                abs_path, on_page=on_page, before_page=lambda: GradingRunService.check(run_id)
+            )
 
             # Store per-page OCR results
             ocr_entries = []
             total_chars = 0
+            failed_pages = [p['page_number'] for p in page_results if p.get('error')]
             for page in page_results:
-                entry = OCRResult(
+                entry = OCRPage(
                     page_number=page['page_number'],
                     text=page['text'],
                     confidence=page['confidence'],
@@ -73,15 +100,25 @@ class GradingService:
                 ocr_entries.append(entry)
                 total_chars += len(page['text'])
 
-            sheet.ocr_results = ocr_entries
+            sheet.save_ocr_pages(ocr_entries)
             sheet.original_file.pages = len(page_results)
             sheet.status = 'ocr_completed'
-            sheet.add_processing_log('ocr', 'completed', {
+            log_details = {
                 'pages': len(page_results),
                 'total_characters': total_chars
-            })
+            }
+            if failed_pages:
+                log_details['failed_pages'] = failed_pages
+            cached_pages = sum(1 for p in page_results if p.get('cached'))
+            if cached_pages:
+                log_details['cached_pages'] = cached_pages
+            sheet.add_processing_log('ocr', 'completed', log_details, flush=False)
+            sheet.flush_updates('original_file.pages')
 
             print(f"[GradingService] OCR completed: {len(page_results)} page(s), {total_chars} chars")
+            ProgressService.publish(exam_id, 'sheet_finished', sheet_id=answer_sheet_id, stage='ocr',
+                                    status='ocr_completed', pages=len(page_results))
+            GradingRunService.record_sheet(run_id, answer_sheet_id, stage='ocr')
 
             return {
                 'answer_sheet_id': str(sheet.id),
@@ -90,10 +127,21 @@ class GradingService:
                 'text_length': total_chars
             }
 
+        except RunCancelled:
+            print(f"[GradingService] OCR cancelled for {answer_sheet_id}")
+            sheet.status = 'uploaded' if previous_status == 'processing' else previous_status
+            sheet.add_processing_log('ocr', 'cancelled')
+            ProgressService.publish(exam_id, 'sheet_finished', sheet_id=answer_sheet_id, stage='ocr',
+                                    status='cancelled')
+            return {'answer_sheet_id': str(sheet.id), 'status': 'cancelled'}
+
         except Exception as e:
             print(f"[GradingService] OCR FAILED for {answer_sheet_id}: {str(e)}")
             sheet.status = 'failed'
             sheet.add_processing_log('ocr', 'failed', {'error': str(e)})
+            ProgressService.publish(exam_id, 'sheet_finished', sheet_id=answer_sheet_id, stage='ocr',
+                                    status='failed', error=str(e))
+            GradingRunService.record_sheet(run_id, answer_sheet_id, failed=True, stage='ocr')
             return {
                 'answer_sheet_id': str(sheet.id),
                 'status': 'failed',
@@ -101,48 +149,147 @@ class GradingService:
             }
 
     @staticmethod
-    def process_exam_sheets(exam_id: str) -> dict:
+    def process_exam_sheets(exam_id: str, run_id=None, sheet_ids: list = None) -> dict:
         """
         Run OCR on all uploaded answer sheets for an exam.
 
+        Args:
+            exam_id: Exam to process
+            run_id: GradingRun recording progress (cancellable/resumable)
+            sheet_ids: Sheets to process (default: uploaded + failed sheets)
+
         Returns:
-            dict with processed, failed counts and per-sheet results
+            dict with processed, failed, cancelled counts and per-sheet results
         """
         exam = Exam.objects(id=exam_id).first()
         if not exam:
             raise NotFoundError(f"Exam {exam_id} not found")
 
-        sheets = AnswerSheet.objects(exam_id=exam, status__in=['uploaded', 'failed'])
-        print(f"[GradingService] Found {sheets.count()} sheets to process (uploaded + failed)")
+        if sheet_ids is None:
+            sheet_ids = [str(i) for i in AnswerSheet.objects(
+                exam_id=exam, status__in=['uploaded', 'failed']).scalar('id')]
+        print(f"[GradingService] Found {len(sheet_ids)} sheets to process (uploaded + failed)")
+        ProgressService.publish(exam.id, 'run_started', stage='ocr', total=len(sheet_ids))
         results = []
-        processed = 0
-        failed = 0
-
-        for sheet in sheets:
-            result = GradingService.process_answer_sheet(str(sheet.id))
-            results.append(result)
-            if result['status'] == 'ocr_completed':
-                processed += 1
-            else:
-                failed += 1
-
-        return {
+
+        for sheet_id in sheet_ids:
+            results.append(GradingService.process_answer_sheet(sheet_id, run_id=run_id))
+
+        processed = sum(1 for r in results if r['status'] == 'ocr_completed')
+        cancelled = sum(1 for r in results if r['status'] == 'cancelled')
+        failed = len(results) - processed - cancelled
+        ProgressService.publish(exam.id, 'run_finished', stage='ocr', total=len(results),
+                                processed=processed, failed=failed, cancelled=cancelled)
+        summary = {
             'exam_id': exam_id,
             'total': len(results),
             'processed': processed,
             'failed': failed,
+            'cancelled': cancelled,
             'results': results
         }
+        GradingRunService.finish(run_id, summary)
+        return summary
+
+    @staticmethod
+    def process_and_grade_exam(exam_id: str, force: bool = False, run_id=None,
+                               sheet_ids: list = None) -> dict:
+        """
+        Pipelined OCR → grading for an exam.
+
+        Each sheet is handed to the grading stage as soon as its own OCR
+        finishes, so the vision and text models work side by side instead
+        of grading waiting for the whole exam's OCR. Each stage is a
+        bounded pool sized from its provider's limit. Sheets that already
+        have OCR text go straight to grading (incremental, see
+        grade_answer_sheet). run_id / sheet_ids restrict the run to given
+        sheets and record it, as in grade_exam_sheets.
+
+        Returns:
+            grading summary (see summarize_grading) plus ocr_processed /
+            ocr_failed / ocr_cancelled
+        """
+        exam = Exam.objects(id=exam_id).first()
+        if not exam:
+            raise NotFoundError(f"Exam {exam_id} not found")
+
+        sheets = AnswerSheet.objects(exam_id=exam)
+        if sheet_ids is not None:
+            sheets = sheets.filter(id__in=sheet_ids)
+        ocr_ids = [str(i) for i in sheets.filter(status__in=['uploaded', 'failed']).scalar('id')]
+        ready_ids = [str(i) for i in sheets.filter(status__in=['ocr_completed', 'graded']).scalar('id')]
+        print(f"[GradingService] Pipeline: {len(ocr_ids)} sheet(s) to OCR, {len(ready_ids)} ready to grade")
+        ProgressService.publish(exam.id, 'run_started', stage='pipeline', total=len(ocr_ids) + len(ready_ids))
+
+        app = current_app._get_current_object()
+
+        def in_context(func, sheet_id, failed_status, **kwargs):
+            # Worker threads need their own app context to read config
+            with app.app_context():
+                try:
+                    return func(sheet_id, **kwargs)
+                except Exception as e:
+                    print(f"[GradingService] Sheet {sheet_id} error: {str(e)}")
+                    return {'answer_sheet_id': sheet_id, 'status': failed_status, 'error': str(e)}
+
+        vision_provider = current_app.config.get('VISION_PROVIDER', 'ollama')
+        llm_provider = current_app.config.get('LLM_PROVIDER', 'ollama')
+        ocr_workers = max(1, min(ProviderLimiter.limit_for('vision', vision_provider), len(ocr_ids)))
+        grading_workers = max(1, min(ProviderLimiter.limit_for('llm', llm_provider),
+                                     len(ocr_ids) + len(ready_ids)))
+
+        ocr_results = []
+        grading_futures = []
+        with ThreadPoolExecutor(max_workers=grading_workers) as grading_pool:
+            def grade(sheet_id):
+                grading_futures.append(grading_pool.submit(
+                    in_context, GradingService.grade_answer_sheet, sheet_id, 'failed',
+                    force=force, run_id=run_id
+                ))
+
+            for sheet_id in ready_ids:
+                grade(sheet_id)
+
+            with ThreadPoolExecutor(max_workers=ocr_workers) as ocr_pool:
+                ocr_futures = [
+                    ocr_pool.submit(in_context, GradingService.process_answer_sheet, sheet_id, 'failed',
+                                    run_id=run_id)
+                    for sheet_id in ocr_ids
+                ]
+                for future in as_completed(ocr_futures):
+                    result = future.result()
+                    ocr_results.append(result)
+                    if result['status'] == 'ocr_completed':
+                        grade(result['answer_sheet_id'])
+
+            grading_results = [future.result() for future in grading_futures]
+
+        summary = GradingService.summarize_grading(exam_id, grading_results)
+        summary['ocr_processed'] = sum(1 for r in ocr_results if r['status'] == 'ocr_completed')
+        summary['ocr_cancelled'] = sum(1 for r in ocr_results if r['status'] == 'cancelled')
+        summary['ocr_failed'] = len(ocr_results) - summary['ocr_processed'] - summary['ocr_cancelled']
+        GradingRunService.finish(run_id, summary)
+        return summary
 
     # ------------------------------------------------------------------
     # LLM Grading (Sprint 5)
     # ------------------------------------------------------------------
 
     @staticmethod
-    def grade_answer_sheet(answer_sheet_id: str) -> dict:
+    def grade_answer_sheet(answer_sheet_id: str, force: bool = False, run_id=None) -> dict:
         """
         Grade a single OCR-completed answer sheet using the LLM.
 
+        Grading is incremental: a sheet whose OCR text and exam rubric match
+        its last successful grade is skipped, and within a changed sheet only
+        questions whose inputs changed are re-graded (unchanged questions,
+        including teacher overrides, are kept). force=True re-grades every
+        question and bypasses cached grading results.
+
+        Within a grading run (run_id) each graded question is checkpointed,
+        a cancelled run stops the sheet before its next LLM call, and a
+        resumed sheet reuses its checkpointed questions.
+
         Steps:
             1. Load the answer sheet (must be ocr_completed)
             2. Load the exam and its parsed model answers
@@ -151,6 +298,9 @@ class GradingService:
             5. Create/update Evaluation document
             6. Update sheet status to 'graded'
         """
+        if run_id and GradingRunService.is_cancelled(run_id):
+            return {'answer_sheet_id': answer_sheet_id, 'status': 'cancelled'}
+
         sheet = AnswerSheet.objects(id=answer_sheet_id).first()
         if not sheet:
             raise NotFoundError(f"Answer sheet {answer_sheet_id} not found")
@@ -160,7 +310,7 @@ class GradingService:
                 f"Sheet must be OCR-completed before grading. Current status: {sheet.status}"
             )
 
-        exam = Exam.objects(id=sheet.exam_id.id).first()
+        exam = Exam.objects(id=ref_id(sheet, 'exam_id')).first()
         if not exam:
             raise NotFoundError("Exam not found for this answer sheet")
 
@@ -183,26 +333,86 @@ class GradingService:
         ]
 
         # Concatenate OCR text from all pages
-        ocr_text = '\n'.join(
-            ocr.text for ocr in (sheet.ocr_results or []) if ocr.text
-        )
+        ocr_text = sheet.load_ocr_text()
 
         if not ocr_text.strip():
             raise ValidationError("No OCR text available for grading.")
 
         strictness = 'moderate'
+        grading_mode = 'per_question'
         if exam.grading_config:
             strictness = exam.grading_config.strictness or 'moderate'
+            grading_mode = exam.grading_config.grading_mode or 'per_question'
+
+        evaluation = Evaluation.objects(answer_sheet_id=sheet).first()
+
+        # Status to go back to if the run is cancelled mid-sheet. The run
+        # start marks sheets 'processing', so look up what they were before.
+        previous_status = sheet.status
+        if previous_status == 'processing':
+            previous_status = GradingRunService.status_before(run_id, answer_sheet_id)
+        if previous_status not in ('ocr_completed', 'graded'):
+            graded = evaluation is not None and evaluation.status in ('completed', 'overridden')
+            previous_status = 'graded' if graded else 'ocr_completed'
+
+        fingerprint = LLMService.sheet_fingerprint(
+            ocr_text, parsed_answers, strictness, grading_mode, exam.max_marks
+        )
+
+        if (not force and evaluation and evaluation.status in ('completed', 'overridden')
+                and evaluation.input_fingerprint == fingerprint):
+            print(f"[GradingService] Sheet {answer_sheet_id} unchanged since last grade, skipping")
+            if sheet.status != 'graded':
+                sheet.status = 'graded'
+                sheet.flush_updates()
+            ProgressService.publish(exam.id, 'sheet_finished', sheet_id=answer_sheet_id, stage='grading',
+                                    status='graded', skipped=True, percentage=evaluation.percentage)
+            GradingRunService.record_sheet(run_id, answer_sheet_id)
+            return {
+                'answer_sheet_id': str(sheet.id),
+                'status': 'graded',
+                'skipped': True,
+                'total_marks_awarded': evaluation.total_marks_awarded,
+                'total_max_marks': evaluation.total_max_marks,
+                'percentage': evaluation.percentage,
+                'questions_graded': 0,
+                'evaluation_id': str(evaluation.id),
+            }
+
+        previous_evals = {}
+        if evaluation and not force:
+            previous_evals = {
+                qe.question_number: qe
+                for qe in (evaluation.question_evaluations or [])
+                if qe.input_fingerprint
+            }
 
         sheet.add_processing_log('grading', 'started')
-        print(f"[GradingService] Grading sheet {answer_sheet_id} ({len(parsed_answers)} questions, strictness={strictness})")
+        print(f"[GradingService] Grading sheet {answer_sheet_id} ({len(parsed_answers)} questions, strictness={strictness}, mode={grading_mode})")
+        ProgressService.publish(exam.id, 'sheet_started', sheet_id=answer_sheet_id, stage='grading',
+                                questions=len(parsed_answers))
+
+        def on_result(r):
+            ProgressService.publish(
+                exam.id, 'question_graded', sheet_id=answer_sheet_id,
+                question_number=r['question_number'],
+                marks_awarded=r.get('marks_awarded'), max_marks=r.get('max_marks')
+            )
+            GradingRunService.record_question(run_id, answer_sheet_id, r)
 
         try:
-            # Call LLM for each question
+            # Call LLM for each question whose inputs changed
             llm_results = LLMService.grade_full_sheet(
                 ocr_text=ocr_text,
                 parsed_answers=parsed_answers,
                 strictness=strictness,
+                mode=grading_mode,
+                exam_id=exam.id,
+                use_cache=not force,
+                previous={n: qe.input_fingerprint for n, qe in previous_evals.items()},
+                completed=GradingRunService.question_checkpoint(run_id, answer_sheet_id),
+                on_result=on_result,
+                before_call=lambda: GradingRunService.check(run_id),
             )
 
             # Build evaluation
@@ -212,21 +422,26 @@ class GradingService:
             total_confidence = 0.0
 
             for r in llm_results:
-                qe = QuestionEvaluation(
-                    question_number=r['question_number'],
-                    max_marks=r['max_marks'],
-                    marks_awarded=r['marks_awarded'],
-                    feedback=r['feedback'],
-                    confidence=r['confidence'],
-                    keywords_found=r.get('keywords_found', []),
-                    keywords_missing=r.get('keywords_missing', []),
-                    concepts_covered=r.get('concepts_covered', []),
-                    concepts_missing=r.get('concepts_missing', []),
-                )
+                if r.get('unchanged'):
+                    qe = previous_evals[r['question_number']]
+                else:
+                    qe = QuestionEvaluation(
+                        question_number=r['question_number'],
+                        max_marks=r['max_marks'],
+                        marks_awarded=r['marks_awarded'],
+                        feedback=r['feedback'],
+                        confidence=r['confidence'],
+                        keywords_found=r.get('keywords_found', []),
+                        keywords_missing=r.get('keywords_missing', []),
+                        concepts_covered=r.get('concepts_covered', []),
+                        concepts_missing=r.get('concepts_missing', []),
+                        # Unparseable replies get no fingerprint so the next run retries them
+                        input_fingerprint=None if r.get('parse_failed') else r.get('input_fingerprint'),
+                    )
                 question_evals.append(qe)
-                total_awarded += r['marks_awarded']
-                total_max += r['max_marks']
-                total_confidence += r['confidence']
+                total_awarded += qe.marks_awarded
+                total_max += qe.max_marks
+                total_confidence += qe.confidence
 
             # Use exam max_marks for percentage so stats match exam configuration
             exam_max = exam.max_marks or total_max
@@ -234,7 +449,7 @@ class GradingService:
             avg_confidence = (total_confidence / len(llm_results)) if llm_results else 0.0
 
             # Create or update Evaluation document
-            evaluation = Evaluation.objects(answer_sheet_id=sheet).first()
+            previous_score = counted_score(evaluation)
             if not evaluation:
                 evaluation = Evaluation(
                     answer_sheet_id=sheet,
@@ -250,9 +465,15 @@ class GradingService:
                 percentage, total_awarded, total_max
             )
             evaluation.strictness = strictness
-            evaluation.status = 'completed'
+            evaluation.input_fingerprint = (
+                fingerprint if all(qe.input_fingerprint for qe in question_evals) else None
+            )
+            evaluation.status = (
+                'overridden' if any(qe.override_applied for qe in question_evals) else 'completed'
+            )
             evaluation.graded_at = datetime.utcnow()
             evaluation.save()
+            StatisticsService.record_score(exam.id, previous_score, counted_score(evaluation))
 
             # Update sheet status
             sheet.status = 'graded'
@@ -260,10 +481,15 @@ class GradingService:
                 'total_marks': total_awarded,
                 'max_marks': total_max,
                 'percentage': round(percentage, 2),
-                'questions_graded': len(llm_results),
+                'questions_graded': sum(1 for r in llm_results if not r.get('unchanged')),
+                'unchanged_questions': sum(1 for r in llm_results if r.get('unchanged')),
+                'cached_questions': sum(1 for r in llm_results if r.get('cached')),
             })
 
             print(f"[GradingService] Grading complete: {total_awarded}/{total_max} ({percentage:.1f}%)")
+            ProgressService.publish(exam.id, 'sheet_finished', sheet_id=answer_sheet_id, stage='grading',
+                                    status='graded', percentage=round(percentage, 2))
+            GradingRunService.record_sheet(run_id, answer_sheet_id)
 
             return {
                 'answer_sheet_id': str(sheet.id),
@@ -271,16 +497,28 @@ class GradingService:
                 'total_marks_awarded': round(total_awarded, 2),
                 'total_max_marks': round(total_max, 2),
                 'percentage': round(percentage, 2),
-                'questions_graded': len(llm_results),
+                'questions_graded': sum(1 for r in llm_results if not r.get('unchanged')),
                 'evaluation_id': str(evaluation.id),
             }
 
+        except RunCancelled:
+            # Questions graded so far stay checkpointed for a resume
+            print(f"[GradingService] Grading cancelled for {answer_sheet_id}")
+            sheet.status = previous_status
+            sheet.add_processing_log('grading', 'cancelled')
+            ProgressService.publish(exam.id, 'sheet_finished', sheet_id=answer_sheet_id, stage='grading',
+                                    status='cancelled')
+            return {'answer_sheet_id': str(sheet.id), 'status': 'cancelled'}
+
         except Exception as e:
             print(f"[GradingService] GRADING FAILED for {answer_sheet_id}: {str(e)}")
             import traceback
             traceback.print_exc()
             sheet.status = 'failed'
             sheet.add_processing_log('grading', 'failed', {'error': str(e)})
+            ProgressService.publish(exam.id, 'sheet_finished', sheet_id=answer_sheet_id, stage='grading',
+                                    status='failed', error=str(e))
+            GradingRunService.record_sheet(run_id, answer_sheet_id, failed=True)
             return {
                 'answer_sheet_id': str(sheet.id),
                 'status': 'failed',
@@ -288,59 +526,79 @@ class GradingService:
             }
 
     @staticmethod
-    def grade_exam_sheets(exam_id: str) -> dict:
+    def grade_exam_sheets(exam_id: str, force: bool = False, run_id=None,
+                          sheet_ids: list = None) -> dict:
         """
         Grade all OCR-completed answer sheets for an exam.
+
+        Already-graded sheets are re-checked incrementally (see
+        grade_answer_sheet); force=True re-grades every sheet in full.
+
+        Args:
+            run_id: GradingRun recording progress; closed when all sheets report back
+            sheet_ids: Sheets to grade (default: gradable_sheet_ids)
         """
         exam = Exam.objects(id=exam_id).first()
         if not exam:
             raise NotFoundError(f"Exam {exam_id} not found")
 
+        if sheet_ids is None:
+            sheet_ids = GradingService.gradable_sheet_ids(exam)
+        print(f"[GradingService] Found {len(sheet_ids)} sheets to grade")
+        ProgressService.publish(exam.id, 'run_started', stage='grading', total=len(sheet_ids))
+
+        app = current_app._get_current_object()
+
+        def grade_one(sheet_id):
+            # Worker threads need their own app context to read config
+            with app.app_context():
+                try:
+                    return GradingService.grade_answer_sheet(sheet_id, force=force, run_id=run_id)
+                except Exception as e:
+                    print(f"[GradingService] Sheet {sheet_id} error: {str(e)}")
+                    return {
+                        'answer_sheet_id': sheet_id,
+                        'status': 'failed',
+                        'error': str(e),
+                    }
+
+        # Sheets run side by side; LLM calls from all of them share the
+        # provider limit, so this only keeps the provider's slots busy.
+        provider = current_app.config.get('LLM_PROVIDER', 'ollama')
+        workers = max(1, min(ProviderLimiter.limit_for('llm', provider), len(sheet_ids)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(grade_one, sheet_ids))
+
+        summary = GradingService.summarize_grading(exam_id, results)
+        GradingRunService.finish(run_id, summary)
+        return summary
+
+    @staticmethod
+    def gradable_sheet_ids(exam) -> list:
+        """IDs of an exam's sheets that a grading run picks up."""
         sheets = AnswerSheet.objects(
             exam_id=exam,
             status__in=['ocr_completed', 'graded', 'failed', 'processing']
         )
-        print(f"[GradingService] Found {sheets.count()} sheets to grade")
+        return [str(sheet_id) for sheet_id in sheets.scalar('id')]
 
-        results = []
-        graded = 0
-        failed = 0
-
-        for sheet in sheets:
-            try:
-                result = GradingService.grade_answer_sheet(str(sheet.id))
-                results.append(result)
-                if result['status'] == 'graded':
-                    graded += 1
-                else:
-                    failed += 1
-            except Exception as e:
-                print(f"[GradingService] Sheet {sheet.id} error: {str(e)}")
-                results.append({
-                    'answer_sheet_id': str(sheet.id),
-                    'status': 'failed',
-                    'error': str(e),
-                })
-                failed += 1
-
-        # Update exam statistics
-        all_evals = Evaluation.objects(exam_id=exam, status='completed')
-        if all_evals.count() > 0:
-            scores = [e.percentage for e in all_evals]
-            exam.update_statistics(
-                graded=all_evals.count(),
-                average_score=round(sum(scores) / len(scores), 2),
-                highest_score=round(max(scores), 2),
-                lowest_score=round(min(scores), 2),
-            )
-
-        return {
+    @staticmethod
+    def summarize_grading(exam_id: str, results: list) -> dict:
+        """Counts for a grading run from its per-sheet results; announces the run's end."""
+        graded = sum(1 for r in results if r['status'] == 'graded')
+        cancelled = sum(1 for r in results if r['status'] == 'cancelled')
+        summary = {
             'exam_id': exam_id,
             'total': len(results),
             'graded': graded,
-            'failed': failed,
+            'skipped': sum(1 for r in results if r.get('skipped')),
+            'cancelled': cancelled,
+            'failed': len(results) - graded - cancelled,
             'results': results,
         }
+        ProgressService.publish(exam_id, 'run_finished', stage='grading',
+                                **{k: v for k, v in summary.items() if k not in ('exam_id', 'results')})
+        return summary
 
     @staticmethod
     def _generate_overall_feedback(percentage: float, awarded: float, max_marks: float) -> str:
@@ -9,19 +9,43 @@ Supports 5 providers:
   - 'openrouter'  : OpenRouter API (cloud, free tier available)
   - 'groqcloud'   : Groq Cloud API (fast inference)
 
+Each sheet's OCR text is split into per-question answer spans before
+grading (see AnswerSegmenter), so a prompt only carries its own answer.
+Per-question results are cached (namespace 'grading') so re-grading an
+exam whose OCR text and model answers did not change makes no LLM calls.
+Questions are graded concurrently; every provider call takes a slot from
+ProviderLimiter, bounded by LLM_MAX_CONCURRENCY (or the per-provider default
+in PROVIDER_MAX_CONCURRENCY). With LLM_FALLBACK_PROVIDERS set, slow calls are
+hedged to, and failed calls retried on, the next provider (see ProviderChain).
+
 Configure via environment variables:
-  LLM_PROVIDER, LLM_API_URL, LLM_MODEL, OPENROUTER_API_KEY, GROQ_API_KEY
+  LLM_PROVIDER, LLM_API_URL, LLM_MODEL, OPENROUTER_API_KEY, GROQ_API_KEY,
+  SEGMENTATION_LLM_FALLBACK, LLM_MAX_CONCURRENCY, LLM_FALLBACK_PROVIDERS,
+  GRADING_CACHE_ENABLED
 """
 
 import json
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from flask import current_app
+from services.answer_segmenter import AnswerSegmenter
+from services.cache_service import CacheService
+from services.provider_chain import ProviderChain
+from services.provider_client import ProviderClient
+from services.provider_limiter import ProviderLimiter
 from utils.exceptions import ValidationError
 
 
+# Bump GRADING_PROMPT_VERSION whenever the grading prompts change so cached
+# results produced by the old prompts are no longer reused.
+GRADING_PROMPT_VERSION = 1
+
+
 class LLMService:
     """Grades student answers via a configurable LLM provider."""
 
+    CACHE_NAMESPACE = 'grading'
+
     # -----------------------------------------------------------------
     # Public API
     # -----------------------------------------------------------------
@@ -30,16 +54,18 @@ class LLMService:
     def grade_answer(student_text: str, model_answer: str, max_marks: float,
                      strictness: str = 'moderate',
                      keywords: list = None, concepts: list = None,
-                     question_number: int = 1) -> dict:
+                     question_number: int = 1, is_full_sheet: bool = True) -> dict:
         """
         Grade a single student answer against the model answer.
 
+        student_text is either the whole sheet (is_full_sheet=True, the LLM
+        locates the answer itself) or just this question's answer span.
+
         Returns dict:
             marks_awarded, max_marks, feedback, confidence,
             keywords_found, keywords_missing, concepts_covered, concepts_missing
         """
         provider = current_app.config.get('LLM_PROVIDER', 'ollama')
-        api_url = current_app.config.get('LLM_API_URL')
         model = current_app.config.get('LLM_MODEL')
 
         prompt = LLMService._build_grading_prompt(
@@ -50,54 +76,268 @@ class LLMService:
             keywords=keywords or [],
             concepts=concepts or [],
             question_number=question_number,
+            is_full_sheet=is_full_sheet,
         )
 
         print(f"[LLMService] Grading Q{question_number} via {provider} ({model})")
-
-        if provider == 'groqcloud':
-            api_key = current_app.config.get('GROQ_API_KEY')
-            groq_model = current_app.config.get('GROQ_LLM_MODEL', model)
-            raw = LLMService._call_groqcloud(groq_model, prompt, api_key)
-        elif provider == 'openrouter':
-            api_key = current_app.config.get('OPENROUTER_API_KEY')
-            raw = LLMService._call_openrouter(api_url, model, prompt, api_key)
-        elif provider == 'openai':
-            raw = LLMService._call_openai(api_url, model, prompt)
-        elif provider == 'lmstudio':
-            raw = LLMService._call_lmstudio(api_url, model, prompt)
-        else:
-            raw = LLMService._call_ollama(api_url, model, prompt)
+        raw = LLMService._complete(prompt)
 
         return LLMService._parse_grading_response(raw, max_marks, keywords or [], concepts or [])
 
     @staticmethod
     def grade_full_sheet(ocr_text: str, parsed_answers: list,
-                         strictness: str = 'moderate') -> list:
+                         strictness: str = 'moderate',
+                         mode: str = 'per_question',
+                         exam_id=None, use_cache: bool = True,
+                         previous: dict = None, completed: dict = None,
+                         on_result=None, before_call=None) -> list:
         """
         Grade all questions for a single answer sheet.
 
+        The OCR text is split into per-question answer spans once, so each
+        prompt carries only its own answer. Questions that cannot be located
+        are graded against the full sheet as before.
+
+        In 'batched' mode all questions are graded in one LLM call; only
+        questions missing or malformed in that reply are re-graded one by one.
+
+        Results are cached per question, keyed on the answer span, the model
+        answer and rubric, strictness, grading mode and the provider/model. use_cache=False
+        skips the lookup but still refreshes the stored results. That key is
+        returned as each result's input_fingerprint; questions whose
+        fingerprint matches `previous` are not graded at all.
+
         Args:
             ocr_text: Full OCR-extracted text (all pages concatenated)
             parsed_answers: list of dict with question_number, max_marks, answer_text, keywords, concepts
             strictness: 'lenient', 'moderate', or 'strict'
+            mode: 'per_question' (one call per question) or 'batched' (one call per sheet)
+            exam_id: Owning exam, so its cached results can be invalidated
+            use_cache: False to bypass cached results (force re-grade)
+            previous: {question_number: input_fingerprint} from the last grade
+            completed: {question_number: result} checkpointed by an interrupted
+                attempt; reused (marked 'resumed') if its fingerprint still matches
+            on_result: Optional callback, called with each freshly graded
+                question's result as it completes (may run on a worker thread)
+            before_call: Optional callback, called before each provider
+                request; may raise to stop grading the sheet
 
         Returns:
-            list of per-question result dicts
+            list of per-question result dicts in question order; cached ones
+            carry 'cached': True, unchanged ones only question_number,
+            input_fingerprint and 'unchanged': True
         """
-        results = []
+        segments = LLMService.segment_sheet(
+            ocr_text, [pa.get('question_number', 1) for pa in parsed_answers], use_cache=use_cache,
+            before_call=before_call
+        )
+
+        # The fingerprint covers every grading input of a question; it is both
+        # the cache key and what incremental re-grading compares against.
+        cache_scope = LLMService._cache_scope()
+        fingerprints = {}
         for pa in parsed_answers:
-            result = LLMService.grade_answer(
-                student_text=ocr_text,
-                model_answer=pa.get('answer_text', ''),
-                max_marks=pa.get('max_marks', 0),
-                strictness=strictness,
-                keywords=pa.get('keywords', []),
-                concepts=pa.get('concepts', []),
-                question_number=pa.get('question_number', 1),
+            question_number = pa.get('question_number', 1)
+            span = segments.get(question_number)
+            fingerprints[question_number] = CacheService.make_key(
+                str(exam_id) if exam_id else None,
+                ocr_text if span is None else span,
+                span is None,
+                pa.get('answer_text', ''),
+                pa.get('keywords', []),
+                pa.get('concepts', []),
+                pa.get('max_marks', 0),
+                strictness,
+                mode,
+                *cache_scope
             )
-            results.append(result)
+
+        results = {}
+        for question_number, fingerprint in (previous or {}).items():
+            if fingerprints.get(question_number) == fingerprint:
+                results[question_number] = {
+                    'question_number': question_number,
+                    'input_fingerprint': fingerprint,
+                    'unchanged': True,
+                }
+        if results:
+            print(f"[LLMService] {len(results)}/{len(parsed_answers)} question(s) unchanged since last grade")
+
+        cache_enabled = current_app.config.get('GRADING_CACHE_ENABLED', True)
+        if cache_enabled and use_cache:
+            hits = 0
+            for question_number, fingerprint in fingerprints.items():
+                if question_number in results:
+                    continue
+                cached = CacheService.get(LLMService.CACHE_NAMESPACE, fingerprint)
+                if cached is not None:
+                    results[question_number] = dict(cached, question_number=question_number,
+                                                    input_fingerprint=fingerprint, cached=True)
+                    hits += 1
+            if hits:
+                print(f"[LLMService] {hits}/{len(parsed_answers)} question(s) served from cache")
+
+        resumed = 0
+        for question_number, result in (completed or {}).items():
+            if question_number not in results and result.get('input_fingerprint') == fingerprints.get(question_number):
+                results[question_number] = dict(result, question_number=question_number, resumed=True)
+                resumed += 1
+        if resumed:
+            print(f"[LLMService] {resumed}/{len(parsed_answers)} question(s) resumed from checkpoint")
+
+        pending = [pa for pa in parsed_answers if pa.get('question_number', 1) not in results]
+
+        batched = {}
+        if mode == 'batched' and len(pending) > 1:
+            if before_call:
+                before_call()
+            batched = LLMService._grade_batch(ocr_text, pending, segments, strictness)
+
+        def grade_one(pa):
+            question_number = pa.get('question_number', 1)
+            if question_number in batched:
+                result = batched[question_number]
+            else:
+                if before_call:
+                    before_call()
+                span = segments.get(question_number)
+                result = LLMService.grade_answer(
+                    student_text=ocr_text if span is None else span,
+                    model_answer=pa.get('answer_text', ''),
+                    max_marks=pa.get('max_marks', 0),
+                    strictness=strictness,
+                    keywords=pa.get('keywords', []),
+                    concepts=pa.get('concepts', []),
+                    question_number=question_number,
+                    is_full_sheet=span is None,
+                )
+                result['question_number'] = question_number
+            # Unparseable replies are not cached so the next run retries them
+            if cache_enabled and not result.get('parse_failed'):
+                CacheService.put(LLMService.CACHE_NAMESPACE, fingerprints[question_number], result,
+                                 exam_id=exam_id)
+            result['input_fingerprint'] = fingerprints[question_number]
+            if on_result:
+                on_result(result)
+            return result
+
+        unbatched = [pa for pa in pending if pa.get('question_number', 1) not in batched]
+        provider = current_app.config.get('LLM_PROVIDER', 'ollama')
+        workers = min(ProviderLimiter.limit_for('llm', provider), len(unbatched))
+        if workers <= 1:
+            fresh = [grade_one(pa) for pa in pending]
+        else:
+            app = current_app._get_current_object()
+
+            def grade_in_context(pa):
+                # Worker threads need their own app context to read config
+                with app.app_context():
+                    return grade_one(pa)
+
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                fresh = list(pool.map(grade_in_context, pending))
+
+        for result in fresh:
+            results[result['question_number']] = result
+        return [results[pa.get('question_number', 1)] for pa in parsed_answers]
+
+    @staticmethod
+    def sheet_fingerprint(ocr_text: str, parsed_answers: list,
+                          strictness: str, mode: str, max_marks: float = None) -> str:
+        """
+        Hash of everything that affects a sheet's grade, for incremental grading.
+
+        max_marks is the exam total the sheet's percentage is computed against.
+        """
+        return CacheService.make_key(
+            ocr_text, parsed_answers, strictness, mode, max_marks, *LLMService._cache_scope()
+        )
+
+    @staticmethod
+    def invalidate_cache(exam_id) -> int:
+        """Drop cached grading results for an exam (model answers or config changed)."""
+        return CacheService.invalidate(LLMService.CACHE_NAMESPACE, exam_id)
+
+    @staticmethod
+    def _cache_scope() -> tuple:
+        """Provider, model and prompt version that produced a grading result."""
+        provider = current_app.config.get('LLM_PROVIDER', 'ollama')
+        model = current_app.config.get('LLM_MODEL')
+        if provider == 'groqcloud':
+            model = current_app.config.get('GROQ_LLM_MODEL', model)
+        return provider, model, GRADING_PROMPT_VERSION
+
+    @staticmethod
+    def _grade_batch(ocr_text: str, parsed_answers: list, segments: dict,
+                     strictness: str) -> dict:
+        """
+        Grade every question in one LLM call.
+
+        Returns {question_number: result} for the questions the reply graded
+        validly; a failed call returns {} so every question is graded singly.
+        """
+        provider = current_app.config.get('LLM_PROVIDER', 'ollama')
+        model = current_app.config.get('LLM_MODEL')
+
+        prompt = LLMService._build_batch_grading_prompt(ocr_text, parsed_answers, segments, strictness)
+
+        print(f"[LLMService] Grading {len(parsed_answers)} question(s) in one call via {provider} ({model})")
+        try:
+            raw = LLMService._complete(prompt)
+        except ValidationError as e:
+            print(f"[LLMService] Batched grading failed, grading per question: {e}")
+            return {}
+
+        results = LLMService._parse_batch_grading_response(raw, parsed_answers)
+        missing = [pa.get('question_number', 1) for pa in parsed_answers
+                   if pa.get('question_number', 1) not in results]
+        if missing:
+            print(f"[LLMService] Batched reply missing/malformed for Q{missing}; grading those per question")
         return results
 
+    @staticmethod
+    def segment_sheet(ocr_text: str, question_numbers: list, use_cache: bool = True,
+                      before_call=None) -> dict:
+        """
+        Map question_number → the student's answer text for that question.
+
+        Uses local label matching first; only when some questions cannot be
+        located is the LLM asked to segment the sheet (reply cached like
+        grading results). Questions still missing are left out of the result.
+        before_call is called before that LLM request and may raise to stop.
+        """
+        segments, missing = AnswerSegmenter.segment(ocr_text, question_numbers)
+
+        if missing and ocr_text.strip() and current_app.config.get('SEGMENTATION_LLM_FALLBACK', True):
+            print(f"[LLMService] Labels not found for Q{missing}; asking LLM to segment sheet")
+            cache_enabled = current_app.config.get('GRADING_CACHE_ENABLED', True)
+            cache_key = CacheService.make_key(
+                'segmentation', ocr_text, sorted(question_numbers), *LLMService._cache_scope()
+            )
+            cached = CacheService.get(LLMService.CACHE_NAMESPACE, cache_key) if cache_enabled and use_cache else None
+            if cached is None and before_call:
+                before_call()
+            try:
+                if cached is not None:
+                    llm_segments = {int(n): text for n, text in cached.get('answers', {}).items()}
+                else:
+                    raw = LLMService._complete(
+                        LLMService._build_segmentation_prompt(ocr_text, question_numbers)
+                    )
+                    llm_segments = LLMService._parse_segmentation_response(raw)
+                    if cache_enabled and llm_segments:
+                        CacheService.put(LLMService.CACHE_NAMESPACE, cache_key, {
+                            'answers': {str(n): text for n, text in llm_segments.items()}
+                        })
+                for number in missing:
+                    if number in llm_segments:
+                        segments[number] = llm_segments[number]
+            except Exception as e:
+                print(f"[LLMService] LLM segmentation failed: {e}")
+
+        print(f"[LLMService] Segmented sheet: {len(segments)}/{len(question_numbers)} question(s) located")
+        return segments
+
     @staticmethod
     def parse_model_answer_text(ocr_text: str, max_marks: float = 100.0) -> list:
         """
@@ -108,7 +348,6 @@ class LLMService:
             [{question_number, max_marks, answer_text, keywords[], concepts[]}, ...]
         """
         provider = current_app.config.get('LLM_PROVIDER', 'ollama')
-        api_url = current_app.config.get('LLM_API_URL')
         model = current_app.config.get('LLM_MODEL')
 
         prompt = f"""You are an expert educational content parser. Analyze the following text extracted from a model answer PDF.
@@ -139,20 +378,7 @@ RESPOND IN EXACTLY THIS JSON FORMAT (no extra text before or after):
 }}"""
 
         print(f"[LLMService] Parsing model answer text via {provider} ({model})")
-
-        if provider == 'groqcloud':
-            api_key = current_app.config.get('GROQ_API_KEY')
-            groq_model = current_app.config.get('GROQ_LLM_MODEL', model)
-            raw = LLMService._call_groqcloud(groq_model, prompt, api_key)
-        elif provider == 'openrouter':
-            api_key = current_app.config.get('OPENROUTER_API_KEY')
-            raw = LLMService._call_openrouter(api_url, model, prompt, api_key)
-        elif provider == 'openai':
-            raw = LLMService._call_openai(api_url, model, prompt)
-        elif provider == 'lmstudio':
-            raw = LLMService._call_lmstudio(api_url, model, prompt)
-        else:
-            raw = LLMService._call_ollama(api_url, model, prompt)
+        raw = LLMService._complete(prompt)
 
         return LLMService._parse_model_answer_response(raw, ocr_text, max_marks)
 
@@ -207,7 +433,7 @@ RESPOND IN EXACTLY THIS JSON FORMAT (no extra text before or after):
     def _build_grading_prompt(student_text: str, model_answer: str,
                                max_marks: float, strictness: str,
                                keywords: list, concepts: list,
-                               question_number: int) -> str:
+                               question_number: int, is_full_sheet: bool = True) -> str:
 
         strictness_guide = {
             'lenient': "Be generous with partial credit. Award marks if the student shows understanding even with minor errors or missing details.",
@@ -215,6 +441,24 @@ RESPOND IN EXACTLY THIS JSON FORMAT (no extra text before or after):
             'strict': "Be rigorous. Only award marks for precise, complete, and accurate answers. Deduct points for any inaccuracies.",
         }
 
+        if is_full_sheet:
+            student_section = f"""STUDENT'S FULL ANSWER SHEET (extracted via OCR from handwritten sheet):
+{student_text}
+
+INSTRUCTIONS:
+1. From the student's full answer sheet above, identify and extract ONLY the answer for Question {question_number}.
+   Look for labels like "Q{question_number}", "Ans {question_number}", "{question_number}.", "{question_number})" etc.
+   If no clear label exists, use context to determine which section answers Question {question_number}.
+2. Compare the identified student answer with the model answer."""
+        else:
+            student_section = f"""STUDENT'S ANSWER FOR QUESTION {question_number} (extracted via OCR from handwritten sheet):
+{student_text.strip() or '(no answer written)'}
+
+INSTRUCTIONS:
+1. The text above is the student's answer for Question {question_number}. It may include the question label
+   or a few words from a neighbouring answer; ignore anything that does not answer Question {question_number}.
+2. Compare the student answer with the model answer."""
+
         prompt = f"""You are an expert exam grader. Grade the following student answer for Question {question_number}.
 
 GRADING STRICTNESS: {strictness.upper()}
@@ -228,14 +472,7 @@ MODEL ANSWER:
 KEYWORDS TO CHECK: {', '.join(keywords) if keywords else 'None specified'}
 CONCEPTS TO CHECK: {', '.join(concepts) if concepts else 'None specified'}
 
-STUDENT'S FULL ANSWER SHEET (extracted via OCR from handwritten sheet):
-{student_text}
-
-INSTRUCTIONS:
-1. From the student's full answer sheet above, identify and extract ONLY the answer for Question {question_number}.
-   Look for labels like "Q{question_number}", "Ans {question_number}", "{question_number}.", "{question_number})" etc.
-   If no clear label exists, use context to determine which section answers Question {question_number}.
-2. Compare the identified student answer with the model answer.
+{student_section}
 3. Check for presence of the listed keywords and concepts.
 4. Award marks out of {max_marks} based on correctness, completeness, and the strictness level.
 5. Provide brief, constructive feedback (max 100 words).
@@ -254,10 +491,132 @@ RESPOND IN EXACTLY THIS JSON FORMAT (no extra text before or after):
 }}"""
         return prompt
 
+    @staticmethod
+    def _build_batch_grading_prompt(ocr_text: str, parsed_answers: list,
+                                    segments: dict, strictness: str) -> str:
+
+        strictness_guide = {
+            'lenient': "Be generous with partial credit. Award marks if the student shows understanding even with minor errors or missing details.",
+            'moderate': "Award marks fairly. Give partial credit for partial understanding, but deduct for significant gaps or errors.",
+            'strict': "Be rigorous. Only award marks for precise, complete, and accurate answers. Deduct points for any inaccuracies.",
+        }
+
+        blocks = []
+        needs_sheet = False
+        for pa in parsed_answers:
+            question_number = pa.get('question_number', 1)
+            keywords = pa.get('keywords', [])
+            concepts = pa.get('concepts', [])
+            span = segments.get(question_number)
+            if span is None:
+                needs_sheet = True
+                student_answer = "(not located — find the answer for this question in the full answer sheet below)"
+            else:
+                student_answer = span.strip() or '(no answer written)'
+            blocks.append(f"""=== QUESTION {question_number} ===
+MAXIMUM MARKS: {pa.get('max_marks', 0)}
+
+MODEL ANSWER:
+{pa.get('answer_text', '')}
+
+KEYWORDS TO CHECK: {', '.join(keywords) if keywords else 'None specified'}
+CONCEPTS TO CHECK: {', '.join(concepts) if concepts else 'None specified'}
+
+STUDENT'S ANSWER (extracted via OCR from handwritten sheet):
+{student_answer}""")
+
+        sheet_section = ''
+        if needs_sheet:
+            sheet_section = f"""
+
+STUDENT'S FULL ANSWER SHEET (for questions whose answer was not located):
+{ocr_text}"""
+
+        numbers = ', '.join(str(pa.get('question_number', 1)) for pa in parsed_answers)
+
+        return f"""You are an expert exam grader. Grade the student's answers for Questions {numbers}.
+
+GRADING STRICTNESS: {strictness.upper()}
+{strictness_guide.get(strictness, strictness_guide['moderate'])}
+
+{chr(10).join(blocks)}{sheet_section}
+
+INSTRUCTIONS:
+1. Grade each question independently against its own model answer. Student answers may include the question
+   label or a few words from a neighbouring answer; ignore anything that does not answer that question.
+2. Check for presence of each question's keywords and concepts.
+3. Award marks out of that question's maximum based on correctness, completeness, and the strictness level.
+4. Provide brief, constructive feedback per question (max 100 words).
+5. Return exactly one result for every question listed above.
+
+RESPOND IN EXACTLY THIS JSON FORMAT (no extra text before or after):
+{{
+  "results": [
+    {{
+      "question_number": <question number>,
+      "marks_awarded": <number between 0 and that question's maximum marks>,
+      "max_marks": <that question's maximum marks>,
+      "feedback": "<brief constructive feedback>",
+      "confidence": <number between 0.0 and 1.0>,
+      "keywords_found": [<list of keywords found in student answer>],
+      "keywords_missing": [<list of keywords missing from student answer>],
+      "concepts_covered": [<list of concepts the student covered>],
+      "concepts_missing": [<list of concepts the student missed>]
+    }}
+  ]
+}}"""
+
+    @staticmethod
+    def _build_segmentation_prompt(ocr_text: str, question_numbers: list) -> str:
+        numbers = ', '.join(str(n) for n in question_numbers)
+        return f"""You are an exam assistant. The text below was extracted via OCR from a student's handwritten answer sheet.
+Split it into the student's answers for these questions: {numbers}.
+
+Look for labels like "Q1", "Question 1", "Ans 1", "1.", "1)". If labels are missing or unclear, use context.
+Copy each answer's text exactly as written. Use an empty string for a question the student did not answer.
+
+STUDENT'S ANSWER SHEET:
+{ocr_text}
+
+RESPOND IN EXACTLY THIS JSON FORMAT (no extra text before or after):
+{{
+  "answers": [
+    {{"question_number": 1, "answer_text": "<the student's answer for this question>"}}
+  ]
+}}"""
+
     # -----------------------------------------------------------------
     # Provider implementations
     # -----------------------------------------------------------------
 
+    @staticmethod
+    def _complete(prompt: str) -> str:
+        """Send a prompt to the LLM provider chain (hedged, with failover) and return the raw reply."""
+        return ProviderChain.call(
+            'llm', lambda entry: LLMService._dispatch(entry['provider'], prompt, entry['api_url'], entry['model'])
+        )
+
+    @staticmethod
+    def _dispatch(provider: str, prompt: str, api_url: str = None, model: str = None) -> str:
+        """Send a prompt to one provider (URL and model default to the LLM_* config)."""
+        api_url = api_url or current_app.config.get('LLM_API_URL')
+
+        if provider == 'groqcloud':
+            api_key = current_app.config.get('GROQ_API_KEY')
+            groq_model = model or current_app.config.get('GROQ_LLM_MODEL', current_app.config.get('LLM_MODEL'))
+            return LLMService._call_groqcloud(groq_model, prompt, api_key)
+
+        model = model or current_app.config.get('LLM_MODEL')
+        if provider == 'openrouter':
+            api_key = current_app.config.get('OPENROUTER_API_KEY')
+            return LLMService._call_openrouter(api_url, model, prompt, api_key)
+        elif provider == 'openai':
+            return LLMService._call_openai(api_url, model, prompt)
+        elif provider == 'lmstudio':
+            return LLMService._call_lmstudio(api_url, model, prompt)
+        else:
+            return LLMService._call_ollama(api_url, model, prompt)
+
     @staticmethod
     def _call_ollama(api_url: str, model: str, prompt: str) -> str:
         payload = {
@@ -266,7 +625,7 @@ RESPOND IN EXACTLY THIS JSON FORMAT (no extra text before or after):
             "stream": False
         }
         try:
-            resp = requests.post(api_url, json=payload, timeout=300)
+            resp = ProviderClient.post(api_url, json=payload, kind='llm', provider='ollama')
             resp.raise_for_status()
             data = resp.json()
             return data.get("message", {}).get("content", "")
@@ -291,7 +650,7 @@ RESPOND IN EXACTLY THIS JSON FORMAT (no extra text before or after):
             "stream": False
         }
         try:
-            resp = requests.post(url, json=payload, timeout=300)
+            resp = ProviderClient.post(url, json=payload, kind='llm', provider='openai')
             resp.raise_for_status()
             data = resp.json()
             return data["choices"][0]["message"]["content"]
@@ -315,7 +674,7 @@ RESPOND IN EXACTLY THIS JSON FORMAT (no extra text before or after):
             "stream": False
         }
         try:
-            resp = requests.post(url, json=payload, timeout=300)
+            resp = ProviderClient.post(url, json=payload, kind='llm', provider='lmstudio')
             resp.raise_for_status()
             data = resp.json()
             # LM Studio may return in different formats
@@ -348,7 +707,7 @@ RESPOND IN EXACTLY THIS JSON FORMAT (no extra text before or after):
             "stream": False
         }
         try:
-            resp = requests.post(url, json=payload, headers=headers, timeout=300)
+            resp = ProviderClient.post(url, json=payload, headers=headers, kind='llm', provider='openrouter')
             print(f"[LLMService] OpenRouter status={resp.status_code}")
             if resp.status_code != 200:
                 print(f"[LLMService] OpenRouter error body: {resp.text[:500]}")
@@ -388,7 +747,7 @@ RESPOND IN EXACTLY THIS JSON FORMAT (no extra text before or after):
             payload["reasoning_effort"] = "medium"
 
         try:
-            resp = requests.post(url, json=payload, headers=headers, timeout=300)
+            resp = ProviderClient.post(url, json=payload, headers=headers, kind='llm', provider='groqcloud')
             print(f"[LLMService] Groq Cloud status={resp.status_code}")
             if resp.status_code != 200:
                 print(f"[LLMService] Groq Cloud error body: {resp.text[:500]}")
@@ -406,6 +765,83 @@ RESPOND IN EXACTLY THIS JSON FORMAT (no extra text before or after):
     # Response parser
     # -----------------------------------------------------------------
 
+    @staticmethod
+    def _parse_batch_grading_response(raw_text: str, parsed_answers: list) -> dict:
+        """
+        Parse a batched grading reply into {question_number: result}.
+
+        Items for unknown questions, or without a numeric marks_awarded, are
+        dropped so the caller re-grades those questions individually.
+        """
+        try:
+            text = raw_text.strip()
+            if '```json' in text:
+                text = text.split('```json')[1].split('```')[0].strip()
+            elif '```' in text:
+                text = text.split('```')[1].split('```')[0].strip()
+
+            # Accept {"results": [...]} as asked, or a bare array
+            if text.lstrip().startswith('['):
+                items = json.loads(text[text.index('['):text.rindex(']') + 1])
+            else:
+                items = json.loads(text[text.index('{'):text.rindex('}') + 1]).get('results', [])
+            if not isinstance(items, list):
+                raise ValueError("results is not a list")
+        except (json.JSONDecodeError, ValueError, IndexError, AttributeError) as e:
+            print(f"[LLMService] Failed to parse batched grading response: {e}")
+            print(f"[LLMService] Raw response: {raw_text[:500]}")
+            return {}
+
+        expected = {pa.get('question_number', 1): pa for pa in parsed_answers}
+        results = {}
+        for item in items:
+            try:
+                question_number = int(item['question_number'])
+                pa = expected.get(question_number)
+                if pa is None or question_number in results:
+                    continue
+                max_marks = pa.get('max_marks', 0)
+                marks = max(0.0, min(float(item['marks_awarded']), max_marks))
+                results[question_number] = {
+                    'question_number': question_number,
+                    'marks_awarded': marks,
+                    'max_marks': max_marks,
+                    'feedback': str(item.get('feedback', '')),
+                    'confidence': float(item.get('confidence', 0.5)),
+                    'keywords_found': item.get('keywords_found', []),
+                    'keywords_missing': item.get('keywords_missing', []),
+                    'concepts_covered': item.get('concepts_covered', []),
+                    'concepts_missing': item.get('concepts_missing', []),
+                }
+            except (KeyError, TypeError, ValueError, AttributeError):
+                continue
+        return results
+
+    @staticmethod
+    def _parse_segmentation_response(raw_text: str) -> dict:
+        """Parse the LLM segmentation reply into {question_number: answer_text}."""
+        try:
+            text = raw_text.strip()
+            if '```json' in text:
+                text = text.split('```json')[1].split('```')[0].strip()
+            elif '```' in text:
+                text = text.split('```')[1].split('```')[0].strip()
+
+            start = text.index('{')
+            end = text.rindex('}') + 1
+            result = json.loads(text[start:end])
+
+            segments = {}
+            for item in result.get('answers', []):
+                if item.get('question_number') is None:
+                    continue
+                segments[int(item['question_number'])] = str(item.get('answer_text') or '')
+            return segments
+
+        except (json.JSONDecodeError, ValueError, IndexError, TypeError, AttributeError) as e:
+            print(f"[LLMService] Failed to parse segmentation response: {e}")
+            return {}
+
     @staticmethod
     def _parse_grading_response(raw_text: str, max_marks: float,
                                  keywords: list, concepts: list) -> dict:
@@ -455,5 +891,6 @@ RESPOND IN EXACTLY THIS JSON FORMAT (no extra text before or after):
                 'keywords_missing': keywords,
                 'concepts_covered': [],
                 'concepts_missing': concepts,
+                'parse_failed': True,
             }
 
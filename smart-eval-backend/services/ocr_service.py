@@ -9,14 +9,24 @@ Supports five providers:
   - 'openrouter'  : OpenRouter API (OpenAI-compatible with API key)
   - 'groqcloud'   : Groq Cloud API (OpenAI-compatible with API key)
 
+Pages are sent to the provider concurrently, bounded by VISION_MAX_CONCURRENCY
+(or the per-provider default in PROVIDER_MAX_CONCURRENCY). With
+VISION_FALLBACK_PROVIDERS set, slow pages are hedged to, and failed pages
+retried on, the next provider (see ProviderChain). Page text is cached
+by a hash of the page image + provider + model + prompt version, so re-running
+OCR on the same sheet skips pages that were already extracted.
+
 Configure via environment variables:
-  VISION_PROVIDER, VISION_API_URL, VISION_MODEL, OPENROUTER_API_KEY, GROQ_API_KEY
+  VISION_PROVIDER, VISION_API_URL, VISION_MODEL, OPENROUTER_API_KEY, GROQ_API_KEY,
+  VISION_MAX_CONCURRENCY, VISION_FALLBACK_PROVIDERS, OCR_CACHE_ENABLED
 """
 
 import base64
+import hashlib
 import io
 import os
 import requests
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
 from flask import current_app
 from datetime import datetime
 
@@ -26,29 +36,51 @@ try:
 except ImportError:
     HAS_PYMUPDF = False
 
+from services.cache_service import CacheService
+from services.provider_chain import ProviderChain
+from services.provider_client import ProviderClient
+from services.provider_limiter import ProviderLimiter
 from utils.exceptions import ValidationError
 
 
+# Bump OCR_PROMPT_VERSION whenever OCR_PROMPT changes so cached page text
+# produced by the old prompt is no longer reused.
+OCR_PROMPT = (
+    "Extract all handwritten and printed text from this image accurately. "
+    "Preserve the structure: if answers are labeled by question numbers "
+    "(e.g., Q1, Q2, Ans 1, 1., 1)), keep those labels intact. "
+    "Return only the extracted text, no commentary."
+)
+OCR_PROMPT_VERSION = 1
+
+
 class OCRService:
     """Extracts text from images via a configurable Vision model."""
 
     SUPPORTED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'pdf'}
+    CACHE_NAMESPACE = 'ocr'
 
     # -----------------------------------------------------------------
     # Public API
     # -----------------------------------------------------------------
 
     @staticmethod
-    def extract_text(image_path: str) -> list:
+    def extract_text(image_path: str, on_page=None, before_page=None) -> list:
         """
         Extract text from an image or PDF file.
 
         Args:
             image_path: Absolute path to the image/PDF file on disk.
+            on_page: Optional callback, called with each page's result dict
+                as soon as that page is done (completion order).
+            before_page: Optional callback, called before each page is sent
+                to the provider; may raise to stop (pages in flight finish).
 
         Returns:
-            list of dicts, one per page:
+            list of dicts, one per page, in page_number order:
                 [{page_number, text, confidence, processed_at}, ...]
+            A page whose provider call failed has empty text, confidence 0.0
+            and an 'error' key; the call only raises if every page failed.
         """
         if not os.path.exists(image_path):
             raise ValidationError(f"Image file not found: {image_path}")
@@ -59,38 +91,89 @@ class OCRService:
                 f"Unsupported file type '.{ext}'. Supported: {OCRService.SUPPORTED_EXTENSIONS}"
             )
 
-        # PDFs must be converted to images first
-        if ext == 'pdf':
-            pages_b64 = OCRService._pdf_to_images_b64(image_path)
-        else:
-            pages_b64 = [(OCRService._load_image_b64(image_path), 'image/png' if ext == 'png' else 'image/jpeg')]
-
         provider = current_app.config.get('VISION_PROVIDER', 'ollama')
-        api_url = current_app.config.get('VISION_API_URL')
-        model = current_app.config.get('VISION_MODEL')
-
-        results = []
-        for idx, (image_b64, mime_type) in enumerate(pages_b64):
-            print(f"[OCRService] Processing page {idx + 1}/{len(pages_b64)}")
-            if provider == 'groqcloud':
-                api_key = current_app.config.get('GROQ_API_KEY')
-                groq_model = current_app.config.get('GROQ_VISION_MODEL', model)
-                text = OCRService._call_groqcloud(groq_model, image_b64, mime_type, api_key)
-            elif provider == 'openrouter':
-                api_key = current_app.config.get('OPENROUTER_API_KEY')
-                text = OCRService._call_openrouter(api_url, model, image_b64, mime_type, api_key)
-            elif provider == 'openai':
-                text = OCRService._call_openai(api_url, model, image_b64, mime_type)
-            elif provider == 'lmstudio':
-                text = OCRService._call_lmstudio(api_url, model, image_b64, mime_type)
-            else:
-                text = OCRService._call_ollama(api_url, model, image_b64)
-            results.append({
-                'page_number': idx + 1,
-                'text': text,
-                'confidence': 1.0,
-                'processed_at': datetime.utcnow()
-            })
+        max_in_flight = ProviderLimiter.limit_for('vision', provider)
+        app = current_app._get_current_object()
+
+        def ocr_page(page_number, page_count, image_b64, mime_type):
+            # Worker threads need their own app context to read config; the
+            # provider chain takes each provider's request slot
+            with app.app_context():
+                print(f"[OCRService] Processing page {page_number}/{page_count}")
+                return OCRService._call_provider(image_b64, mime_type)
+
+        use_cache = current_app.config.get('OCR_CACHE_ENABLED', True)
+        cache_scope = OCRService._cache_scope()
+        pages = {}
+
+        def collect(future, page_number, cache_key):
+            try:
+                pages[page_number] = {
+                    'page_number': page_number,
+                    'text': future.result(),
+                    'confidence': 1.0,
+                    'processed_at': datetime.utcnow()
+                }
+                if use_cache:
+                    CacheService.put(OCRService.CACHE_NAMESPACE, cache_key, {
+                        'text': pages[page_number]['text'],
+                        'confidence': pages[page_number]['confidence'],
+                    })
+            except Exception as e:
+                # Isolate the failure so the remaining pages are kept
+                error = getattr(e, 'message', None) or str(e)
+                print(f"[OCRService] Page {page_number} failed: {error}")
+                pages[page_number] = {
+                    'page_number': page_number,
+                    'text': '',
+                    'confidence': 0.0,
+                    'processed_at': datetime.utcnow(),
+                    'error': error
+                }
+            if on_page:
+                on_page(pages[page_number])
+
+        # Pages are rendered lazily while earlier pages are in flight. At most
+        # max_in_flight + 1 encoded pages wait on the pool, plus the page
+        # currently being rendered.
+        window = max_in_flight + 1
+        pending = {}
+        with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+            for page_number, page_count, image_b64, mime_type in OCRService._iter_page_images(image_path, ext):
+                cache_key = None
+                if use_cache:
+                    page_hash = hashlib.sha256(image_b64.encode('ascii')).hexdigest()
+                    cache_key = CacheService.make_key(page_hash, *cache_scope)
+                    cached = CacheService.get(OCRService.CACHE_NAMESPACE, cache_key)
+                    if cached is not None:
+                        print(f"[OCRService] Page {page_number}/{page_count} served from cache")
+                        pages[page_number] = {
+                            'page_number': page_number,
+                            'text': cached.get('text', ''),
+                            'confidence': cached.get('confidence', 1.0),
+                            'processed_at': datetime.utcnow(),
+                            'cached': True
+                        }
+                        if on_page:
+                            on_page(pages[page_number])
+                        continue
+
+                if before_page:
+                    before_page()
+                while len(pending) >= window:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future, *pending.pop(future))
+                future = pool.submit(ocr_page, page_number, page_count, image_b64, mime_type)
+                pending[future] = (page_number, cache_key)
+                del image_b64  # the pool holds the only reference now
+
+            for future in as_completed(pending):
+                collect(future, *pending[future])
+
+        results = [pages[n] for n in sorted(pages)]
+        if results and all('error' in page for page in results):
+            raise ValidationError(results[0]['error'])
 
         return results
 
@@ -102,10 +185,44 @@ class OCRService:
             results.extend(OCRService.extract_text(path))
         return results
 
+    @staticmethod
+    def _cache_scope() -> tuple:
+        """Everything besides the page image that determines the OCR output."""
+        provider = current_app.config.get('VISION_PROVIDER', 'ollama')
+        model = current_app.config.get('VISION_MODEL')
+        if provider == 'groqcloud':
+            model = current_app.config.get('GROQ_VISION_MODEL', model)
+        return provider, model, OCR_PROMPT_VERSION
+
     # -----------------------------------------------------------------
     # Provider implementations
     # -----------------------------------------------------------------
 
+    @staticmethod
+    def _call_provider(image_b64: str, mime_type: str) -> str:
+        """Send one page image to the vision provider chain (hedged, with failover)."""
+        return ProviderChain.call(
+            'vision', lambda entry: OCRService._dispatch(entry, image_b64, mime_type)
+        )
+
+    @staticmethod
+    def _dispatch(entry: dict, image_b64: str, mime_type: str) -> str:
+        """Send one page image to a single provider of the chain."""
+        provider, api_url, model = entry['provider'], entry['api_url'], entry['model']
+
+        if provider == 'groqcloud':
+            api_key = current_app.config.get('GROQ_API_KEY')
+            return OCRService._call_groqcloud(model, image_b64, mime_type, api_key)
+        elif provider == 'openrouter':
+            api_key = current_app.config.get('OPENROUTER_API_KEY')
+            return OCRService._call_openrouter(api_url, model, image_b64, mime_type, api_key)
+        elif provider == 'openai':
+            return OCRService._call_openai(api_url, model, image_b64, mime_type)
+        elif provider == 'lmstudio':
+            return OCRService._call_lmstudio(api_url, model, image_b64, mime_type)
+        else:
+            return OCRService._call_ollama(api_url, model, image_b64)
+
     @staticmethod
     def _call_ollama(api_url: str, model: str, image_b64: str) -> str:
         """Call Ollama native chat API with image."""
@@ -114,12 +231,7 @@ class OCRService:
             "messages": [
                 {
                     "role": "user",
-                    "content": (
-                        "Extract all handwritten and printed text from this image accurately. "
-                        "Preserve the structure: if answers are labeled by question numbers "
-                        "(e.g., Q1, Q2, Ans 1, 1., 1)), keep those labels intact. "
-                        "Return only the extracted text, no commentary."
-                    ),
+                    "content": OCR_PROMPT,
                     "images": [image_b64]
                 }
             ],
@@ -127,7 +239,7 @@ class OCRService:
         }
 
         try:
-            resp = requests.post(api_url, json=payload, timeout=600)
+            resp = ProviderClient.post(api_url, json=payload, kind='vision', provider='ollama')
             resp.raise_for_status()
             data = resp.json()
             return data.get("message", {}).get("content", "")
@@ -154,12 +266,7 @@ class OCRService:
                     "content": [
                         {
                             "type": "text",
-                            "text": (
-                                "Extract all handwritten and printed text from this image accurately. "
-                                "Preserve the structure: if answers are labeled by question numbers "
-                                "(e.g., Q1, Q2, Ans 1, 1., 1)), keep those labels intact. "
-                                "Return only the extracted text, no commentary."
-                            )
+                            "text": OCR_PROMPT
                         },
                         {
                             "type": "image_url",
@@ -175,7 +282,7 @@ class OCRService:
         }
 
         try:
-            resp = requests.post(api_url, json=payload, timeout=600)
+            resp = ProviderClient.post(api_url, json=payload, kind='vision', provider='openai')
             resp.raise_for_status()
             data = resp.json()
             return data["choices"][0]["message"]["content"]
@@ -209,12 +316,7 @@ class OCRService:
                     "content": [
                         {
                             "type": "text",
-                            "text": (
-                                "Extract all handwritten and printed text from this image accurately. "
-                                "Preserve the structure: if answers are labeled by question numbers "
-                                "(e.g., Q1, Q2, Ans 1, 1., 1)), keep those labels intact. "
-                                "Return only the extracted text, no commentary."
-                            )
+                            "text": OCR_PROMPT
                         },
                         {
                             "type": "image_url",
@@ -230,7 +332,7 @@ class OCRService:
         }
 
         try:
-            resp = requests.post(url, json=payload, headers=headers, timeout=600)
+            resp = ProviderClient.post(url, json=payload, headers=headers, kind='vision', provider='openrouter')
             resp.raise_for_status()
             data = resp.json()
             return data["choices"][0]["message"]["content"]
@@ -266,12 +368,7 @@ class OCRService:
                     "content": [
                         {
                             "type": "text",
-                            "text": (
-                                "Extract all handwritten and printed text from this image accurately. "
-                                "Preserve the structure: if answers are labeled by question numbers "
-                                "(e.g., Q1, Q2, Ans 1, 1., 1)), keep those labels intact. "
-                                "Return only the extracted text, no commentary."
-                            )
+                            "text": OCR_PROMPT
                         },
                         {
                             "type": "image_url",
@@ -289,7 +386,7 @@ class OCRService:
         }
 
         try:
-            resp = requests.post(url, json=payload, headers=headers, timeout=600)
+            resp = ProviderClient.post(url, json=payload, headers=headers, kind='vision', provider='groqcloud')
             resp.raise_for_status()
             data = resp.json()
             return data["choices"][0]["message"]["content"]
@@ -312,12 +409,7 @@ class OCRService:
             "input": [
                 {
                     "type": "text",
-                    "content": (
-                        "Extract all handwritten and printed text from this image accurately. "
-                        "Preserve the structure: if answers are labeled by question numbers "
-                        "(e.g., Q1, Q2, Ans 1, 1., 1)), keep those labels intact. "
-                        "Return only the extracted text, no commentary."
-                    )
+                    "content": OCR_PROMPT
                 },
                 {
                     "type": "image",
@@ -329,7 +421,7 @@ class OCRService:
         }
 
         try:
-            resp = requests.post(api_url, json=payload, timeout=600)
+            resp = ProviderClient.post(api_url, json=payload, kind='vision', provider='lmstudio')
             resp.raise_for_status()
             data = resp.json()
             # LM Studio native response: {"message": "...", ...} or {"choices": [...]}
@@ -354,10 +446,23 @@ class OCRService:
             return base64.b64encode(f.read()).decode("utf-8")
 
     @staticmethod
-    def _pdf_to_images_b64(pdf_path: str) -> list:
+    def _iter_page_images(image_path: str, ext: str):
         """
-        Convert each page of a PDF to a PNG image.
-        Returns list of (base64_str, mime_type) tuples.
+        Yield (page_number, page_count, base64_str, mime_type) per page.
+        Images yield a single page; PDFs are rasterized one page at a time.
+        """
+        if ext == 'pdf':
+            yield from OCRService._iter_pdf_images_b64(image_path)
+        else:
+            mime_type = 'image/png' if ext == 'png' else 'image/jpeg'
+            yield 1, 1, OCRService._load_image_b64(image_path), mime_type
+
+    @staticmethod
+    def _iter_pdf_images_b64(pdf_path: str):
+        """
+        Render each page of a PDF to a PNG image on demand.
+        Yields (page_number, page_count, base64_str, mime_type) tuples so only
+        the page currently being consumed is held in memory.
         Requires PyMuPDF (fitz).
         """
         if not HAS_PYMUPDF:
@@ -367,13 +472,14 @@ class OCRService:
             )
 
         doc = fitz.open(pdf_path)
-        pages = []
-        for page in doc:
-            # Render at 200 DPI for good OCR quality
-            pix = page.get_pixmap(dpi=200)
-            img_bytes = pix.tobytes("png")
-            b64 = base64.b64encode(img_bytes).decode("utf-8")
-            pages.append((b64, "image/png"))
-        doc.close()
-        print(f"[OCRService] Converted PDF to {len(pages)} page image(s)")
-        return pages
+        try:
+            page_count = doc.page_count
+            print(f"[OCRService] Rasterizing PDF with {page_count} page(s)")
+            for idx, page in enumerate(doc):
+                # Render at 200 DPI for good OCR quality
+                pix = page.get_pixmap(dpi=200)
+                b64 = base64.b64encode(pix.tobytes("png")).decode("utf-8")
+                pix = None
+                yield idx + 1, page_count, b64, "image/png"
+        finally:
+            doc.close()
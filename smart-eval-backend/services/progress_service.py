@@ -0,0 +1,218 @@
+"""
+Progress Service
+
+Live progress events for OCR and grading runs, streamed to the browser as
+Server-Sent Events so a teacher watching an exam holds one connection
+instead of polling the sheet listing.
+
+Events are published on a per-exam Redis pub/sub channel, so events from
+Celery workers reach whichever web process holds the stream. Without Redis
+(development, threaded fallback runs) they are delivered to subscribers in
+this process only. Publishing never raises: a lost progress event must not
+fail a grading run.
+
+A stream lasts at most PROGRESS_STREAM_MAX_SECONDS and each web process
+serves at most PROGRESS_MAX_STREAMS at once, so open progress tabs cannot
+tie up every request thread. EventSource cannot send an Authorization
+header, so a stream is opened with a short-lived token scoped to one exam
+(stream_token) instead of the access token, which would end up in access
+logs. The last event of a stream, 'reconnect', carries a fresh token to
+reopen it with.
+
+Events (all carry exam_id and timestamp):
+    run_started     total, stage
+    sheet_started   sheet_id, stage ('ocr' | 'grading')
+    page_done       sheet_id, page_number, cached, error
+    question_graded sheet_id, question_number, marks_awarded, max_marks
+    sheet_finished  sheet_id, stage, status, percentage / error
+    run_finished    total, graded, skipped, failed
+"""
+
+import json
+import queue
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+
+from utils.exceptions import AuthenticationError
+
+
+class ProgressService:
+    """Publish/subscribe helpers for per-exam progress events."""
+
+    CHANNEL_PREFIX = 'progress:exam:'
+    # Events buffered per in-process subscriber before new ones are dropped
+    LOCAL_QUEUE_SIZE = 1000
+    STREAM_TOKEN_SALT = 'progress-stream'
+
+    _local = {}
+    _open_streams = 0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def channel(exam_id) -> str:
+        return f"{ProgressService.CHANNEL_PREFIX}{exam_id}"
+
+    @staticmethod
+    def publish(exam_id, event: str, **data):
+        """Send one progress event to everyone streaming the exam."""
+        if not exam_id:
+            return
+        payload = dict(data, event=event, exam_id=str(exam_id),
+                       timestamp=datetime.utcnow().isoformat())
+        message = json.dumps(payload, default=str)
+
+        client = ProgressService._redis()
+        if client is not None:
+            try:
+                client.publish(ProgressService.channel(exam_id), message)
+                return
+            except Exception as e:
+                print(f"[ProgressService] Publish failed ({event}): {e}")
+
+        with ProgressService._lock:
+            subscribers = list(ProgressService._local.get(str(exam_id), ()))
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                pass
+
+    @staticmethod
+    def stream(exam_id, heartbeat: float = 15.0, snapshot: dict = None, max_seconds: float = None):
+        """
+        Generator of SSE-formatted chunks for an exam's progress events.
+
+        Yields a comment every `heartbeat` seconds of silence so proxies
+        keep the connection open and a closed client is noticed. Runs until
+        the client disconnects (the server closes the generator) or for
+        `max_seconds`, whichever comes first.
+
+        Args:
+            exam_id: Exam whose events to stream
+            heartbeat: Seconds between keep-alive comments
+            snapshot: Optional state sent first as a 'snapshot' event
+            max_seconds: Optional cap on the stream's lifetime
+        """
+        if snapshot is not None:
+            yield ProgressService.format_event('snapshot', json.dumps(snapshot, default=str))
+
+        deadline = time.monotonic() + max_seconds if max_seconds else None
+        client = ProgressService._redis()
+        if client is not None:
+            yield from ProgressService._stream_redis(client, exam_id, heartbeat, deadline)
+        else:
+            yield from ProgressService._stream_local(exam_id, heartbeat, deadline)
+
+    @staticmethod
+    def stream_token(exam_id, user_id) -> str:
+        """Signed token that opens the exam's progress stream for PROGRESS_STREAM_TOKEN_SECONDS."""
+        return ProgressService._serializer().dumps({'exam_id': str(exam_id), 'user_id': str(user_id)})
+
+    @staticmethod
+    def verify_stream_token(token: str, exam_id) -> str:
+        """
+        Check a stream token for the exam and return the user it was issued to.
+
+        Raises:
+            AuthenticationError: missing, forged, expired or for another exam
+        """
+        if not token:
+            raise AuthenticationError("Missing stream token")
+        max_age = current_app.config.get('PROGRESS_STREAM_TOKEN_SECONDS', 60)
+        try:
+            claims = ProgressService._serializer().loads(token, max_age=max_age)
+        except SignatureExpired:
+            raise AuthenticationError("Stream token has expired")
+        except BadSignature:
+            raise AuthenticationError("Invalid stream token")
+        if claims.get('exam_id') != str(exam_id):
+            raise AuthenticationError("Stream token is for another exam")
+        return claims['user_id']
+
+    @staticmethod
+    def open_stream() -> bool:
+        """Claim one of this process's PROGRESS_MAX_STREAMS stream slots; False if all are taken."""
+        limit = current_app.config.get('PROGRESS_MAX_STREAMS', 4)
+        with ProgressService._lock:
+            if ProgressService._open_streams >= limit:
+                return False
+            ProgressService._open_streams += 1
+            return True
+
+    @staticmethod
+    def close_stream():
+        with ProgressService._lock:
+            ProgressService._open_streams = max(0, ProgressService._open_streams - 1)
+
+    @staticmethod
+    def format_event(event: str, data: str) -> str:
+        return f"event: {event}\ndata: {data}\n\n"
+
+    @staticmethod
+    def _format_message(message) -> str:
+        if isinstance(message, bytes):
+            message = message.decode('utf-8')
+        try:
+            event = json.loads(message).get('event', 'message')
+        except (ValueError, AttributeError):
+            event = 'message'
+        return ProgressService.format_event(event, message)
+
+    @staticmethod
+    def _stream_redis(client, exam_id, heartbeat, deadline=None):
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(ProgressService.channel(exam_id))
+        try:
+            last_sent = time.monotonic()
+            while deadline is None or time.monotonic() < deadline:
+                message = pubsub.get_message(timeout=_wait(heartbeat, deadline))
+                if message is not None and message.get('type') == 'message':
+                    yield ProgressService._format_message(message['data'])
+                    last_sent = time.monotonic()
+                elif time.monotonic() - last_sent >= heartbeat:
+                    yield ': keep-alive\n\n'
+                    last_sent = time.monotonic()
+        finally:
+            pubsub.close()
+
+    @staticmethod
+    def _stream_local(exam_id, heartbeat, deadline=None):
+        subscriber = queue.Queue(maxsize=ProgressService.LOCAL_QUEUE_SIZE)
+        key = str(exam_id)
+        with ProgressService._lock:
+            ProgressService._local.setdefault(key, set()).add(subscriber)
+        try:
+            while deadline is None or time.monotonic() < deadline:
+                try:
+                    yield ProgressService._format_message(
+                        subscriber.get(timeout=_wait(heartbeat, deadline))
+                    )
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+        finally:
+            with ProgressService._lock:
+                subscribers = ProgressService._local.get(key)
+                if subscribers is not None:
+                    subscribers.discard(subscriber)
+                    if not subscribers:
+                        del ProgressService._local[key]
+
+    @staticmethod
+    def _redis():
+        from app import extensions
+        return extensions.redis_client
+
+    @staticmethod
+    def _serializer():
+        return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt=ProgressService.STREAM_TOKEN_SALT)
+
+
+def _wait(heartbeat, deadline):
+    """Seconds to wait for the next event: a heartbeat, or less near the deadline."""
+    if deadline is None:
+        return heartbeat
+    return max(0.0, min(heartbeat, deadline - time.monotonic()))
@@ -0,0 +1,283 @@
+"""
+Provider Chain
+
+Hedged requests and failover across vision/LLM providers. A kind's chain
+is its configured provider (VISION_PROVIDER / LLM_PROVIDER) followed by
+the providers listed in VISION_FALLBACK_PROVIDERS / LLM_FALLBACK_PROVIDERS,
+e.g. a local LM Studio first and Groq as the fallback.
+
+A request goes to the first provider. If it fails, the next provider is
+tried straight away. If it is still running after the provider's usual
+latency (PROVIDER_HEDGE_PERCENTILE of its recent successful requests), the
+same request is also sent to the next provider; the first good answer wins.
+The hedge clock starts once the request holds its provider's concurrency
+slot (see ProviderLimiter): time spent queued behind this worker's other
+requests is not provider latency, and hedging on it would only flood the
+fallback.
+The slower request cannot be aborted mid-flight: it runs to completion in
+the background and its result is discarded, but its latency is recorded.
+
+Latencies are kept per provider and model in LatencyHistogram, per worker
+process. Until a provider has PROVIDER_HEDGE_MIN_SAMPLES of them, the
+hedge threshold is VISION_HEDGE_DELAY / LLM_HEDGE_DELAY seconds.
+
+Fallback entries are comma-separated, each 'provider' or
+'provider|api_url|model'. Omitted parts reuse the primary's URL and model
+(Groq uses GROQ_VISION_MODEL / GROQ_LLM_MODEL, OpenRouter its public URL).
+
+Configure via environment variables:
+  VISION_FALLBACK_PROVIDERS, LLM_FALLBACK_PROVIDERS,
+  PROVIDER_HEDGE_PERCENTILE (0 = failover only, never hedge),
+  PROVIDER_HEDGE_MIN_SAMPLES, VISION_HEDGE_DELAY, LLM_HEDGE_DELAY
+"""
+
+import queue
+import threading
+import time
+
+from flask import current_app
+
+from services.provider_limiter import ProviderLimiter
+
+
+OPENROUTER_API_URL = 'https://openrouter.ai/api/v1'
+
+
+class LatencyHistogram:
+    """
+    Thread-safe histogram of request latencies with log-spaced buckets.
+
+    Bucket bounds grow by √2 from 0.25s to ~23 min. Once WINDOW samples
+    have been counted, every count is halved, so the percentiles follow
+    recent behaviour (a model swapped or a server under new load).
+    """
+
+    BOUNDS = [0.25 * 2 ** (i / 2) for i in range(26)]
+    WINDOW = 500
+
+    def __init__(self):
+        self.counts = [0.0] * (len(self.BOUNDS) + 1)  # last bucket: slower than every bound
+        self.count = 0.0
+        self.total_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        index = next((i for i, bound in enumerate(self.BOUNDS) if seconds <= bound), len(self.BOUNDS))
+        with self._lock:
+            if self.count >= self.WINDOW:
+                self.counts = [c / 2 for c in self.counts]
+                self.count /= 2
+                self.total_seconds /= 2
+            self.counts[index] += 1
+            self.count += 1
+            self.total_seconds += seconds
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the p-th percentile, or None without samples."""
+        with self._lock:
+            if not self.count:
+                return None
+            target = self.count * p / 100
+            seen = 0.0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if count and seen >= target:
+                    break
+        return self.BOUNDS[min(index, len(self.BOUNDS) - 1)]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            count = self.count
+            mean = self.total_seconds / count if count else None
+            buckets = {f'{bound:g}': round(c, 1) for bound, c in zip(self.BOUNDS, self.counts) if c}
+            if self.counts[-1]:
+                buckets['+Inf'] = round(self.counts[-1], 1)
+        return {
+            'count': round(count, 1),
+            'mean_seconds': round(mean, 3) if mean is not None else None,
+            'p50_seconds': self.percentile(50),
+            'p95_seconds': self.percentile(95),
+            'buckets': buckets,
+        }
+
+
+class ProviderChain:
+    """Hedged, failing-over provider calls with per-provider latency tracking."""
+
+    _histograms = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def call(kind: str, send, validate=None) -> str:
+        """
+        Run `send(entry)` against the kind's provider chain.
+
+        Args:
+            kind: 'vision' or 'llm'
+            send: callable taking a chain entry {provider, api_url, model}
+                and returning the provider's reply text; raises on failure
+            validate: optional callable returning False for replies that
+                should not win (default: non-blank text)
+
+        Returns:
+            The first good reply. If every provider answered but none
+            passed `validate` (a blank page), the first answer received.
+
+        Raises:
+            The last provider's error if every provider failed.
+        """
+        entries = ProviderChain.entries(kind)
+        validate = validate or (lambda text: bool(text and text.strip()))
+        if len(entries) == 1:
+            return ProviderChain._attempt(kind, entries[0], send)
+
+        app = current_app._get_current_object()
+        events = queue.Queue()
+
+        def attempt(index, entry):
+            # Each attempt runs on its own thread, with its own app context
+            with app.app_context():
+                try:
+                    reply = ProviderChain._attempt(
+                        kind, entry, send,
+                        on_start=lambda: events.put(('started', index, time.monotonic(), None)),
+                    )
+                    events.put(('reply', index, reply, None))
+                except Exception as e:
+                    events.put(('reply', index, None, e))
+
+        # [entry, started]: started is set once the attempt holds its
+        # concurrency slot, so time queued behind other requests never
+        # counts towards the hedge threshold
+        launched = []
+        outstanding = 0
+        last_error = None
+        rejected = None
+
+        def launch(reason=None):
+            entry = entries[len(launched)]
+            if reason:
+                print(f"[ProviderChain] {reason}; sending {kind} request to {entry['provider']} ({entry['model']})")
+            launched.append([entry, None])
+            threading.Thread(target=attempt, args=(len(launched) - 1, entry), daemon=True).start()
+
+        launch()
+        outstanding += 1
+        while True:
+            timeout = None
+            if len(launched) < len(entries):
+                entry, started = launched[-1]
+                delay = ProviderChain.hedge_delay(kind, entry)
+                if delay is not None and started is not None:
+                    timeout = max(0.0, started + delay - time.monotonic())
+            try:
+                event, index, reply, error = events.get(timeout=timeout)
+            except queue.Empty:
+                slow = launched[-1][0]
+                launch(f"{slow['provider']} slower than {ProviderChain.hedge_delay(kind, slow):g}s, hedging")
+                outstanding += 1
+                continue
+
+            if event == 'started':
+                launched[index][1] = reply
+                continue
+
+            entry = launched[index][0]
+            outstanding -= 1
+            if error is None and validate(reply):
+                if len(launched) > 1:
+                    print(f"[ProviderChain] {kind} reply from {entry['provider']} ({entry['model']})")
+                return reply
+
+            if error is None:
+                rejected = reply if rejected is None else rejected
+                print(f"[ProviderChain] {entry['provider']} returned an empty reply")
+            else:
+                last_error = error
+                print(f"[ProviderChain] {entry['provider']} failed: {getattr(error, 'message', None) or error}")
+            if len(launched) < len(entries):
+                launch(f"{entry['provider']} gave no usable reply, failing over")
+                outstanding += 1
+            elif not outstanding:
+                if rejected is not None:
+                    return rejected
+                raise last_error
+
+    @staticmethod
+    def entries(kind: str) -> list:
+        """The kind's provider chain: configured provider first, then fallbacks."""
+        prefix = kind.upper()
+        config = current_app.config
+        primary = ProviderChain._entry(
+            kind, config.get(f'{prefix}_PROVIDER', 'ollama'),
+            config.get(f'{prefix}_API_URL'), config.get(f'{prefix}_MODEL'),
+        )
+        chain = [primary]
+        for spec in (config.get(f'{prefix}_FALLBACK_PROVIDERS') or '').split(','):
+            parts = [part.strip() for part in spec.split('|')]
+            if not parts[0]:
+                continue
+            api_url = parts[1] if len(parts) > 1 and parts[1] else None
+            model = parts[2] if len(parts) > 2 and parts[2] else None
+            if parts[0] == 'openrouter' and not api_url:
+                api_url = OPENROUTER_API_URL
+            chain.append(ProviderChain._entry(
+                kind, parts[0],
+                api_url or config.get(f'{prefix}_API_URL'),
+                model or config.get(f'{prefix}_MODEL'),
+                explicit_model=model is not None,
+            ))
+        return chain
+
+    @staticmethod
+    def hedge_delay(kind: str, entry: dict) -> float:
+        """Seconds after which a request to `entry` is hedged, or None (never)."""
+        config = current_app.config
+        percentile = config.get('PROVIDER_HEDGE_PERCENTILE', 95)
+        if not percentile:
+            return None
+        histogram = ProviderChain.histogram(kind, entry)
+        if histogram.count >= config.get('PROVIDER_HEDGE_MIN_SAMPLES', 20):
+            return histogram.percentile(percentile)
+        return config.get(f'{kind.upper()}_HEDGE_DELAY') or None
+
+    @staticmethod
+    def histogram(kind: str, entry: dict) -> LatencyHistogram:
+        key = (kind, entry['provider'], entry['model'])
+        with ProviderChain._lock:
+            histogram = ProviderChain._histograms.get(key)
+            if histogram is None:
+                histogram = ProviderChain._histograms[key] = LatencyHistogram()
+            return histogram
+
+    @staticmethod
+    def stats() -> list:
+        """Latency histograms of every provider used by this worker process."""
+        with ProviderChain._lock:
+            items = list(ProviderChain._histograms.items())
+        return [
+            {'kind': kind, 'provider': provider, 'model': model, **histogram.snapshot()}
+            for (kind, provider, model), histogram in sorted(items, key=lambda item: str(item[0]))
+        ]
+
+    @staticmethod
+    def _attempt(kind: str, entry: dict, send, on_start=None) -> str:
+        """
+        One provider request inside its concurrency slot; successes feed the histogram.
+
+        on_start is called once the slot is held, just before the request is sent.
+        """
+        limit = ProviderLimiter.limit_for(kind, entry['provider'])
+        with ProviderLimiter.slot(kind, entry['provider'], limit):
+            if on_start:
+                on_start()
+            started = time.monotonic()
+            reply = send(entry)
+            ProviderChain.histogram(kind, entry).record(time.monotonic() - started)
+            return reply
+
+    @staticmethod
+    def _entry(kind: str, provider: str, api_url: str, model: str, explicit_model: bool = False) -> dict:
+        if provider == 'groqcloud' and not explicit_model:
+            model = current_app.config.get(f'GROQ_{kind.upper()}_MODEL', model)
+        return {'provider': provider, 'api_url': api_url, 'model': model}
@@ -0,0 +1,122 @@
+"""
+Provider Client
+
+Shared HTTP layer for the vision (OCR) and LLM providers. Keeps one
+requests.Session per provider host so TCP/TLS connections are pooled and
+kept alive across pages, questions and sheets within a worker process.
+
+Requests are paced by ProviderRateLimiter; an HTTP 429 is retried after
+its Retry-After instead of failing the page or question.
+
+Configure via environment variables:
+  PROVIDER_POOL_MAXSIZE, PROVIDER_CONNECT_TIMEOUT,
+  VISION_REQUEST_TIMEOUT, LLM_REQUEST_TIMEOUT
+"""
+
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from flask import current_app
+
+from services.provider_rate_limiter import ProviderRateLimiter, parse_retry_after, exhausted_for
+
+
+class ProviderClient:
+    """Per-host pooled sessions for AI provider requests."""
+
+    _sessions = {}
+    _pid = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def post(url: str, json: dict = None, headers: dict = None, kind: str = 'llm',
+             provider: str = None) -> requests.Response:
+        """
+        POST to a provider over a pooled keep-alive connection.
+
+        The request first waits for its provider's rate limit. A 429 reply
+        slows the provider down and is retried once Retry-After has passed,
+        up to PROVIDER_RATE_LIMIT_RETRIES times within
+        PROVIDER_RATE_LIMIT_MAX_WAIT seconds; after that the 429 response is
+        returned as before.
+
+        Args:
+            url: Full endpoint URL
+            json: JSON payload
+            headers: Optional request headers
+            kind: 'vision' or 'llm' — selects the read timeout
+            provider: Provider name, for its configured request rate
+        """
+        session = ProviderClient._session_for(url)
+        host = ProviderClient._host(url)
+        model = (json or {}).get('model')
+        bucket = ProviderRateLimiter.bucket(kind, provider, host, model)
+        retries = current_app.config.get('PROVIDER_RATE_LIMIT_RETRIES', 5)
+        deadline = time.monotonic() + current_app.config.get('PROVIDER_RATE_LIMIT_MAX_WAIT', 300)
+
+        resp = None
+        for attempt in range(retries + 1):
+            ProviderRateLimiter.sync_pause(bucket, host, model)
+            try:
+                waited = bucket.acquire(deadline)
+            except TimeoutError as e:
+                if resp is not None:
+                    return resp  # the last 429
+                raise requests.exceptions.RequestException(str(e))
+
+            resp = session.post(url, json=json, headers=headers, timeout=ProviderClient._timeout(kind))
+
+            if resp.status_code != 429:
+                bucket.succeeded(waited)
+                pause = exhausted_for(resp.headers)
+                if pause:
+                    bucket.pause(pause)
+                    ProviderRateLimiter.share_pause(host, model, pause)
+                return resp
+
+            retry_after = parse_retry_after(resp.headers) or exhausted_for(resp.headers)
+            bucket.throttled(retry_after)
+            ProviderRateLimiter.share_pause(host, model, retry_after or 0)
+            if attempt < retries:
+                print(f"[ProviderClient] {host} rate limited (429), retry {attempt + 1}/{retries} "
+                      f"after {retry_after or 'default'}s; now {bucket.rate * 60:.1f} req/min")
+
+        return resp
+
+    @staticmethod
+    def _timeout(kind: str) -> tuple:
+        """(connect, read) timeout in seconds."""
+        connect = current_app.config.get('PROVIDER_CONNECT_TIMEOUT', 10)
+        if kind == 'vision':
+            read = current_app.config.get('VISION_REQUEST_TIMEOUT', 600)
+        else:
+            read = current_app.config.get('LLM_REQUEST_TIMEOUT', 300)
+        return connect, read
+
+    @staticmethod
+    def _host(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    @staticmethod
+    def _session_for(url: str) -> requests.Session:
+        host = ProviderClient._host(url)
+
+        with ProviderClient._lock:
+            # Sockets must not be shared across forked worker processes
+            if ProviderClient._pid != os.getpid():
+                ProviderClient._sessions = {}
+                ProviderClient._pid = os.getpid()
+
+            session = ProviderClient._sessions.get(host)
+            if session is None:
+                pool_size = current_app.config.get('PROVIDER_POOL_MAXSIZE', 10)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+                session = requests.Session()
+                session.mount(host, adapter)
+                ProviderClient._sessions[host] = session
+            return session
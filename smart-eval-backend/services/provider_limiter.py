@@ -0,0 +1,54 @@
+"""
+Provider Limiter
+
+Caps the number of in-flight requests each AI provider receives from a
+single worker process. Local servers (Ollama, LM Studio) process one
+request at a time anyway, while cloud APIs happily accept several.
+
+Configure via environment variables:
+  VISION_MAX_CONCURRENCY, LLM_MAX_CONCURRENCY  (0 = use the provider default)
+"""
+
+import threading
+from contextlib import contextmanager
+from flask import current_app
+
+
+class ProviderLimiter:
+    """Process-wide semaphores keyed by (kind, provider)."""
+
+    _semaphores = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def limit_for(kind: str, provider: str) -> int:
+        """
+        Resolve the max in-flight request count for a provider.
+
+        Args:
+            kind: 'vision' or 'llm'
+            provider: provider name, e.g. 'ollama', 'groqcloud'
+        """
+        override = current_app.config.get(f'{kind.upper()}_MAX_CONCURRENCY') or 0
+        if override > 0:
+            return override
+        defaults = current_app.config.get('PROVIDER_MAX_CONCURRENCY', {})
+        return max(1, defaults.get(provider, 1))
+
+    @staticmethod
+    @contextmanager
+    def slot(kind: str, provider: str, limit: int):
+        """Block until a request slot for the provider is free."""
+        key = (kind, provider)
+        with ProviderLimiter._lock:
+            semaphore = ProviderLimiter._semaphores.get(key)
+            if semaphore is None or semaphore.limit != limit:
+                semaphore = threading.BoundedSemaphore(limit)
+                semaphore.limit = limit
+                ProviderLimiter._semaphores[key] = semaphore
+
+        semaphore.acquire()
+        try:
+            yield
+        finally:
+            semaphore.release()
@@ -0,0 +1,258 @@
+"""
+Provider Rate Limiter
+
+Request-rate scheduling for AI providers, applied by ProviderClient to
+every provider request. Complements ProviderLimiter, which caps requests
+in flight; this caps requests per second so cloud quotas (Groq, OpenRouter,
+OpenAI) are used at their sustainable rate instead of failing on HTTP 429.
+
+Each provider host + model gets a token bucket. Its rate adapts AIMD-style:
+a 429 halves it, and each success that had to wait for a token raises it
+by one request/minute, so it settles just under the real quota. A 429's
+Retry-After, or rate-limit headers reporting zero requests remaining,
+pause the bucket until the quota resets. With Redis configured the pause
+is shared by all worker processes.
+
+Providers without a configured starting rate (local servers) are not
+paced until they first answer 429.
+
+Configure via environment variables:
+  VISION_REQUESTS_PER_MINUTE, LLM_REQUESTS_PER_MINUTE  (0 = provider default)
+  PROVIDER_RATE_LIMIT_RETRIES, PROVIDER_RATE_LIMIT_MAX_WAIT
+"""
+
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from flask import current_app
+
+
+# Starting rate when a provider that had no configured rate answers 429
+FALLBACK_REQUESTS_PER_MINUTE = 60
+# Retry delay when a 429 carries no Retry-After
+DEFAULT_RETRY_AFTER = 5.0
+# Rate changes per AIMD step
+ADDITIVE_INCREASE = 1.0 / 60  # +1 request/minute
+MULTIPLICATIVE_DECREASE = 0.5
+MIN_RATE = 1.0 / 60  # never slower than 1 request/minute
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket whose rate adapts to provider feedback.
+
+    rate is in requests/second; None means unlimited (not paced yet).
+    Capacity is one second's worth of tokens, at least one, so bursts stay
+    small and requests are spread evenly.
+    """
+
+    def __init__(self, rate: float = None, max_rate: float = None):
+        self.rate = rate
+        self.max_rate = max_rate
+        self.tokens = 1.0
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+
+    @property
+    def capacity(self) -> float:
+        return max(1.0, self.rate or 1.0)
+
+    def acquire(self, deadline: float) -> bool:
+        """
+        Wait for a token. Requests queue here instead of hitting the provider.
+
+        Args:
+            deadline: time.monotonic() value after which to give up
+
+        Returns:
+            True if the caller had to wait (the limiter was the bottleneck)
+
+        Raises:
+            TimeoutError: if no token is available before the deadline
+        """
+        waited = False
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                delay = max(0.0, self.paused_until - now)
+                if not delay:
+                    if self.rate is None:
+                        return waited
+                    if self.tokens >= 1.0:
+                        self.tokens -= 1.0
+                        return waited
+                    delay = (1.0 - self.tokens) / self.rate
+                if now + delay > deadline:
+                    raise TimeoutError(f"Provider rate limit: no request slot within {delay:.0f}s")
+                waited = True
+                self._cond.wait(delay)
+
+    def succeeded(self, waited: bool):
+        """Additive increase, only while the limiter is what holds requests back."""
+        with self._cond:
+            if waited and self.rate is not None:
+                self.rate += ADDITIVE_INCREASE
+                if self.max_rate:
+                    self.rate = min(self.rate, self.max_rate)
+
+    def throttled(self, retry_after: float = None):
+        """Multiplicative decrease after a 429, and pause until Retry-After."""
+        with self._cond:
+            now = time.monotonic()
+            if self.rate is None:
+                self.rate = FALLBACK_REQUESTS_PER_MINUTE / 60
+            self.rate = max(MIN_RATE, self.rate * MULTIPLICATIVE_DECREASE)
+            self.tokens = 0.0
+            self._updated = now
+            self.paused_until = max(self.paused_until, now + (retry_after or DEFAULT_RETRY_AFTER))
+            self._cond.notify_all()
+
+    def pause(self, seconds: float):
+        """Hold all requests for `seconds` (quota exhausted until its reset)."""
+        with self._cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def _refill(self, now: float):
+        if self.rate is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class ProviderRateLimiter:
+    """Process-wide token buckets keyed by (provider host, model)."""
+
+    _buckets = {}
+    _lock = threading.Lock()
+
+    PAUSE_KEY_PREFIX = 'ratelimit:pause:'
+
+    @staticmethod
+    def bucket(kind: str, provider: str, host: str, model: str = None) -> TokenBucket:
+        key = (host, model)
+        with ProviderRateLimiter._lock:
+            bucket = ProviderRateLimiter._buckets.get(key)
+            if bucket is None:
+                per_minute = ProviderRateLimiter.requests_per_minute(kind, provider)
+                rate = per_minute / 60 if per_minute else None
+                # Allow growth past the configured rate in case the quota is higher
+                bucket = TokenBucket(rate, max_rate=rate * 4 if rate else None)
+                ProviderRateLimiter._buckets[key] = bucket
+            return bucket
+
+    @staticmethod
+    def requests_per_minute(kind: str, provider: str) -> float:
+        """Starting request rate for a provider (0 = not paced until it answers 429)."""
+        override = current_app.config.get(f'{kind.upper()}_REQUESTS_PER_MINUTE') or 0
+        if override > 0:
+            return override
+        return (current_app.config.get('PROVIDER_REQUESTS_PER_MINUTE') or {}).get(provider, 0)
+
+    # ------------------------------------------------------------------
+    # Pauses shared across worker processes (Redis, when configured)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def sync_pause(bucket: TokenBucket, host: str, model: str = None):
+        """Adopt a pause another process recorded for this quota."""
+        client = ProviderRateLimiter._redis()
+        if client is None:
+            return
+        try:
+            ttl_ms = client.pttl(ProviderRateLimiter._pause_key(host, model))
+        except Exception:
+            return
+        if ttl_ms and ttl_ms > 0:
+            bucket.pause(ttl_ms / 1000)
+
+    @staticmethod
+    def share_pause(host: str, model: str, seconds: float):
+        client = ProviderRateLimiter._redis()
+        if client is None or seconds <= 0:
+            return
+        try:
+            client.set(ProviderRateLimiter._pause_key(host, model), 1, px=int(seconds * 1000))
+        except Exception as e:
+            print(f"[ProviderRateLimiter] Could not share pause for {host}: {e}")
+
+    @staticmethod
+    def _pause_key(host: str, model: str = None) -> str:
+        return f"{ProviderRateLimiter.PAUSE_KEY_PREFIX}{host}:{model or ''}"
+
+    @staticmethod
+    def _redis():
+        from app import extensions
+        return extensions.redis_client
+
+
+# ----------------------------------------------------------------------
+# Rate-limit header parsing
+# ----------------------------------------------------------------------
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+
+
+def parse_retry_after(headers) -> float:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date), or None."""
+    value = headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_reset(value) -> float:
+    """
+    Seconds until a rate-limit window resets.
+
+    Accepts Groq/OpenAI durations ('7.66s', '2m59.56s', '250ms'), plain
+    seconds, and OpenRouter's epoch timestamps (seconds or milliseconds).
+    """
+    if value is None or value == '':
+        return None
+    value = str(value).strip()
+    try:
+        number = float(value)
+    except ValueError:
+        parts = _DURATION_PART.findall(value)
+        if not parts:
+            return None
+        scale = {'h': 3600, 'm': 60, 's': 1, 'ms': 0.001}
+        return sum(float(amount) * scale[unit] for amount, unit in parts)
+    if number > 1e12:  # epoch milliseconds
+        return max(0.0, number / 1000 - time.time())
+    if number > 1e9:  # epoch seconds
+        return max(0.0, number - time.time())
+    return number
+
+
+def exhausted_for(headers) -> float:
+    """
+    Seconds to pause if the response says the request quota is used up, else None.
+
+    Reads x-ratelimit-remaining-requests / x-ratelimit-reset-requests
+    (Groq, OpenAI) or X-RateLimit-Remaining / X-RateLimit-Reset (OpenRouter).
+    """
+    for remaining_header, reset_header in (
+        ('x-ratelimit-remaining-requests', 'x-ratelimit-reset-requests'),
+        ('x-ratelimit-remaining', 'x-ratelimit-reset'),
+    ):
+        remaining = headers.get(remaining_header)
+        if remaining is None:
+            continue
+        try:
+            if float(remaining) > 0:
+                return None
+        except ValueError:
+            return None
+        return parse_reset(headers.get(reset_header)) or DEFAULT_RETRY_AFTER
+    return None
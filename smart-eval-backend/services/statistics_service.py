@@ -0,0 +1,250 @@
+"""
+Statistics Service
+
+Score statistics for an exam computed inside MongoDB with one aggregation
+over its evaluations, projecting only `percentage` — evaluations are never
+loaded into Python.
+
+Exam.statistics holds running aggregates of the same numbers, updated
+atomically (record_score / record_review) whenever an evaluation is
+graded, overridden, resolved by challenge or approved, so dashboards read
+them without scanning evaluations. rebuild() recomputes them from scratch.
+"""
+
+from pymongo import ReturnDocument
+
+from models.answer_sheet import AnswerSheet
+from models.evaluation import Evaluation
+from models.exam import Exam
+
+
+# (key, lower bound inclusive, upper bound exclusive) in percent
+SCORE_BUCKETS = [
+    ('90_100', 90, None),
+    ('75_89', 75, 90),
+    ('50_74', 50, 75),
+    ('33_49', 33, 50),
+    ('below_33', None, 33),
+]
+
+PERCENTILES = (25, 50, 75, 90)
+
+# Evaluation statuses whose scores count towards exam statistics
+COUNTED_STATUSES = ('completed', 'overridden')
+
+
+def bucket_for(percentage: float) -> str:
+    """Distribution bucket key for a percentage."""
+    for key, low, high in SCORE_BUCKETS:
+        if (low is None or percentage >= low) and (high is None or percentage < high):
+            return key
+    return SCORE_BUCKETS[-1][0]
+
+
+def counted_score(evaluation):
+    """The evaluation's percentage if it counts towards exam statistics, else None."""
+    if evaluation is None or evaluation.status not in COUNTED_STATUSES:
+        return None
+    return evaluation.percentage or 0.0
+
+
+class StatisticsService:
+    """Aggregation-backed score statistics."""
+
+    @staticmethod
+    def score_summary(exam_id, statuses=COUNTED_STATUSES) -> dict:
+        """
+        Count, mean, min, max, percentiles and score distribution for an exam.
+
+        Args:
+            exam_id: Exam ObjectId
+            statuses: Evaluation statuses to include
+
+        Returns:
+            Dict with count, mean, min, max, percentiles {p25, p50, p75, p90}
+            and distribution {90_100, 75_89, 50_74, 33_49, below_33}. All
+            values are zero when the exam has no matching evaluations.
+        """
+        pipeline = StatisticsService._pipeline(exam_id, list(statuses))
+        rows = list(Evaluation.objects.aggregate(pipeline))
+        if not rows or not rows[0].get('count'):
+            return StatisticsService._empty()
+
+        row = rows[0]
+        return {
+            'count': row['count'],
+            'sum': row['sum'],
+            'sum_sq': row['sum_sq'],
+            'mean': round(row['mean'] or 0.0, 2),
+            'min': round(row['min'] or 0.0, 2),
+            'max': round(row['max'] or 0.0, 2),
+            'percentiles': {f'p{p}': round(row[f'p{p}'] or 0.0, 2) for p in PERCENTILES},
+            'distribution': {key: row[key] for key, _, _ in SCORE_BUCKETS},
+        }
+
+    # ------------------------------------------------------------------
+    # Running aggregates on Exam.statistics
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def record_score(exam_id, old=None, new=None):
+        """
+        Apply one evaluation's score change to the exam's running statistics.
+
+        Args:
+            exam_id: Exam ObjectId
+            old: Percentage previously counted for the evaluation (None if it wasn't)
+            new: Percentage counted now (None if it no longer counts)
+        """
+        if old == new:
+            return
+
+        inc = {}
+        for pct, sign in ((old, -1), (new, 1)):
+            if pct is None:
+                continue
+            for field, amount in (
+                ('graded', sign),
+                ('score_sum', sign * pct),
+                ('score_sum_sq', sign * pct * pct),
+                (f'distribution.{bucket_for(pct)}', sign),
+            ):
+                inc[field] = inc.get(field, 0) + amount
+
+        update = {'$inc': {f'statistics.{k}': v for k, v in inc.items() if v}}
+        if new is not None:
+            update['$min'] = {'statistics.lowest_score': new}
+            update['$max'] = {'statistics.highest_score': new}
+
+        try:
+            doc = Exam._get_collection().find_one_and_update(
+                {'_id': exam_id}, update,
+                projection={'statistics': 1},
+                return_document=ReturnDocument.AFTER
+            )
+            if doc:
+                StatisticsService._settle(exam_id, doc.get('statistics') or {}, old, new)
+        except Exception as e:
+            print(f"[StatisticsService] Update failed for exam {exam_id}: {e}")
+
+    @staticmethod
+    def record_review(exam_id, count: int = 1):
+        """Count sheets newly approved (status → reviewed)."""
+        if count:
+            Exam.objects(id=exam_id).update_one(inc__statistics__reviewed=count)
+
+    @staticmethod
+    def rebuild(exam_id) -> dict:
+        """Recompute an exam's statistics from its evaluations and sheets."""
+        summary = StatisticsService.score_summary(exam_id)
+        # Without scores min/max are unset, not null: null sorts below every
+        # number, so a later $min would never replace it
+        if summary['count']:
+            extremes = {'set__statistics__highest_score': summary['max'],
+                        'set__statistics__lowest_score': summary['min']}
+        else:
+            extremes = {'unset__statistics__highest_score': True,
+                        'unset__statistics__lowest_score': True}
+        Exam.objects(id=exam_id).update_one(
+            set__statistics__graded=summary['count'],
+            set__statistics__reviewed=AnswerSheet.objects(exam_id=exam_id, status='reviewed').count(),
+            set__statistics__score_sum=summary['sum'],
+            set__statistics__score_sum_sq=summary['sum_sq'],
+            set__statistics__average_score=summary['mean'],
+            set__statistics__distribution=summary['distribution'],
+            **extremes
+        )
+        return summary
+
+    @staticmethod
+    def _settle(exam_id, stats: dict, old, new):
+        """
+        Derive the fields $inc can't maintain: the average, and min/max when
+        the score that held them was removed or lowered/raised.
+
+        Written with a compare-and-set on (graded, score_sum) so a concurrent
+        update that lands later wins instead of being overwritten.
+        """
+        graded = stats.get('graded') or 0
+        score_sum = stats.get('score_sum') or 0.0
+        updates = {'statistics.average_score': round(score_sum / graded, 2) if graded else 0.0}
+        # Min/max without scores are unset rather than null, which $min would never replace
+        unset = {}
+
+        lowest, highest = stats.get('lowest_score'), stats.get('highest_score')
+        if not graded:
+            unset = {'statistics.lowest_score': '', 'statistics.highest_score': ''}
+        elif old is not None and (old == lowest or old == highest):
+            scores = Evaluation.objects(exam_id=exam_id, status__in=COUNTED_STATUSES)
+            if old == lowest and (new is None or new > old):
+                first = scores.order_by('percentage').only('percentage').first()
+                if first:
+                    updates['statistics.lowest_score'] = first.percentage
+                else:
+                    unset['statistics.lowest_score'] = ''
+            if old == highest and (new is None or new < old):
+                last = scores.order_by('-percentage').only('percentage').first()
+                if last:
+                    updates['statistics.highest_score'] = last.percentage
+                else:
+                    unset['statistics.highest_score'] = ''
+
+        update = {'$set': updates}
+        if unset:
+            update['$unset'] = unset
+        Exam._get_collection().update_one(
+            {'_id': exam_id, 'statistics.graded': stats.get('graded'), 'statistics.score_sum': stats.get('score_sum')},
+            update
+        )
+
+    @staticmethod
+    def _pipeline(exam_id, statuses: list) -> list:
+        pct = '$percentage'
+
+        group = {
+            '_id': None,
+            'count': {'$sum': 1},
+            'sum': {'$sum': pct},
+            'sum_sq': {'$sum': {'$multiply': [pct, pct]}},
+            'mean': {'$avg': pct},
+            'min': {'$min': pct},
+            'max': {'$max': pct},
+            # Input is sorted, so this is the ordered score list used for percentiles
+            'scores': {'$push': pct},
+        }
+        for key, low, high in SCORE_BUCKETS:
+            bounds = []
+            if low is not None:
+                bounds.append({'$gte': [pct, low]})
+            if high is not None:
+                bounds.append({'$lt': [pct, high]})
+            group[key] = {'$sum': {'$cond': [{'$and': bounds}, 1, 0]}}
+
+        project = {'_id': 0, 'count': 1, 'sum': 1, 'sum_sq': 1, 'mean': 1, 'min': 1, 'max': 1}
+        for key, _, _ in SCORE_BUCKETS:
+            project[key] = 1
+        for p in PERCENTILES:
+            # Nearest-rank: element ceil(p/100 * n) - 1 of the sorted scores
+            rank = {'$subtract': [{'$ceil': {'$multiply': [p / 100, '$count']}}, 1]}
+            project[f'p{p}'] = {'$arrayElemAt': ['$scores', {'$max': [rank, 0]}]}
+
+        return [
+            {'$match': {'exam_id': exam_id, 'status': {'$in': statuses}}},
+            {'$project': {'_id': 0, 'percentage': 1}},
+            {'$sort': {'percentage': 1}},
+            {'$group': group},
+            {'$project': project},
+        ]
+
+    @staticmethod
+    def _empty() -> dict:
+        return {
+            'count': 0,
+            'sum': 0.0,
+            'sum_sq': 0.0,
+            'mean': 0.0,
+            'min': 0.0,
+            'max': 0.0,
+            'percentiles': {f'p{p}': 0.0 for p in PERCENTILES},
+            'distribution': {key: 0 for key, _, _ in SCORE_BUCKETS},
+        }
@@ -1,21 +1,66 @@
 """
 Celery application configuration.
 
+Each worker process builds one Flask app (on worker_process_init, or lazily
+on its first task with --pool=solo) and every task runs inside that app's
+context, so tasks share its config and Mongo/Redis connection pools instead
+of calling create_app() per invocation.
+
+OCR tasks are routed to the 'ocr' queue and grading tasks to the 'grading'
+queue, so vision and text model work can be given separate workers sized to
+each provider. Coordinating tasks stay on the default 'celery' queue.
+
 Usage:
-    Start worker:  celery -A tasks.celery_app.celery worker --loglevel=info --pool=solo
+    Start worker:  celery -A tasks.celery_app.celery worker --loglevel=info --pool=solo -Q celery,ocr,grading
+    Split stages:  celery -A tasks.celery_app.celery worker -Q celery,ocr --concurrency=2 -n ocr@%h
+                   celery -A tasks.celery_app.celery worker -Q grading --concurrency=4 -n grading@%h
 """
 
 import os
-from celery import Celery
+from celery import Celery, Task
+from celery.signals import worker_process_init
 from dotenv import load_dotenv
 
 load_dotenv()
 
+_flask_app = None
+_flask_app_pid = None
+
+
+def get_flask_app():
+    """Return this worker process's Flask app, creating it on first use."""
+    global _flask_app, _flask_app_pid
+    if _flask_app is None or _flask_app_pid != os.getpid():
+        from app import create_app
+        _flask_app = create_app()
+        _flask_app_pid = os.getpid()
+    return _flask_app
+
+
+class FlaskTask(Task):
+    """Task base that runs the task body inside the worker's app context."""
+
+    def __call__(self, *args, **kwargs):
+        with get_flask_app().app_context():
+            return self.run(*args, **kwargs)
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """Build the app once per forked worker, with fresh connections."""
+    # pymongo clients are not fork-safe: drop any inherited from the parent
+    from mongoengine import disconnect
+    disconnect()
+    get_flask_app()
+    print(f"[Celery] Worker process {os.getpid()} ready")
+
+
 celery = Celery(
     'smart-eval',
     broker=os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0'),
     backend=os.getenv('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0'),
-    include=['tasks.ocr_tasks']
+    include=['tasks.ocr_tasks', 'tasks.grading_tasks'],
+    task_cls=FlaskTask,
 )
 
 celery.conf.update(
@@ -26,4 +71,9 @@ celery.conf.update(
     task_track_started=True,
     task_acks_late=True,
     worker_prefetch_multiplier=1,  # one task at a time (heavy GPU work)
+    task_routes={
+        'ocr.*': {'queue': 'ocr'},
+        'grading.grade_sheet': {'queue': 'grading'},
+        'grading.grade_ocr_result': {'queue': 'grading'},
+    },
 )
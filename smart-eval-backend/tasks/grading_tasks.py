@@ -1,5 +1,144 @@
 """
-Celery tasks for LLM grading (Sprint 5 placeholder).
+Celery tasks for LLM grading.
+
+grade_exam_task fans out one grade_sheet_task per sheet as a chord; once
+every sheet has finished, finalize_exam_grading_task summarizes the run
+(exam statistics are already updated per sheet). Throughput scales with the number of worker processes, and
+grading survives web worker restarts.
+
+process_and_grade_exam_task pipelines OCR into grading: each sheet is a
+chain of its OCR task (routed to the 'ocr' queue) and its grading task
+(routed to the 'grading' queue), so a sheet is graded as soon as its own
+OCR finishes while other sheets are still in OCR. A sheet whose OCR failed
+or was cancelled is not graded; its OCR result is the sheet's result.
+
+Each task takes an optional run_id (see models.grading_run): sheet tasks
+of a cancelled run return 'cancelled' without work, and the chord callback
+closes the run. sheet_ids limits an exam task to given sheets (resume).
 """
 
-# Sprint 5: will add grade_sheet_task and grade_exam_task here
+from celery import chain, chord
+
+from tasks.celery_app import celery
+
+
+@celery.task(bind=True, name='grading.grade_sheet')
+def grade_sheet_task(self, answer_sheet_id: str, force: bool = False, run_id: str = None):
+    """
+    Async task: grade a single answer sheet.
+
+    Never raises, so one bad sheet does not fail the exam's chord.
+    """
+    from models.answer_sheet import AnswerSheet
+    from services.grading_service import GradingService
+    from services.grading_run_service import GradingRunService
+
+    try:
+        return GradingService.grade_answer_sheet(answer_sheet_id, force=force, run_id=run_id)
+    except Exception as e:
+        error = getattr(e, 'message', None) or str(e)
+        print(f"[GradingTask] Sheet {answer_sheet_id} error: {error}")
+        # Don't leave the sheet stuck in 'processing'
+        AnswerSheet.objects(id=answer_sheet_id, status='processing').update(set__status='failed')
+        GradingRunService.record_sheet(run_id, answer_sheet_id, failed=True)
+        return {
+            'answer_sheet_id': answer_sheet_id,
+            'status': 'failed',
+            'error': error,
+        }
+
+
+@celery.task(bind=True, name='grading.grade_ocr_result')
+def grade_ocr_result_task(self, ocr_result: dict, force: bool = False, run_id: str = None):
+    """
+    Async task: grade a sheet once its OCR task (the previous link of its
+    pipeline chain) has completed; otherwise pass the OCR result through.
+    """
+    if ocr_result.get('status') != 'ocr_completed':
+        return ocr_result
+    return grade_sheet_task.run(ocr_result['answer_sheet_id'], force, run_id)
+
+
+@celery.task(bind=True, name='grading.finalize_exam')
+def finalize_exam_grading_task(self, results: list, exam_id: str, run_id: str = None):
+    """
+    Async task: chord callback — summarize the run once all sheets are graded.
+    """
+    from services.grading_service import GradingService
+    from services.grading_run_service import GradingRunService
+
+    summary = GradingService.summarize_grading(exam_id, results or [])
+    GradingRunService.finish(run_id, summary)
+    print(f"[GradingTask] Exam {exam_id} graded: {summary['graded']} ok "
+          f"({summary['skipped']} unchanged), {summary['failed']} failed, {summary['cancelled']} cancelled")
+    return summary
+
+
+@celery.task(bind=True, name='grading.grade_exam')
+def grade_exam_task(self, exam_id: str, force: bool = False, run_id: str = None,
+                    sheet_ids: list = None):
+    """
+    Async task: grade every gradable sheet of an exam, one task per sheet.
+    """
+    from models.exam import Exam
+    from services.grading_service import GradingService
+
+    exam = Exam.objects(id=exam_id).first()
+    if not exam:
+        return {'exam_id': exam_id, 'status': 'failed', 'error': 'Exam not found'}
+
+    if sheet_ids is None:
+        sheet_ids = GradingService.gradable_sheet_ids(exam)
+    if not sheet_ids:
+        return finalize_exam_grading_task.run([], exam_id, run_id)
+
+    result = chord(
+        grade_sheet_task.s(sheet_id, force, run_id) for sheet_id in sheet_ids
+    )(finalize_exam_grading_task.s(exam_id, run_id))
+
+    print(f"[GradingTask] Exam {exam_id}: queued {len(sheet_ids)} sheet(s)")
+    return {
+        'exam_id': exam_id,
+        'status': 'queued',
+        'sheets_queued': len(sheet_ids),
+        'finalize_task_id': result.id,
+    }
+
+
+@celery.task(bind=True, name='pipeline.process_and_grade_exam')
+def process_and_grade_exam_task(self, exam_id: str, force: bool = False, run_id: str = None,
+                                sheet_ids: list = None):
+    """
+    Async task: OCR and grade an exam, one OCR → grading chain per sheet.
+
+    Sheets that already have OCR text skip straight to grading.
+    """
+    from models.exam import Exam
+    from models.answer_sheet import AnswerSheet
+    from tasks.ocr_tasks import process_sheet_task
+
+    exam = Exam.objects(id=exam_id).first()
+    if not exam:
+        return {'exam_id': exam_id, 'status': 'failed', 'error': 'Exam not found'}
+
+    sheets = AnswerSheet.objects(exam_id=exam)
+    if sheet_ids is not None:
+        sheets = sheets.filter(id__in=sheet_ids)
+    ocr_ids = [str(i) for i in sheets.filter(status__in=['uploaded', 'failed']).scalar('id')]
+    ready_ids = [str(i) for i in sheets.filter(status__in=['ocr_completed', 'graded']).scalar('id')]
+    if not ocr_ids and not ready_ids:
+        return finalize_exam_grading_task.run([], exam_id, run_id)
+
+    steps = [
+        chain(process_sheet_task.si(sheet_id, run_id), grade_ocr_result_task.s(force, run_id))
+        for sheet_id in ocr_ids
+    ] + [grade_sheet_task.si(sheet_id, force, run_id) for sheet_id in ready_ids]
+    result = chord(steps)(finalize_exam_grading_task.s(exam_id, run_id))
+
+    print(f"[GradingTask] Exam {exam_id}: pipelined {len(ocr_ids)} OCR + {len(ready_ids)} grading-only sheet(s)")
+    return {
+        'exam_id': exam_id,
+        'status': 'queued',
+        'sheets_queued': len(ocr_ids) + len(ready_ids),
+        'finalize_task_id': result.id,
+    }
@@ -1,33 +1,43 @@
 """
 Celery tasks for OCR processing.
+
+Tasks run inside the worker's shared Flask app context (see FlaskTask in
+tasks.celery_app), so services can access config directly.
 """
 
 from tasks.celery_app import celery
 
 
 @celery.task(bind=True, name='ocr.process_sheet')
-def process_sheet_task(self, answer_sheet_id: str):
+def process_sheet_task(self, answer_sheet_id: str, run_id: str = None):
     """
     Async task: run OCR on a single answer sheet.
 
-    Creates a Flask app context so that services can access config.
+    Never raises, so a bad sheet neither breaks its OCR → grading chain
+    nor keeps the exam's chord callback (which closes the run) from firing.
     """
-    from app import create_app
-    app = create_app()
-
-    with app.app_context():
-        from services.grading_service import GradingService
-        return GradingService.process_answer_sheet(answer_sheet_id)
+    from models.answer_sheet import AnswerSheet
+    from services.grading_service import GradingService
+    from services.grading_run_service import GradingRunService
+
+    try:
+        return GradingService.process_answer_sheet(answer_sheet_id, run_id=run_id)
+    except Exception as e:
+        error = getattr(e, 'message', None) or str(e)
+        print(f"[OCRTask] Sheet {answer_sheet_id} error: {error}")
+        AnswerSheet.objects(id=answer_sheet_id, status='processing').update(set__status='failed')
+        GradingRunService.record_sheet(run_id, answer_sheet_id, failed=True, stage='ocr')
+        return {
+            'answer_sheet_id': answer_sheet_id,
+            'status': 'failed',
+            'error': error,
+        }
 
 
 @celery.task(bind=True, name='ocr.process_exam')
-def process_exam_task(self, exam_id: str):
+def process_exam_task(self, exam_id: str, run_id: str = None, sheet_ids: list = None):
     """
     Async task: run OCR on all pending answer sheets for an exam.
     """
-    from app import create_app
-    app = create_app()
-
-    with app.app_context():
-        from services.grading_service import GradingService
-        return GradingService.process_exam_sheets(exam_id)
+    from services.grading_service import GradingService
+    return GradingService.process_exam_sheets(exam_id, run_id=run_id, sheet_ids=sheet_ids)
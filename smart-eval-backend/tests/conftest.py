@@ -2,6 +2,7 @@
 Pytest fixtures for SmartEval test suite.
 """
 import pytest
+from tests.query_counter import query_counter as _query_counter  # registers before the app connects
 from app import create_app
 from mongoengine import disconnect
 
@@ -19,6 +20,12 @@ def client(app):
     return app.test_client()
 
 
+@pytest.fixture
+def query_counter():
+    """Counts MongoDB commands issued inside ``with query_counter.record():``."""
+    return _query_counter
+
+
 @pytest.fixture(autouse=True)
 def clean_db():
     """Drop the test database between tests."""
@@ -0,0 +1,124 @@
+"""Integration test: MongoDB round-trips per request on hot grading endpoints.
+
+Each endpoint should cost a fixed number of queries no matter how many
+sheets the exam has — reference ids are read without dereferencing and
+per-sheet data is prefetched in one query per collection.
+
+Requires a running MongoDB instance; skipped otherwise.
+"""
+import pytest
+from pymongo import MongoClient
+
+
+def _mongo_available():
+    try:
+        c = MongoClient('localhost', 27017, serverSelectionTimeoutMS=2000)
+        c.admin.command('ping')
+        c.close()
+        return True
+    except Exception:
+        return False
+
+
+needs_mongo = pytest.mark.skipif(
+    not _mongo_available(),
+    reason='MongoDB not running on localhost:27017',
+)
+
+
+def _seed_exam(app, n_sheets=5, n_without_pages=0):
+    from models.user import User
+    from models.exam import Exam
+    from models.answer_sheet import AnswerSheet, OriginalFile
+    from models.evaluation import Evaluation
+    from models.ocr_page import OCRPage
+
+    with app.app_context():
+        teacher = User.objects(email='teacher@test.com').first()
+        exam = Exam(teacher_id=teacher, title='Biology', subject='Science', max_marks=10).save()
+        sheets = []
+        for i in range(n_sheets):
+            student = User(email=f'student{i}@test.com', password_hash='x', role='student').save()
+            sheet = AnswerSheet(exam_id=exam, student_id=student,
+                                original_file=OriginalFile(url=f'sheet{i}.pdf'),
+                                status='graded').save()
+            sheet.save_ocr_pages([OCRPage(page_number=1, text=f'Q1. answer {i}')])
+            Evaluation(answer_sheet_id=sheet, exam_id=exam,
+                       total_marks_awarded=6, total_max_marks=10, percentage=60.0,
+                       status='completed').save()
+            sheets.append(sheet)
+        # Not OCR'd yet, or OCR'd before pages moved out of the sheet (legacy embedded array)
+        for i in range(n_without_pages):
+            student = User(email=f'pending{i}@test.com', password_hash='x', role='student').save()
+            sheet = AnswerSheet(exam_id=exam, student_id=student,
+                                original_file=OriginalFile(url=f'pending{i}.pdf')).save()
+            if i % 2:
+                AnswerSheet._get_collection().update_one(
+                    {'_id': sheet.pk}, {'$set': {'ocr_results': [{'page_number': 1, 'text': 'legacy'}]}}
+                )
+            sheets.append(sheet)
+        return str(exam.id), [str(s.id) for s in sheets]
+
+
+@needs_mongo
+class TestGradingQueryCounts:
+    def test_list_sheets_is_constant(self, app, client, auth_headers, query_counter):
+        exam_id, _ = _seed_exam(app, n_sheets=5)
+
+        with query_counter.record():
+            resp = client.get(f'/api/v1/grading/exams/{exam_id}/sheets', headers=auth_headers)
+
+        assert resp.status_code == 200
+        assert len(resp.get_json()['data']) == 5
+        # exam, sheets, evaluations — the role check is served from the token and user cache
+        assert query_counter.count == 3, query_counter.commands
+        assert 'users' not in query_counter.by_collection()
+
+    def test_list_sheets_with_ocr(self, app, client, auth_headers, query_counter):
+        exam_id, _ = _seed_exam(app, n_sheets=5, n_without_pages=4)
+
+        with query_counter.record():
+            resp = client.get(f'/api/v1/grading/exams/{exam_id}/sheets?include_ocr=true', headers=auth_headers)
+
+        assert resp.status_code == 200
+        assert len(resp.get_json()['data']) == 9
+        assert query_counter.by_collection().get('ocr_pages') == 1
+        # exam, sheets, evaluations, ocr pages, one lookup for sheets without pages
+        assert query_counter.count == 5, query_counter.commands
+
+    def test_sheet_detail(self, app, client, auth_headers, query_counter):
+        _, sheet_ids = _seed_exam(app, n_sheets=1)
+
+        with query_counter.record():
+            resp = client.get(f'/api/v1/grading/sheets/{sheet_ids[0]}', headers=auth_headers)
+
+        assert resp.status_code == 200
+        # sheet, exam, ocr pages
+        assert query_counter.count == 3, query_counter.commands
+
+    def test_bulk_approve_is_constant(self, app, client, auth_headers, query_counter):
+        exam_id, _ = _seed_exam(app, n_sheets=5)
+
+        with query_counter.record():
+            resp = client.post(f'/api/v1/grading/exams/{exam_id}/approve-all', json={}, headers=auth_headers)
+
+        assert resp.status_code == 200
+        assert resp.get_json()['data']['approved_count'] == 5
+        # exam, one update_many on sheets, one $inc on exam statistics
+        assert query_counter.count == 3, query_counter.commands
+
+    def test_sheet_page_is_constant(self, app, client, auth_headers, query_counter):
+        exam_id, _ = _seed_exam(app, n_sheets=8)
+
+        first = client.get(f'/api/v1/grading/exams/{exam_id}/sheets?view=summary&limit=3',
+                           headers=auth_headers).get_json()
+        cursor = first['meta']['next_cursor']
+
+        with query_counter.record():
+            resp = client.get(f'/api/v1/grading/exams/{exam_id}/sheets?view=summary&limit=3&cursor={cursor}',
+                              headers=auth_headers)
+
+        assert resp.status_code == 200
+        assert len(resp.get_json()['data']) == 3
+        # exam, one page of sheets, evaluations for that page
+        assert query_counter.count == 3, query_counter.commands
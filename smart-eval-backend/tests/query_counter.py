@@ -0,0 +1,63 @@
+"""
+Counts MongoDB round-trips issued while a block of code runs.
+
+Registered globally with pymongo.monitoring before the app connects, so it
+sees every command mongoengine sends. Used to keep hot endpoints from
+regressing into per-row lookups.
+"""
+import threading
+from contextlib import contextmanager
+
+from pymongo import monitoring
+
+
+# Driver housekeeping, not queries made by the app
+_IGNORED = {'hello', 'ismaster', 'isMaster', 'ping', 'endSessions', 'buildinfo', 'buildInfo', 'saslStart', 'saslContinue'}
+
+
+class QueryCounter(monitoring.CommandListener):
+    """Records (command, collection) for each command while recording."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._recording = False
+        self.commands = []
+
+    @contextmanager
+    def record(self):
+        with self._lock:
+            self.commands = []
+            self._recording = True
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._recording = False
+
+    @property
+    def count(self) -> int:
+        return len(self.commands)
+
+    def by_collection(self) -> dict:
+        counts = {}
+        for _, collection in self.commands:
+            counts[collection] = counts.get(collection, 0) + 1
+        return counts
+
+    def started(self, event):
+        if event.command_name in _IGNORED:
+            return
+        collection = event.command.get(event.command_name)
+        with self._lock:
+            if self._recording:
+                self.commands.append((event.command_name, collection if isinstance(collection, str) else None))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+query_counter = QueryCounter()
+monitoring.register(query_counter)
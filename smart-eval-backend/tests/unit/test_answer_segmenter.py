@@ -0,0 +1,54 @@
+"""Unit tests for services/answer_segmenter.py"""
+from services.answer_segmenter import AnswerSegmenter
+
+
+class TestSegment:
+    def test_explicit_labels(self):
+        text = "Name: Asha\nQ1. Photosynthesis uses light.\nQ2) Mitochondria.\nAns 3: Osmosis."
+        segments, missing = AnswerSegmenter.segment(text, [1, 2, 3])
+        assert missing == []
+        assert segments[1] == 'Q1. Photosynthesis uses light.'
+        assert segments[2] == 'Q2) Mitochondria.'
+        assert segments[3] == 'Ans 3: Osmosis.'
+
+    def test_question_and_answer_words(self):
+        text = "Question 1\nfirst\nAnswer-2\nsecond"
+        segments, missing = AnswerSegmenter.segment(text, [1, 2])
+        assert missing == []
+        assert 'first' in segments[1] and 'second' not in segments[1]
+        assert segments[2].endswith('second')
+
+    def test_numbered_list_inside_answer_is_not_split(self):
+        text = "1. Force is a push or pull.\n2. Newton's laws:\n1. inertia\n2. F = ma\n3. Gravity."
+        segments, missing = AnswerSegmenter.segment(text, [1, 2, 3])
+        assert missing == []
+        assert segments[1] == '1. Force is a push or pull.'
+        assert 'inertia' in segments[2] and 'F = ma' in segments[2]
+        assert segments[3] == '3. Gravity.'
+
+    def test_explicit_labels_in_any_order(self):
+        text = "Q2 second answer\nQ1 first answer"
+        segments, missing = AnswerSegmenter.segment(text, [1, 2])
+        assert segments[1] == 'Q1 first answer'
+        assert segments[2] == 'Q2 second answer'
+
+    def test_decimal_is_not_a_label(self):
+        text = "Q1 mass is\n1.5 kg\nQ2 done"
+        segments, _ = AnswerSegmenter.segment(text, [1, 2])
+        assert '1.5 kg' in segments[1]
+
+    def test_missing_questions_reported(self):
+        text = "Q1 only one answer written"
+        segments, missing = AnswerSegmenter.segment(text, [1, 2, 3])
+        assert list(segments) == [1]
+        assert missing == [2, 3]
+
+    def test_single_question_uses_whole_sheet(self):
+        segments, missing = AnswerSegmenter.segment("  unlabeled essay  ", [4])
+        assert segments == {4: 'unlabeled essay'}
+        assert missing == []
+
+    def test_empty_text(self):
+        segments, missing = AnswerSegmenter.segment('', [1, 2])
+        assert segments == {}
+        assert missing == [1, 2]
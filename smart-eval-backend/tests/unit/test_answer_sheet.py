@@ -0,0 +1,105 @@
+"""Unit tests for models/answer_sheet.py — buffered processing-log writes and OCR pages.
+
+These tests require a running MongoDB instance. They will be skipped
+automatically when MongoDB is not available.
+"""
+import pytest
+from pymongo import MongoClient
+
+from models.answer_sheet import AnswerSheet, OriginalFile
+from models.exam import Exam
+from models.ocr_page import OCRPage
+from models.user import User
+
+
+def _mongo_available():
+    try:
+        c = MongoClient('localhost', 27017, serverSelectionTimeoutMS=2000)
+        c.admin.command('ping')
+        c.close()
+        return True
+    except Exception:
+        return False
+
+
+needs_mongo = pytest.mark.skipif(
+    not _mongo_available(),
+    reason='MongoDB not running on localhost:27017',
+)
+
+
+def _sheet():
+    teacher = User(email='t@test.com', password_hash='x', role='teacher').save()
+    student = User(email='s@test.com', password_hash='x', role='student').save()
+    exam = Exam(teacher_id=teacher, title='Biology', subject='Science').save()
+    return AnswerSheet(exam_id=exam, student_id=student,
+                       original_file=OriginalFile(url='/uploads/a.pdf')).save()
+
+
+@needs_mongo
+class TestProcessingLog:
+    def test_log_and_status_written_atomically(self, app):
+        with app.app_context():
+            sheet = _sheet()
+            sheet.status = 'processing'
+            sheet.add_processing_log('ocr', 'started')
+
+            raw = AnswerSheet._get_collection().find_one({'_id': sheet.id})
+            assert raw['status'] == 'processing'
+            assert [entry['stage'] for entry in raw['processing_log']] == ['ocr']
+
+    def test_buffered_entries_flush_with_fields(self, app):
+        with app.app_context():
+            sheet = _sheet()
+            sheet.original_file.pages = 3
+            sheet.status = 'ocr_completed'
+            sheet.add_processing_log('ocr', 'started', flush=False)
+            sheet.add_processing_log('ocr', 'completed', flush=False)
+            sheet.flush_updates('original_file.pages')
+
+            reloaded = AnswerSheet.objects(id=sheet.id).first()
+            assert reloaded.status == 'ocr_completed'
+            assert reloaded.original_file.pages == 3
+            assert [entry.status for entry in reloaded.processing_log] == ['started', 'completed']
+
+
+@needs_mongo
+class TestOCRPages:
+    def test_pages_stored_outside_sheet(self, app):
+        with app.app_context():
+            sheet = _sheet()
+            sheet.save_ocr_pages([OCRPage(page_number=2, text='Q2. b'), OCRPage(page_number=1, text='Q1. a')])
+
+            raw = AnswerSheet._get_collection().find_one({'_id': sheet.id})
+            assert 'ocr_results' not in raw
+            assert sheet.load_ocr_text() == 'Q1. a\nQ2. b'
+
+            sheet.save_ocr_pages([OCRPage(page_number=1, text='rerun')])
+            assert [p.text for p in sheet.load_ocr_pages()] == ['rerun']
+
+    def test_interrupted_save_keeps_text(self, app, monkeypatch):
+        from mongoengine.queryset import QuerySet
+
+        def crash(self, *args, **kwargs):
+            raise RuntimeError('worker killed')
+
+        with app.app_context():
+            sheet = _sheet()
+            sheet.save_ocr_pages([OCRPage(page_number=1, text='old 1'), OCRPage(page_number=2, text='old 2')])
+
+            monkeypatch.setattr(QuerySet, 'delete', crash)
+            with pytest.raises(RuntimeError):
+                sheet.save_ocr_pages([OCRPage(page_number=1, text='new 1')])
+
+            # New pages are in place before stale ones are dropped
+            assert sheet.load_ocr_text() == 'new 1\nold 2'
+
+    def test_legacy_embedded_pages_still_load(self, app):
+        with app.app_context():
+            sheet = _sheet()
+            AnswerSheet._get_collection().update_one(
+                {'_id': sheet.id},
+                {'$set': {'ocr_results': [{'page_number': 1, 'text': 'legacy text'}]}}
+            )
+            reloaded = AnswerSheet.objects(id=sheet.id).first()
+            assert reloaded.load_ocr_text() == 'legacy text'
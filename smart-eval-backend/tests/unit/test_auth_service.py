@@ -1,12 +1,18 @@
-"""Unit tests for auth service — registration and login.
+"""Unit tests for auth service — registration, login and role checks.
 
-These tests require a running MongoDB instance. They will be skipped
-automatically when MongoDB is not available.
+The registration and login tests require a running MongoDB instance. They
+will be skipped automatically when MongoDB is not available.
 """
 import pytest
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
 from pymongo import MongoClient
 from pymongo.errors import ServerSelectionTimeoutError
 
+import services.auth_service as auth_service_module
+from services.auth_service import AuthService
+from utils.decorators import role_required
+
 
 def _mongo_available():
     try:
@@ -92,3 +98,96 @@ class TestLogin:
             'password': 'Whatever1',
         })
         assert resp.status_code == 401
+
+
+class _FakeUsers:
+    """Stands in for User.objects: counts lookups and returns the current role."""
+
+    def __init__(self, role):
+        self.role = role
+        self.lookups = 0
+
+    def __call__(self, **kwargs):
+        self.lookups += 1
+        return self
+
+    def only(self, *fields):
+        return self
+
+    def first(self):
+        return type('U', (), {'role': self.role})() if self.role else None
+
+
+def _patch_users(monkeypatch, role):
+    """Swap in fake users (as seen by the role cache) with the given role."""
+    users = _FakeUsers(role)
+    monkeypatch.setattr(auth_service_module, 'User', type('User', (), {'objects': users}))
+    monkeypatch.setattr(AuthService, '_role_cache', {})
+    return users
+
+
+class TestRoleRequired:
+    @pytest.fixture
+    def guarded(self):
+        """Minimal app with one teacher-only route."""
+        app = Flask(__name__)
+        app.config.update(JWT_SECRET_KEY='test-secret', AUTH_USER_CACHE_TTL=30)
+        JWTManager(app)
+
+        @app.route('/teacher-only')
+        @role_required('teacher')
+        def teacher_only():
+            return {'ok': True}
+
+        return app
+
+    def _headers(self, app, role=None):
+        claims = {'role': role} if role else None
+        with app.app_context():
+            token = create_access_token(identity='u1', additional_claims=claims)
+        return {'Authorization': f'Bearer {token}'}
+
+    def test_role_is_cached_between_requests(self, guarded, monkeypatch):
+        users = _patch_users(monkeypatch, 'teacher')
+        client = guarded.test_client()
+        headers = self._headers(guarded, 'teacher')
+
+        assert client.get('/teacher-only', headers=headers).status_code == 200
+        assert client.get('/teacher-only', headers=headers).status_code == 200
+        assert users.lookups == 1
+
+    def test_wrong_role_forbidden(self, guarded, monkeypatch):
+        _patch_users(monkeypatch, 'student')
+        headers = self._headers(guarded, 'student')
+
+        assert guarded.test_client().get('/teacher-only', headers=headers).status_code == 403
+
+    def test_demoted_user_token_is_rejected(self, guarded, monkeypatch):
+        users = _patch_users(monkeypatch, 'teacher')
+        client = guarded.test_client()
+        headers = self._headers(guarded, 'teacher')
+        assert client.get('/teacher-only', headers=headers).status_code == 200
+
+        users.role = 'student'
+        assert client.get('/teacher-only', headers=headers).status_code == 200  # cached role
+
+        monkeypatch.setattr(AuthService, '_role_cache', {})  # cache entry expired
+        resp = client.get('/teacher-only', headers=headers)
+        assert resp.status_code == 401
+        assert resp.get_json()['error']['message'] == 'Token is no longer valid, please log in again'
+
+    def test_deleted_user_is_rejected(self, guarded, monkeypatch):
+        _patch_users(monkeypatch, None)
+        headers = self._headers(guarded, 'teacher')
+
+        assert guarded.test_client().get('/teacher-only', headers=headers).status_code == 401
+
+    def test_zero_ttl_checks_every_request(self, guarded, monkeypatch):
+        users = _patch_users(monkeypatch, 'teacher')
+        guarded.config['AUTH_USER_CACHE_TTL'] = 0
+        client = guarded.test_client()
+        headers = self._headers(guarded, 'teacher')
+
+        client.get('/teacher-only', headers=headers)
+        client.get('/teacher-only', headers=headers)
+        assert users.lookups == 2
@@ -0,0 +1,170 @@
+"""Unit tests for models/grading_run.py and services/grading_run_service.py.
+
+The checkpoint tests require a running MongoDB instance. They will be
+skipped automatically when MongoDB is not available.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo import MongoClient
+
+from models.grading_run import GradingRun
+from services.grading_run_service import GradingRunService
+from utils.exceptions import RunCancelled
+
+
+def _mongo_available():
+    try:
+        c = MongoClient('localhost', 27017, serverSelectionTimeoutMS=2000)
+        c.admin.command('ping')
+        c.close()
+        return True
+    except Exception:
+        return False
+
+
+needs_mongo = pytest.mark.skipif(
+    not _mongo_available(),
+    reason='MongoDB not running on localhost:27017',
+)
+
+
+class TestRunState:
+    def test_remaining_excludes_completed_only(self):
+        run = GradingRun(kind='grading', sheet_ids=['a', 'b', 'c'],
+                         completed_sheet_ids=['a'], failed_sheet_ids=['b'])
+        assert run.remaining_sheet_ids == ['b', 'c']
+
+    def test_resumable_states(self):
+        assert GradingRun(kind='grading', status='cancelled', sheet_ids=['a']).is_resumable
+        assert not GradingRun(kind='grading', status='completed', sheet_ids=['a'],
+                              completed_sheet_ids=['a']).is_resumable
+        assert not GradingRun(kind='grading', status='running', sheet_ids=['a']).is_resumable
+
+    def test_silent_active_run_is_stale(self):
+        run = GradingRun(kind='ocr', status='running', sheet_ids=['a'],
+                         updated_at=datetime.utcnow() - timedelta(hours=1))
+        assert run.is_stale and run.is_resumable
+
+    def test_check_without_run_is_a_no_op(self):
+        GradingRunService.check(None)
+
+    def test_resume_is_seen_without_local_invalidation(self, monkeypatch):
+        import services.grading_run_service as grading_run_service
+
+        class Runs:
+            status = 'cancelled'
+            lookups = 0
+
+            def __call__(self, **query):
+                Runs.lookups += 1
+                return self
+
+            def only(self, *fields):
+                return self
+
+            def first(self):
+                return GradingRun(kind='grading', status=Runs.status)
+
+        monkeypatch.setattr(grading_run_service, 'GradingRun', type('GradingRun', (), {'objects': Runs()}))
+        monkeypatch.setattr(GradingRunService, '_cancel_checks', {})
+
+        assert GradingRunService.is_cancelled('run1')
+        Runs.status = 'running'  # resumed by another process
+        assert not GradingRunService.is_cancelled('run1')
+        assert not GradingRunService.is_cancelled('run1')
+        assert Runs.lookups == 2  # "running" is reused for CANCEL_CHECK_INTERVAL
+
+
+@needs_mongo
+class TestCheckpoints:
+    def _run(self, app, sheet_ids=('s1', 's2')):
+        from models.user import User
+        from models.exam import Exam
+
+        teacher = User(email='t@test.com', password_hash='x', role='teacher').save()
+        exam = Exam(teacher_id=teacher, title='T', subject='S', max_marks=10).save()
+        return GradingRunService.start(exam, 'grading', list(sheet_ids))
+
+    def test_question_checkpoint_round_trip(self, app):
+        with app.app_context():
+            run = self._run(app)
+            GradingRunService.record_question(run.id, 's1', {'question_number': 2, 'marks_awarded': 4})
+            saved = GradingRunService.question_checkpoint(run.id, 's1')
+
+            GradingRunService.record_sheet(run.id, 's1')
+            run.reload()
+
+        assert saved == {2: {'question_number': 2, 'marks_awarded': 4}}
+        assert run.completed_sheet_ids == ['s1']
+        assert run.checkpoints == {}
+
+    def test_cancel_is_seen_by_workers(self, app):
+        with app.app_context():
+            run = self._run(app)
+            GradingRunService.cancel(run)
+            GradingRunService._cancel_checks.clear()
+
+            with pytest.raises(RunCancelled):
+                GradingRunService.check(run.id)
+
+            GradingRunService.finish(run.id, {'total': 0})
+            run.reload()
+
+        assert run.status == 'cancelled'
+        assert run.remaining_sheet_ids == ['s1', 's2']
+
+    def test_stopped_run_restores_pre_run_status(self, app):
+        from models.user import User
+        from models.exam import Exam
+        from models.answer_sheet import AnswerSheet, OriginalFile
+
+        with app.app_context():
+            teacher = User(email='t@test.com', password_hash='x', role='teacher').save()
+            exam = Exam(teacher_id=teacher, title='T', subject='S', max_marks=10).save()
+            sheets = [AnswerSheet(exam_id=exam, student_id=teacher, status=status,
+                                  original_file=OriginalFile(url='x.pdf')).save()
+                      for status in ('failed', 'ocr_completed')]
+            previous = {str(sheet.id): sheet.status for sheet in sheets}
+            AnswerSheet.objects(id__in=[s.id for s in sheets]).update(set__status='processing')
+
+            run = GradingRunService.start(exam, 'grading', list(previous), sheet_statuses=previous)
+            GradingRunService.cancel(run)
+            GradingRunService.finish(run.id, {'total': 0})
+
+            statuses = [AnswerSheet.objects(id=sheet.id).first().status for sheet in sheets]
+
+        # An OCR failure stays failed instead of becoming gradable without text
+        assert statuses == ['failed', 'ocr_completed']
+
+    def test_cancelled_regrade_keeps_graded_sheet_graded(self, app, monkeypatch):
+        from models.user import User
+        from models.exam import Exam, ModelAnswer, ParsedAnswer
+        from models.answer_sheet import AnswerSheet, OriginalFile
+        from models.evaluation import Evaluation
+        from models.ocr_page import OCRPage
+        from services.grading_service import GradingService
+        from services.llm_service import LLMService
+
+        def cancelled(**kwargs):
+            raise RunCancelled('cancelled mid-sheet')
+
+        monkeypatch.setattr(LLMService, 'grade_full_sheet', staticmethod(cancelled))
+        with app.app_context():
+            teacher = User(email='t@test.com', password_hash='x', role='teacher').save()
+            exam = Exam(teacher_id=teacher, title='T', subject='S', max_marks=10, model_answer=ModelAnswer(
+                parsed_answers=[ParsedAnswer(question_number=1, max_marks=10, answer_text='a')]
+            )).save()
+            sheet = AnswerSheet(exam_id=exam, student_id=teacher, status='graded',
+                                original_file=OriginalFile(url='x.pdf')).save()
+            sheet.save_ocr_pages([OCRPage(page_number=1, text='Q1. a')])
+            Evaluation(answer_sheet_id=sheet, exam_id=exam, status='completed', percentage=80.0).save()
+            AnswerSheet.objects(id=sheet.id).update(set__status='processing')
+            run = GradingRunService.start(exam, 'grading', [str(sheet.id)],
+                                          sheet_statuses={str(sheet.id): 'graded'})
+
+            result = GradingService.grade_answer_sheet(str(sheet.id), force=True, run_id=run.id)
+            sheet.reload()
+
+        assert result['status'] == 'cancelled'
+        assert sheet.status == 'graded'
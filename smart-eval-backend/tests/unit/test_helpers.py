@@ -5,9 +5,15 @@ from utils.helpers import (
     validate_email,
     validate_password,
     format_datetime,
+    encode_cursor,
+    decode_cursor,
+    parse_fields,
 )
 from datetime import datetime
 
+import pytest
+from bson import ObjectId
+
 
 class TestSuccessResponse:
     def test_basic(self):
@@ -85,3 +91,31 @@ class TestFormatDatetime:
         result = format_datetime(dt)
         assert result.endswith('Z')
         assert '2026-01-15' in result
+
+
+class TestCursor:
+    def test_round_trip(self):
+        created_at = datetime(2026, 1, 15, 10, 30, 0, 123000)
+        doc_id = ObjectId()
+        assert decode_cursor(encode_cursor(created_at, doc_id)) == (created_at, doc_id)
+
+    def test_url_safe(self):
+        cursor = encode_cursor(datetime(2026, 1, 15), ObjectId())
+        assert '=' not in cursor and '+' not in cursor and '/' not in cursor
+
+    def test_malformed(self):
+        with pytest.raises(ValueError):
+            decode_cursor('not-a-cursor')
+
+
+class TestParseFields:
+    def test_empty(self):
+        assert parse_fields(None, ['status']) is None
+        assert parse_fields('', ['status']) is None
+
+    def test_selected(self):
+        assert parse_fields('status, score', ['status', 'score', 'id']) == ['status', 'score']
+
+    def test_unknown_field(self):
+        with pytest.raises(ValueError, match='bogus'):
+            parse_fields('status,bogus', ['status'])
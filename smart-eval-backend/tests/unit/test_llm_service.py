@@ -0,0 +1,291 @@
+"""Unit tests for services/llm_service.py — prompt assembly and response parsing."""
+import json
+import threading
+import time
+
+import pytest
+
+from services.cache_service import CacheService
+from services.llm_service import LLMService
+
+
+def _reply(question_number, marks):
+    return json.dumps({
+        'question_number': question_number,
+        'marks_awarded': marks,
+        'feedback': 'ok',
+        'confidence': 0.9,
+    })
+
+
+PARSED_ANSWERS = [
+    {'question_number': 1, 'max_marks': 5, 'answer_text': 'Light energy', 'keywords': [], 'concepts': []},
+    {'question_number': 2, 'max_marks': 5, 'answer_text': 'Powerhouse', 'keywords': [], 'concepts': []},
+]
+
+
+class TestGradeFullSheet:
+    def test_each_prompt_gets_only_its_answer(self, app, monkeypatch):
+        prompts = []
+
+        def fake_complete(prompt):
+            prompts.append(prompt)
+            return _reply(len(prompts), 4)
+
+        monkeypatch.setattr(LLMService, '_complete', staticmethod(fake_complete))
+        sheet = "Q1. plants use sunlight\nQ2. cell powerhouse"
+
+        with app.app_context():
+            results = LLMService.grade_full_sheet(sheet, PARSED_ANSWERS)
+
+        assert [r['marks_awarded'] for r in results] == [4.0, 4.0]
+        assert 'plants use sunlight' in prompts[0] and 'cell powerhouse' not in prompts[0]
+        assert 'cell powerhouse' in prompts[1] and 'plants use sunlight' not in prompts[1]
+
+    def test_unlabelled_sheet_falls_back_to_llm_segmentation(self, app, monkeypatch):
+        prompts = []
+        segmentation = json.dumps({'answers': [
+            {'question_number': 1, 'answer_text': 'plants use sunlight'},
+            {'question_number': 2, 'answer_text': 'cell powerhouse'},
+        ]})
+
+        def fake_complete(prompt):
+            prompts.append(prompt)
+            return segmentation if len(prompts) == 1 else _reply(len(prompts) - 1, 3)
+
+        monkeypatch.setattr(LLMService, '_complete', staticmethod(fake_complete))
+
+        with app.app_context():
+            LLMService.grade_full_sheet("plants use sunlight and the cell powerhouse", PARSED_ANSWERS)
+
+        assert len(prompts) == 3
+        assert "ANSWER FOR QUESTION 2" in prompts[2]
+        assert 'plants use sunlight' not in prompts[2]
+
+
+class TestBatchedGrading:
+    def test_one_call_grades_all_questions(self, app, monkeypatch):
+        prompts = []
+
+        def fake_complete(prompt):
+            prompts.append(prompt)
+            return json.dumps({'results': [
+                {'question_number': 1, 'marks_awarded': 4, 'feedback': 'good'},
+                {'question_number': 2, 'marks_awarded': 9, 'feedback': 'great'},
+            ]})
+
+        monkeypatch.setattr(LLMService, '_complete', staticmethod(fake_complete))
+        sheet = "Q1. plants use sunlight\nQ2. cell powerhouse"
+
+        with app.app_context():
+            results = LLMService.grade_full_sheet(sheet, PARSED_ANSWERS, mode='batched')
+
+        assert len(prompts) == 1
+        assert [r['question_number'] for r in results] == [1, 2]
+        assert [r['marks_awarded'] for r in results] == [4.0, 5.0]  # clamped to max_marks
+
+    def test_malformed_items_are_regraded_individually(self, app, monkeypatch):
+        prompts = []
+
+        def fake_complete(prompt):
+            prompts.append(prompt)
+            if len(prompts) == 1:
+                return json.dumps({'results': [
+                    {'question_number': 1, 'marks_awarded': 'n/a'},
+                    {'question_number': 2, 'marks_awarded': 3},
+                ]})
+            return _reply(1, 2)
+
+        monkeypatch.setattr(LLMService, '_complete', staticmethod(fake_complete))
+        sheet = "Q1. plants use sunlight\nQ2. cell powerhouse"
+
+        with app.app_context():
+            results = LLMService.grade_full_sheet(sheet, PARSED_ANSWERS, mode='batched')
+
+        assert len(prompts) == 2
+        assert "ANSWER FOR QUESTION 1" in prompts[1]
+        assert [r['marks_awarded'] for r in results] == [2.0, 3.0]
+
+
+class TestParallelGrading:
+    def test_results_follow_question_order(self, app, monkeypatch):
+        parsed = [
+            {'question_number': n, 'max_marks': 5, 'answer_text': '', 'keywords': [], 'concepts': []}
+            for n in (1, 2, 3, 4)
+        ]
+        in_flight = []
+        peak = []
+        lock = threading.Lock()
+
+        def fake_dispatch(provider, prompt, api_url=None, model=None):
+            number = int(prompt.split('ANSWER FOR QUESTION ')[1].split(' ')[0])
+            with lock:
+                in_flight.append(number)
+                peak.append(len(in_flight))
+            time.sleep(0.05 * (5 - number))  # later questions finish first
+            with lock:
+                in_flight.remove(number)
+            return _reply(number, number)
+
+        monkeypatch.setattr(LLMService, '_dispatch', staticmethod(fake_dispatch))
+        monkeypatch.setitem(app.config, 'LLM_MAX_CONCURRENCY', 2)
+        sheet = "Q1. a\nQ2. b\nQ3. c\nQ4. d"
+
+        with app.app_context():
+            results = LLMService.grade_full_sheet(sheet, parsed)
+
+        assert [r['question_number'] for r in results] == [1, 2, 3, 4]
+        assert [r['marks_awarded'] for r in results] == [1.0, 2.0, 3.0, 4.0]
+        assert max(peak) == 2
+
+
+class TestGradingCache:
+    def _use_dict_cache(self, app, monkeypatch):
+        store = {}
+        monkeypatch.setitem(app.config, 'GRADING_CACHE_ENABLED', True)
+        monkeypatch.setattr(CacheService, 'get', staticmethod(lambda ns, key: store.get((ns, key))))
+        monkeypatch.setattr(CacheService, 'put',
+                            staticmethod(lambda ns, key, value, exam_id=None: store.__setitem__((ns, key), value)))
+        return store
+
+    def test_regrade_with_same_inputs_skips_llm(self, app, monkeypatch):
+        self._use_dict_cache(app, monkeypatch)
+        calls = []
+
+        def fake_complete(prompt):
+            calls.append(prompt)
+            return _reply(len(calls), 3)
+
+        monkeypatch.setattr(LLMService, '_complete', staticmethod(fake_complete))
+        sheet = "Q1. plants use sunlight\nQ2. cell powerhouse"
+
+        with app.app_context():
+            first = LLMService.grade_full_sheet(sheet, PARSED_ANSWERS, exam_id='e1')
+            second = LLMService.grade_full_sheet(sheet, PARSED_ANSWERS, exam_id='e1')
+            changed = [dict(PARSED_ANSWERS[0], answer_text='Photosynthesis'), PARSED_ANSWERS[1]]
+            LLMService.grade_full_sheet(sheet, changed, exam_id='e1')
+
+        assert [r['marks_awarded'] for r in second] == [r['marks_awarded'] for r in first]
+        assert all(r.get('cached') for r in second)
+        assert len(calls) == 3  # two on the first run, one for the edited model answer
+
+    def test_force_bypasses_cache(self, app, monkeypatch):
+        self._use_dict_cache(app, monkeypatch)
+        calls = []
+
+        def fake_complete(prompt):
+            calls.append(prompt)
+            return _reply(1, 3)
+
+        monkeypatch.setattr(LLMService, '_complete', staticmethod(fake_complete))
+        sheet = "Q1. plants use sunlight\nQ2. cell powerhouse"
+
+        with app.app_context():
+            LLMService.grade_full_sheet(sheet, PARSED_ANSWERS)
+            results = LLMService.grade_full_sheet(sheet, PARSED_ANSWERS, use_cache=False)
+
+        assert len(calls) == 4
+        assert not any(r.get('cached') for r in results)
+
+
+class TestIncrementalGrading:
+    def test_unchanged_questions_are_not_regraded(self, app, monkeypatch):
+        calls = []
+
+        def fake_complete(prompt):
+            calls.append(prompt)
+            return _reply(1, 3)
+
+        monkeypatch.setattr(LLMService, '_complete', staticmethod(fake_complete))
+
+        with app.app_context():
+            first = LLMService.grade_full_sheet("Q1. plants use sunlight\nQ2. cell powerhouse", PARSED_ANSWERS)
+            previous = {r['question_number']: r['input_fingerprint'] for r in first}
+            calls.clear()
+            second = LLMService.grade_full_sheet("Q1. plants use sunlight\nQ2. mitochondria",
+                                                 PARSED_ANSWERS, previous=previous)
+
+        assert len(calls) == 1 and 'mitochondria' in calls[0]
+        assert second[0] == {'question_number': 1, 'input_fingerprint': previous[1], 'unchanged': True}
+        assert second[1]['input_fingerprint'] != previous[2]
+
+    def test_mode_change_regrades(self, app, monkeypatch):
+        monkeypatch.setattr(LLMService, '_complete', staticmethod(lambda prompt: _reply(1, 3)))
+        sheet = "Q1. plants use sunlight\nQ2. cell powerhouse"
+
+        with app.app_context():
+            first = LLMService.grade_full_sheet(sheet, PARSED_ANSWERS, mode='per_question')
+            previous = {r['question_number']: r['input_fingerprint'] for r in first}
+            second = LLMService.grade_full_sheet(sheet, PARSED_ANSWERS, mode='batched', previous=previous)
+
+        assert not any(r.get('unchanged') for r in second)
+
+    def test_exam_total_change_changes_sheet_fingerprint(self, app):
+        sheet = "Q1. plants use sunlight\nQ2. cell powerhouse"
+
+        with app.app_context():
+            before = LLMService.sheet_fingerprint(sheet, PARSED_ANSWERS, 'moderate', 'per_question', 10)
+            after = LLMService.sheet_fingerprint(sheet, PARSED_ANSWERS, 'moderate', 'per_question', 20)
+
+        assert before != after
+
+
+class TestResumeAndCancel:
+    def test_checkpointed_questions_are_reused(self, app, monkeypatch):
+        calls = []
+
+        def fake_complete(prompt):
+            calls.append(prompt)
+            return _reply(1, 3)
+
+        monkeypatch.setattr(LLMService, '_complete', staticmethod(fake_complete))
+        sheet = "Q1. plants use sunlight\nQ2. cell powerhouse"
+
+        with app.app_context():
+            first = LLMService.grade_full_sheet(sheet, PARSED_ANSWERS)
+            calls.clear()
+            resumed = LLMService.grade_full_sheet(sheet, PARSED_ANSWERS, completed={1: first[0]})
+
+        assert len(calls) == 1 and 'cell powerhouse' in calls[0]
+        assert resumed[0]['resumed'] is True
+        assert resumed[0]['marks_awarded'] == first[0]['marks_awarded']
+
+    def test_before_call_can_stop_grading(self, app, monkeypatch):
+        calls = []
+
+        def fake_complete(prompt):
+            calls.append(prompt)
+            return _reply(1, 3)
+
+        def stop():
+            if calls:
+                raise RuntimeError('cancelled')
+
+        monkeypatch.setattr(LLMService, '_complete', staticmethod(fake_complete))
+        monkeypatch.setitem(app.config, 'LLM_MAX_CONCURRENCY', 1)
+        graded = []
+
+        with app.app_context(), pytest.raises(RuntimeError):
+            LLMService.grade_full_sheet("Q1. a\nQ2. b", PARSED_ANSWERS,
+                                        on_result=graded.append, before_call=stop)
+
+        assert len(calls) == 1
+        assert [r['question_number'] for r in graded] == [1]
+
+    def test_before_call_guards_llm_segmentation(self, app, monkeypatch):
+        calls = []
+
+        def fake_complete(prompt):
+            calls.append(prompt)
+            return '{}'
+
+        def stop():
+            raise RuntimeError('cancelled')
+
+        monkeypatch.setattr(LLMService, '_complete', staticmethod(fake_complete))
+
+        with app.app_context(), pytest.raises(RuntimeError):
+            # No question labels, so the sheet would be segmented by the LLM
+            LLMService.grade_full_sheet("plants use sunlight", PARSED_ANSWERS, before_call=stop)
+
+        assert calls == []
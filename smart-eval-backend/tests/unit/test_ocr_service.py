@@ -0,0 +1,137 @@
+"""Unit tests for services/ocr_service.py — page dispatch and reassembly."""
+import time
+import pytest
+
+from services.ocr_service import OCRService
+from utils.exceptions import ValidationError
+
+
+@pytest.fixture
+def pdf_file(tmp_path):
+    path = tmp_path / 'sheet.pdf'
+    path.write_bytes(b'%PDF-stub')
+    return str(path)
+
+
+@pytest.fixture
+def image_file(tmp_path):
+    path = tmp_path / 'sheet.png'
+    path.write_bytes(b'png-stub')
+    return str(path)
+
+
+def _fake_pages(monkeypatch, names):
+    def fake_iter(path):
+        for idx, name in enumerate(names):
+            yield idx + 1, len(names), name, 'image/png'
+
+    monkeypatch.setattr(OCRService, '_iter_pdf_images_b64', staticmethod(fake_iter))
+
+
+class TestExtractText:
+    def test_pages_returned_in_order(self, app, pdf_file, monkeypatch):
+        _fake_pages(monkeypatch, [f'page-{n}' for n in range(1, 6)])
+
+        def fake_call(image_b64, mime_type):
+            # Later pages finish first
+            time.sleep(0.01 * (6 - int(image_b64.split('-')[1])))
+            return f'text of {image_b64}'
+
+        monkeypatch.setattr(OCRService, '_call_provider', staticmethod(fake_call))
+        monkeypatch.setitem(app.config, 'VISION_MAX_CONCURRENCY', 5)
+
+        with app.app_context():
+            results = OCRService.extract_text(pdf_file)
+
+        assert [r['page_number'] for r in results] == [1, 2, 3, 4, 5]
+        assert results[2]['text'] == 'text of page-3'
+
+    def test_failed_page_is_isolated(self, app, pdf_file, monkeypatch):
+        _fake_pages(monkeypatch, ['ok-1', 'bad-2', 'ok-3'])
+
+        def fake_call(image_b64, mime_type):
+            if image_b64.startswith('bad'):
+                raise ValidationError('provider exploded')
+            return image_b64
+
+        monkeypatch.setattr(OCRService, '_call_provider', staticmethod(fake_call))
+
+        with app.app_context():
+            results = OCRService.extract_text(pdf_file)
+
+        assert [r['text'] for r in results] == ['ok-1', '', 'ok-3']
+        assert results[1]['confidence'] == 0.0
+        assert results[1]['error'] == 'provider exploded'
+
+    def test_rendering_is_bounded_by_window(self, app, pdf_file, monkeypatch):
+        rendered = []
+        in_flight_at_render = []
+
+        def fake_iter(path):
+            for n in range(1, 9):
+                in_flight_at_render.append(len(rendered) - len(finished))
+                rendered.append(n)
+                yield n, 8, f'page-{n}', 'image/png'
+
+        finished = []
+
+        def fake_call(image_b64, mime_type):
+            time.sleep(0.01)
+            finished.append(image_b64)
+            return image_b64
+
+        monkeypatch.setattr(OCRService, '_iter_pdf_images_b64', staticmethod(fake_iter))
+        monkeypatch.setattr(OCRService, '_call_provider', staticmethod(fake_call))
+        monkeypatch.setitem(app.config, 'VISION_MAX_CONCURRENCY', 2)
+
+        with app.app_context():
+            results = OCRService.extract_text(pdf_file)
+
+        assert len(results) == 8
+        # Never more than max_in_flight + 1 pages waiting when rendering the next
+        assert max(in_flight_at_render) <= 3
+
+    def test_cached_pages_skip_provider(self, app, pdf_file, monkeypatch):
+        from services.cache_service import CacheService
+
+        _fake_pages(monkeypatch, ['page-1', 'page-2'])
+        store = {}
+        calls = []
+
+        def fake_get(namespace, key):
+            return store.get(key)
+
+        def fake_put(namespace, key, value, exam_id=None):
+            store[key] = value
+
+        def fake_call(image_b64, mime_type):
+            calls.append(image_b64)
+            return f'text of {image_b64}'
+
+        monkeypatch.setattr(CacheService, 'get', staticmethod(fake_get))
+        monkeypatch.setattr(CacheService, 'put', staticmethod(fake_put))
+        monkeypatch.setattr(OCRService, '_call_provider', staticmethod(fake_call))
+        monkeypatch.setitem(app.config, 'OCR_CACHE_ENABLED', True)
+
+        with app.app_context():
+            first = OCRService.extract_text(pdf_file)
+            second = OCRService.extract_text(pdf_file)
+
+            # A different model must not reuse the cached text
+            monkeypatch.setitem(app.config, 'VISION_MODEL', 'other-model')
+            OCRService.extract_text(pdf_file)
+
+        assert calls == ['page-1', 'page-2', 'page-1', 'page-2']
+        assert [p['text'] for p in second] == [p['text'] for p in first]
+        assert all(p.get('cached') for p in second)
+
+    def test_all_pages_failed_raises(self, app, image_file, monkeypatch):
+        def fake_call(image_b64, mime_type):
+            raise ValidationError('provider down')
+
+        monkeypatch.setattr(OCRService, '_call_provider', staticmethod(fake_call))
+
+        with app.app_context():
+            with pytest.raises(ValidationError) as exc:
+                OCRService.extract_text(image_file)
+        assert exc.value.message == 'provider down'
@@ -0,0 +1,110 @@
+"""Unit tests for services/progress_service.py — progress events and SSE framing."""
+import json
+import time
+
+import pytest
+
+import app.extensions as extensions
+from services.progress_service import ProgressService
+from utils.exceptions import AuthenticationError
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+@pytest.fixture
+def no_redis(monkeypatch):
+    monkeypatch.setattr(extensions, 'redis_client', None)
+
+
+class TestLocalDelivery:
+    def test_subscriber_receives_published_events(self, no_redis):
+        stream = ProgressService.stream('exam1', heartbeat=0.05, snapshot={'total': 2})
+        assert next(stream).startswith('event: snapshot\n')
+        assert next(stream) == ': keep-alive\n\n'  # registers the subscriber
+
+        ProgressService.publish('exam1', 'sheet_started', sheet_id='s1', stage='grading')
+        chunk = next(stream)
+        stream.close()
+
+        event, data = chunk.split('\n')[:2]
+        assert event == 'event: sheet_started'
+        payload = json.loads(data[len('data: '):])
+        assert payload['sheet_id'] == 's1'
+        assert payload['exam_id'] == 'exam1'
+
+    def test_closing_the_stream_unsubscribes(self, no_redis):
+        stream = ProgressService.stream('exam2', heartbeat=0.01)
+        next(stream)
+        assert 'exam2' in ProgressService._local
+        stream.close()
+        assert 'exam2' not in ProgressService._local
+
+    def test_other_exams_are_not_delivered(self, no_redis):
+        stream = ProgressService.stream('exam3', heartbeat=0.01)
+        next(stream)
+        ProgressService.publish('other', 'sheet_started', sheet_id='s1')
+        assert next(stream) == ': keep-alive\n\n'
+        stream.close()
+
+    def test_stream_ends_after_max_seconds(self, no_redis):
+        start = time.monotonic()
+        chunks = list(ProgressService.stream('exam4', heartbeat=0.05, max_seconds=0.2))
+
+        assert 0.2 <= time.monotonic() - start < 1
+        assert chunks and all(chunk == ': keep-alive\n\n' for chunk in chunks)
+        assert 'exam4' not in ProgressService._local
+
+
+class TestStreamAccess:
+    def test_token_opens_only_its_exam(self, app):
+        with app.app_context():
+            token = ProgressService.stream_token('exam1', 'user1')
+            assert ProgressService.verify_stream_token(token, 'exam1') == 'user1'
+            with pytest.raises(AuthenticationError) as exc:
+                ProgressService.verify_stream_token(token, 'exam2')
+        assert exc.value.message == 'Stream token is for another exam'
+
+    def test_expired_or_forged_token_is_rejected(self, app, monkeypatch):
+        with app.app_context():
+            token = ProgressService.stream_token('exam1', 'user1')
+            with pytest.raises(AuthenticationError):
+                ProgressService.verify_stream_token(token + 'x', 'exam1')
+
+            monkeypatch.setitem(app.config, 'PROGRESS_STREAM_TOKEN_SECONDS', -1)
+            with pytest.raises(AuthenticationError) as exc:
+                ProgressService.verify_stream_token(token, 'exam1')
+        assert exc.value.message == 'Stream token has expired'
+
+    def test_open_streams_are_capped_per_process(self, app, monkeypatch):
+        monkeypatch.setattr(ProgressService, '_open_streams', 0)
+        monkeypatch.setitem(app.config, 'PROGRESS_MAX_STREAMS', 2)
+        with app.app_context():
+            assert [ProgressService.open_stream() for _ in range(3)] == [True, True, False]
+            ProgressService.close_stream()
+            assert ProgressService.open_stream()
+
+
+class TestRedisDelivery:
+    def test_publishes_on_exam_channel(self, monkeypatch):
+        client = _FakeRedis()
+        monkeypatch.setattr(extensions, 'redis_client', client)
+
+        ProgressService.publish('exam1', 'page_done', sheet_id='s1', page_number=2)
+
+        channel, message = client.published[0]
+        assert channel == 'progress:exam:exam1'
+        assert json.loads(message)['page_number'] == 2
+
+    def test_publish_errors_are_swallowed(self, monkeypatch):
+        class Broken:
+            def publish(self, channel, message):
+                raise ConnectionError('down')
+
+        monkeypatch.setattr(extensions, 'redis_client', Broken())
+        ProgressService.publish('exam1', 'sheet_started', sheet_id='s1')
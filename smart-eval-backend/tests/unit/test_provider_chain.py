@@ -0,0 +1,148 @@
+"""Unit tests for services/provider_chain.py — hedging, failover and latency histograms."""
+import threading
+import time
+
+import pytest
+
+from services.provider_chain import LatencyHistogram, ProviderChain
+from services.provider_limiter import ProviderLimiter
+from utils.exceptions import ValidationError
+
+
+@pytest.fixture(autouse=True)
+def fresh_histograms(monkeypatch):
+    monkeypatch.setattr(ProviderChain, '_histograms', {})
+
+
+@pytest.fixture
+def chain_app(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'LLM_PROVIDER', 'lmstudio')
+    monkeypatch.setitem(app.config, 'LLM_API_URL', 'http://localhost:1234')
+    monkeypatch.setitem(app.config, 'LLM_MODEL', 'qwen')
+    monkeypatch.setitem(app.config, 'LLM_FALLBACK_PROVIDERS', 'groqcloud')
+    monkeypatch.setitem(app.config, 'LLM_HEDGE_DELAY', 0.1)
+    return app
+
+
+class TestLatencyHistogram:
+    def test_percentile_is_bucket_upper_bound(self):
+        histogram = LatencyHistogram()
+        assert histogram.percentile(95) is None
+        for _ in range(19):
+            histogram.record(0.3)  # bucket ≤ 0.354
+        histogram.record(10)  # bucket ≤ 11.3
+
+        assert histogram.percentile(50) == pytest.approx(0.25 * 2 ** 0.5)
+        assert histogram.percentile(95) == pytest.approx(0.25 * 2 ** 0.5)
+        assert histogram.percentile(100) == pytest.approx(0.25 * 2 ** 5.5)
+
+    def test_old_samples_decay(self):
+        histogram = LatencyHistogram()
+        for _ in range(LatencyHistogram.WINDOW):
+            histogram.record(100)
+        for _ in range(LatencyHistogram.WINDOW):
+            histogram.record(1)
+
+        assert histogram.count <= LatencyHistogram.WINDOW
+        assert histogram.percentile(50) == 1.0
+
+
+class TestEntries:
+    def test_fallbacks_inherit_or_override(self, chain_app, monkeypatch):
+        monkeypatch.setitem(chain_app.config, 'LLM_FALLBACK_PROVIDERS',
+                            'groqcloud, openrouter||meta/llama, ollama|http://gpu:11434/api/chat|llama3')
+        with chain_app.app_context():
+            entries = ProviderChain.entries('llm')
+
+        assert [e['provider'] for e in entries] == ['lmstudio', 'groqcloud', 'openrouter', 'ollama']
+        assert entries[1]['model'] == chain_app.config['GROQ_LLM_MODEL']
+        assert entries[2] == {'provider': 'openrouter', 'api_url': 'https://openrouter.ai/api/v1',
+                              'model': 'meta/llama'}
+        assert entries[3]['api_url'] == 'http://gpu:11434/api/chat'
+
+
+class TestCall:
+    def test_single_provider_is_called_directly(self, app):
+        calls = []
+        with app.app_context():
+            reply = ProviderChain.call('llm', lambda entry: calls.append(entry) or 'ok')
+
+        assert reply == 'ok'
+        assert len(calls) == 1
+        assert ProviderChain.stats()[0]['count'] == 1
+
+    def test_failure_fails_over_immediately(self, chain_app):
+        def send(entry):
+            if entry['provider'] == 'lmstudio':
+                raise ValidationError('Cannot connect to LM Studio')
+            return 'from groq'
+
+        with chain_app.app_context():
+            assert ProviderChain.call('llm', send) == 'from groq'
+
+    def test_slow_request_is_hedged_and_first_answer_wins(self, chain_app):
+        release = threading.Event()
+
+        def send(entry):
+            if entry['provider'] == 'lmstudio':
+                release.wait(2)
+                return 'from lmstudio'
+            return 'from groq'
+
+        start = time.monotonic()
+        with chain_app.app_context():
+            reply = ProviderChain.call('llm', send)
+        release.set()
+
+        assert reply == 'from groq'
+        assert 0.1 <= time.monotonic() - start < 1
+
+    def test_time_queued_for_a_slot_is_not_hedged(self, chain_app, monkeypatch):
+        monkeypatch.setattr(ProviderLimiter, '_semaphores', {})
+        monkeypatch.setitem(chain_app.config, 'LLM_MAX_CONCURRENCY', 1)
+        monkeypatch.setitem(chain_app.config, 'LLM_HEDGE_DELAY', 0.5)
+        sent = []
+
+        def send(entry):
+            sent.append(entry['provider'])
+            time.sleep(0.3)
+            return f"from {entry['provider']}"
+
+        def call():
+            with chain_app.app_context():
+                replies.append(ProviderChain.call('llm', send))
+
+        replies = []
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # The last request waits ~0.9s for the slot but each send takes 0.3s
+        assert replies == ['from lmstudio'] * 4
+        assert sent == ['lmstudio'] * 4
+
+    def test_hedge_threshold_follows_latency_percentile(self, chain_app, monkeypatch):
+        monkeypatch.setitem(chain_app.config, 'PROVIDER_HEDGE_MIN_SAMPLES', 5)
+        with chain_app.app_context():
+            primary = ProviderChain.entries('llm')[0]
+            for _ in range(5):
+                ProviderChain.histogram('llm', primary).record(3.0)
+            assert ProviderChain.hedge_delay('llm', primary) == 4.0  # bucket holding 3s
+
+            monkeypatch.setitem(chain_app.config, 'PROVIDER_HEDGE_PERCENTILE', 0)
+            assert ProviderChain.hedge_delay('llm', primary) is None
+
+    def test_all_providers_failing_raises_last_error(self, chain_app):
+        def send(entry):
+            raise ValidationError(f"{entry['provider']} down")
+
+        with chain_app.app_context():
+            with pytest.raises(ValidationError) as exc:
+                ProviderChain.call('llm', send)
+        assert exc.value.message == 'groqcloud down'
+
+    def test_blank_reply_is_kept_when_nothing_better(self, chain_app):
+        with chain_app.app_context():
+            assert ProviderChain.call('llm', lambda entry: '  ') == '  '
@@ -0,0 +1,118 @@
+"""Unit tests for services/provider_rate_limiter.py and 429 handling in ProviderClient."""
+import time
+from email.utils import formatdate
+
+import pytest
+
+import app.extensions as extensions
+from services.provider_client import ProviderClient
+from services.provider_rate_limiter import (
+    ProviderRateLimiter, TokenBucket, parse_retry_after, parse_reset, exhausted_for
+)
+
+
+class TestHeaderParsing:
+    def test_retry_after_seconds_and_date(self):
+        assert parse_retry_after({'Retry-After': '3'}) == 3.0
+        in_a_minute = formatdate(time.time() + 60, usegmt=True)
+        assert 55 < parse_retry_after({'Retry-After': in_a_minute}) <= 60
+        assert parse_retry_after({}) is None
+
+    def test_reset_formats(self):
+        assert parse_reset('2m59.56s') == pytest.approx(179.56)
+        assert parse_reset('250ms') == pytest.approx(0.25)
+        assert parse_reset('7') == 7.0
+        assert 9 < parse_reset(str(int((time.time() + 10) * 1000))) <= 10
+
+    def test_exhausted_quota_pauses_until_reset(self):
+        assert exhausted_for({'x-ratelimit-remaining-requests': '0',
+                              'x-ratelimit-reset-requests': '1m0s'}) == 60.0
+        assert exhausted_for({'x-ratelimit-remaining-requests': '12',
+                              'x-ratelimit-reset-requests': '1m0s'}) is None
+        assert exhausted_for({}) is None
+
+
+class TestTokenBucket:
+    def test_unpaced_bucket_never_waits(self):
+        bucket = TokenBucket()
+        deadline = time.monotonic() + 1
+        assert [bucket.acquire(deadline) for _ in range(5)] == [False] * 5
+
+    def test_paces_to_rate(self):
+        bucket = TokenBucket(rate=20.0)  # one token every 50ms, burst of 20
+        bucket.tokens = 0.0
+        start = time.monotonic()
+        assert bucket.acquire(start + 1) is True
+        assert time.monotonic() - start >= 0.04
+
+    def test_aimd(self):
+        bucket = TokenBucket(rate=1.0, max_rate=1.5)
+        bucket.succeeded(waited=False)
+        assert bucket.rate == 1.0
+        bucket.succeeded(waited=True)
+        assert bucket.rate == pytest.approx(1.0 + 1 / 60)
+
+        bucket.throttled(retry_after=0.1)
+        assert bucket.rate == pytest.approx((1.0 + 1 / 60) / 2)
+        assert bucket.paused_until > time.monotonic()
+
+    def test_gives_up_at_deadline(self):
+        bucket = TokenBucket(rate=1.0)
+        bucket.pause(10)
+        with pytest.raises(TimeoutError):
+            bucket.acquire(time.monotonic() + 0.1)
+
+
+class _Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class _Session:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def post(self, url, **kwargs):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+class TestProviderClientRetries:
+    @pytest.fixture(autouse=True)
+    def fresh_limiter(self, monkeypatch):
+        monkeypatch.setattr(ProviderRateLimiter, '_buckets', {})
+        monkeypatch.setattr(extensions, 'redis_client', None)
+
+    def _post(self, app, monkeypatch, responses, **config):
+        session = _Session(responses)
+        monkeypatch.setattr(ProviderClient, '_session_for', staticmethod(lambda url: session))
+        for key, value in config.items():
+            monkeypatch.setitem(app.config, key, value)
+        with app.app_context():
+            resp = ProviderClient.post('https://api.example.com/v1/chat', json={'model': 'm'},
+                                       provider='groqcloud')
+        return resp, session
+
+    def test_429_is_retried_after_retry_after(self, app, monkeypatch):
+        start = time.monotonic()
+        resp, session = self._post(app, monkeypatch, [
+            _Response(429, {'Retry-After': '0.2'}),
+            _Response(200),
+        ])
+
+        assert resp.status_code == 200
+        assert session.calls == 2
+        assert time.monotonic() - start >= 0.2
+        bucket = ProviderRateLimiter._buckets[('https://api.example.com', 'm')]
+        assert bucket.rate < 30 / 60
+
+    def test_gives_back_the_429_after_retries(self, app, monkeypatch):
+        resp, session = self._post(app, monkeypatch, [
+            _Response(429, {'Retry-After': '0'}),
+            _Response(429, {'Retry-After': '0'}),
+        ], PROVIDER_RATE_LIMIT_RETRIES=1, PROVIDER_REQUESTS_PER_MINUTE={})
+
+        assert resp.status_code == 429
+        assert session.calls == 2
@@ -0,0 +1,89 @@
+"""Unit tests for the per-sheet Celery tasks in tasks/ocr_tasks.py and tasks/grading_tasks.py."""
+import pytest
+
+import models.answer_sheet
+from services.grading_run_service import GradingRunService
+from services.grading_service import GradingService
+from tasks.grading_tasks import grade_ocr_result_task, grade_sheet_task
+from tasks.ocr_tasks import process_sheet_task
+from utils.exceptions import NotFoundError
+
+
+class _Sheets:
+    """Stands in for AnswerSheet (and its .objects), recording status updates."""
+
+    def __init__(self):
+        self.updates = []
+
+    def __call__(self, **query):
+        self.query = query
+        return self
+
+    @property
+    def objects(self):
+        return self
+
+    def update(self, **fields):
+        self.updates.append((self.query, fields))
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    calls = {'sheets': _Sheets(), 'record_sheet': []}
+    monkeypatch.setattr(models.answer_sheet, 'AnswerSheet', calls['sheets'])
+    monkeypatch.setattr(GradingRunService, 'record_sheet', staticmethod(
+        lambda run_id, sheet_id, failed=False, stage='grading':
+            calls['record_sheet'].append((run_id, sheet_id, failed, stage))
+    ))
+    return calls
+
+
+def _raise_not_found(answer_sheet_id, **kwargs):
+    raise NotFoundError(f"Answer sheet {answer_sheet_id} not found")
+
+
+class TestSheetTasksNeverRaise:
+    def test_ocr_error_is_a_failed_sheet_of_the_run(self, recorded, monkeypatch):
+        monkeypatch.setattr(GradingService, 'process_answer_sheet', staticmethod(_raise_not_found))
+
+        result = process_sheet_task.run('s1', 'run1')
+
+        assert result == {'answer_sheet_id': 's1', 'status': 'failed',
+                          'error': 'Answer sheet s1 not found'}
+        assert recorded['record_sheet'] == [('run1', 's1', True, 'ocr')]
+        assert recorded['sheets'].updates == [
+            ({'id': 's1', 'status': 'processing'}, {'set__status': 'failed'})
+        ]
+
+    def test_grading_error_is_a_failed_sheet_of_the_run(self, recorded, monkeypatch):
+        monkeypatch.setattr(GradingService, 'grade_answer_sheet', staticmethod(_raise_not_found))
+
+        result = grade_sheet_task.run('s1', False, 'run1')
+
+        assert result['status'] == 'failed'
+        assert recorded['record_sheet'] == [('run1', 's1', True, 'grading')]
+
+
+class TestPipelineGradeStep:
+    def test_failed_ocr_is_not_graded(self, recorded, monkeypatch):
+        graded = []
+        monkeypatch.setattr(GradingService, 'process_answer_sheet', staticmethod(_raise_not_found))
+        monkeypatch.setattr(GradingService, 'grade_answer_sheet', staticmethod(
+            lambda answer_sheet_id, **kwargs: graded.append(answer_sheet_id)
+        ))
+
+        result = grade_ocr_result_task.run(process_sheet_task.run('s1', 'run1'), False, 'run1')
+
+        assert graded == []
+        assert result['error'] == 'Answer sheet s1 not found'
+        assert recorded['record_sheet'] == [('run1', 's1', True, 'ocr')]
+
+    def test_completed_ocr_is_graded(self, monkeypatch):
+        monkeypatch.setattr(GradingService, 'grade_answer_sheet', staticmethod(
+            lambda answer_sheet_id, force=False, run_id=None: {'answer_sheet_id': answer_sheet_id,
+                                                               'status': 'graded'}
+        ))
+
+        result = grade_ocr_result_task.run({'answer_sheet_id': 's1', 'status': 'ocr_completed'})
+
+        assert result == {'answer_sheet_id': 's1', 'status': 'graded'}
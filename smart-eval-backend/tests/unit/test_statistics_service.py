@@ -0,0 +1,192 @@
+"""Unit tests for services/statistics_service.py — aggregation and running exam stats.
+
+The aggregation tests require a running MongoDB instance. They will be
+skipped automatically when MongoDB is not available.
+"""
+import pytest
+from pymongo import MongoClient
+
+import services.statistics_service as stats_module
+from services.statistics_service import StatisticsService, bucket_for
+
+
+def _mongo_available():
+    try:
+        c = MongoClient('localhost', 27017, serverSelectionTimeoutMS=2000)
+        c.admin.command('ping')
+        c.close()
+        return True
+    except Exception:
+        return False
+
+
+needs_mongo = pytest.mark.skipif(
+    not _mongo_available(),
+    reason='MongoDB not running on localhost:27017',
+)
+
+
+class _FakeEvaluations:
+    def __init__(self, rows):
+        self.rows = rows
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return iter(self.rows)
+
+
+class TestScoreSummaryShape:
+    def _patch(self, monkeypatch, rows):
+        evaluations = _FakeEvaluations(rows)
+        monkeypatch.setattr(stats_module, 'Evaluation', type('Evaluation', (), {'objects': evaluations}))
+        return evaluations
+
+    def test_no_evaluations_gives_zeroes(self, monkeypatch):
+        self._patch(monkeypatch, [])
+        summary = StatisticsService.score_summary('exam')
+        assert summary['count'] == 0
+        assert summary['mean'] == 0.0
+        assert summary['distribution'] == {'90_100': 0, '75_89': 0, '50_74': 0, '33_49': 0, 'below_33': 0}
+
+    def test_only_percentage_is_projected(self, monkeypatch):
+        evaluations = self._patch(monkeypatch, [])
+        StatisticsService.score_summary('exam', statuses=('completed',))
+        pipeline = evaluations.pipelines[0]
+        assert pipeline[0] == {'$match': {'exam_id': 'exam', 'status': {'$in': ['completed']}}}
+        assert pipeline[1] == {'$project': {'_id': 0, 'percentage': 1}}
+
+
+class _FakeExamCollection:
+    def __init__(self, stats):
+        self.stats = stats
+        self.updates = []
+
+    def find_one_and_update(self, query, update, **kwargs):
+        self.updates.append(update)
+        return {'statistics': self.stats}
+
+    def update_one(self, query, update):
+        self.updates.append(update)
+
+
+class TestRunningAggregates:
+    def test_bucket_boundaries(self):
+        assert bucket_for(100) == '90_100'
+        assert bucket_for(90) == '90_100'
+        assert bucket_for(89.99) == '75_89'
+        assert bucket_for(50) == '50_74'
+        assert bucket_for(33) == '33_49'
+        assert bucket_for(0) == 'below_33'
+
+    def test_changed_score_moves_bucket_without_recounting(self, monkeypatch):
+        collection = _FakeExamCollection({'graded': 2, 'score_sum': 140.0, 'lowest_score': 55.0, 'highest_score': 85.0})
+        monkeypatch.setattr(stats_module, 'Exam', type('Exam', (), {'_get_collection': staticmethod(lambda: collection)}))
+
+        StatisticsService.record_score('exam', old=60.0, new=80.0)
+
+        inc = collection.updates[0]['$inc']
+        assert inc == {
+            'statistics.score_sum': 20.0,
+            'statistics.score_sum_sq': 80.0 ** 2 - 60.0 ** 2,
+            'statistics.distribution.50_74': -1,
+            'statistics.distribution.75_89': 1,
+        }
+        assert collection.updates[0]['$max'] == {'statistics.highest_score': 80.0}
+        assert collection.updates[1]['$set'] == {'statistics.average_score': 70.0}
+
+    def test_unchanged_score_is_a_no_op(self, monkeypatch):
+        collection = _FakeExamCollection({})
+        monkeypatch.setattr(stats_module, 'Exam', type('Exam', (), {'_get_collection': staticmethod(lambda: collection)}))
+
+        StatisticsService.record_score('exam', old=75.0, new=75.0)
+        StatisticsService.record_score('exam')
+
+        assert collection.updates == []
+
+    def test_last_score_removed_unsets_extremes(self, monkeypatch):
+        collection = _FakeExamCollection({'graded': 0, 'score_sum': 0.0, 'lowest_score': 60.0, 'highest_score': 60.0})
+        monkeypatch.setattr(stats_module, 'Exam', type('Exam', (), {'_get_collection': staticmethod(lambda: collection)}))
+
+        StatisticsService.record_score('exam', old=60.0, new=None)
+
+        settle = collection.updates[1]
+        assert settle['$unset'] == {'statistics.lowest_score': '', 'statistics.highest_score': ''}
+        assert 'statistics.lowest_score' not in settle['$set']
+
+
+@needs_mongo
+class TestScoreSummary:
+    def test_summary_and_distribution(self, app):
+        from models.user import User
+        from models.exam import Exam
+        from models.answer_sheet import AnswerSheet, OriginalFile
+        from models.evaluation import Evaluation
+
+        with app.app_context():
+            teacher = User(email='t@test.com', password_hash='x', role='teacher').save()
+            exam = Exam(teacher_id=teacher, title='T', subject='S', max_marks=10).save()
+            for pct, status in [(95, 'completed'), (80, 'completed'), (60, 'overridden'),
+                                (40, 'completed'), (10, 'completed'), (100, 'failed')]:
+                sheet = AnswerSheet(exam_id=exam, student_id=teacher,
+                                    original_file=OriginalFile(url='x.pdf')).save()
+                Evaluation(answer_sheet_id=sheet, exam_id=exam, percentage=pct, status=status).save()
+
+            summary = StatisticsService.score_summary(exam.id)
+
+        assert summary['count'] == 5
+        assert summary['mean'] == 57.0
+        assert (summary['min'], summary['max']) == (10.0, 95.0)
+        assert summary['percentiles'] == {'p25': 40.0, 'p50': 60.0, 'p75': 80.0, 'p90': 95.0}
+        assert summary['distribution'] == {'90_100': 1, '75_89': 1, '50_74': 1, '33_49': 1, 'below_33': 1}
+
+    def test_running_aggregates_match_rebuild(self, app):
+        from models.user import User
+        from models.exam import Exam
+        from models.answer_sheet import AnswerSheet, OriginalFile
+        from models.evaluation import Evaluation
+
+        with app.app_context():
+            teacher = User(email='t@test.com', password_hash='x', role='teacher').save()
+            exam = Exam(teacher_id=teacher, title='T', subject='S', max_marks=10).save()
+            evaluations = []
+            for pct in (95, 60, 20):
+                sheet = AnswerSheet(exam_id=exam, student_id=teacher,
+                                    original_file=OriginalFile(url='x.pdf')).save()
+                evaluations.append(Evaluation(answer_sheet_id=sheet, exam_id=exam,
+                                              percentage=pct, status='completed').save())
+                StatisticsService.record_score(exam.id, None, pct)
+
+            # Lower the top score: the maximum has to come back down
+            evaluations[0].percentage = 70
+            evaluations[0].status = 'overridden'
+            evaluations[0].save()
+            StatisticsService.record_score(exam.id, 95, 70)
+
+            incremental = Exam.objects(id=exam.id).first().statistics
+            StatisticsService.rebuild(exam.id)
+            rebuilt = Exam.objects(id=exam.id).first().statistics
+
+        assert incremental.graded == rebuilt.graded == 3
+        assert incremental.average_score == rebuilt.average_score == 50.0
+        assert (incremental.lowest_score, incremental.highest_score) == (20.0, 70.0)
+        assert incremental.score_sum == rebuilt.score_sum
+        assert {k: v for k, v in incremental.distribution.items() if v} == \
+            {k: v for k, v in rebuilt.distribution.items() if v}
+
+    def test_rebuild_without_scores_then_record(self, app):
+        from models.user import User
+        from models.exam import Exam
+
+        with app.app_context():
+            teacher = User(email='t@test.com', password_hash='x', role='teacher').save()
+            exam = Exam(teacher_id=teacher, title='T', subject='S', max_marks=10).save()
+            StatisticsService.rebuild(exam.id)
+
+            raw = Exam._get_collection().find_one({'_id': exam.id})['statistics']
+            assert 'lowest_score' not in raw and 'highest_score' not in raw
+
+            StatisticsService.record_score(exam.id, None, 40.0)
+            stats = Exam.objects(id=exam.id).first().statistics
+
+        assert (stats.lowest_score, stats.highest_score) == (40.0, 40.0)
@@ -3,7 +3,7 @@ Custom decorators for route protection and validation
 """
 from functools import wraps
 from flask import jsonify
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
 from models.user import User
 
 
@@ -30,9 +30,12 @@ def role_required(allowed_roles):
             # Get user ID from token
             user_id = get_jwt_identity()
             
-            # Fetch user
-            user = User.objects(id=user_id).first()
-            if not user:
+            # Confirm the token's role against the user's current role,
+            # cached briefly so most requests skip the database. A deleted
+            # user or changed role takes effect within AUTH_USER_CACHE_TTL.
+            from services.auth_service import AuthService  # services import utils
+            role = AuthService.cached_role(user_id)
+            if not role:
                 return jsonify({
                     'success': False,
                     'error': {
@@ -41,8 +44,19 @@ def role_required(allowed_roles):
                     }
                 }), 401
             
+            # Tokens issued before a role change are rejected
+            claimed_role = get_jwt().get('role')
+            if claimed_role and claimed_role != role:
+                return jsonify({
+                    'success': False,
+                    'error': {
+                        'code': 'UNAUTHORIZED',
+                        'message': 'Token is no longer valid, please log in again'
+                    }
+                }), 401
+            
             # Check role
-            if user.role not in allowed_roles:
+            if role not in allowed_roles:
                 return jsonify({
                     'success': False,
                     'error': {
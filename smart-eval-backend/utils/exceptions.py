@@ -46,4 +46,9 @@ class ConflictError(SmartEvalException):
 
 class ForbiddenError(SmartEvalException):
     def __init__(self, message="Access forbidden"):
-        super().__init__(message, 403)
\ No newline at end of file
+        super().__init__(message, 403)
+
+
+class RunCancelled(SmartEvalException):
+    """Raised between provider calls once a grading run has been cancelled"""
+    status_code = 409
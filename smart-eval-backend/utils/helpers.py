@@ -1,10 +1,12 @@
 """
 Utility helper functions
 """
+import base64
 import re
 from datetime import datetime
 
-
+from bson import DBRef, ObjectId
+from mongoengine.queryset.visitor import Q
 
 
 def validate_email(email):
@@ -67,6 +69,116 @@ def format_datetime(dt):
     return dt.isoformat() + 'Z'
 
 
+def ref_id(document, field):
+    """
+    ObjectId stored in a document's ReferenceField, without dereferencing it.
+
+    ``document.field.id`` fetches the referenced document first; this reads
+    the raw value instead, so ownership checks and listings stay at one query.
+
+    Args:
+        document: mongoengine Document instance
+        field: ReferenceField name, e.g. 'exam_id'
+
+    Returns:
+        ObjectId or None
+    """
+    value = document._data.get(field)
+    if value is None:
+        return None
+    if isinstance(value, DBRef):
+        return value.id
+    # Already dereferenced (or assigned) document
+    return getattr(value, 'pk', value)
+
+
+def encode_cursor(created_at, doc_id):
+    """
+    Opaque pagination cursor for a (created_at, _id) position.
+
+    Args:
+        created_at: datetime of the last item on the page
+        doc_id: ObjectId of the last item on the page
+
+    Returns:
+        URL-safe string
+    """
+    raw = f"{created_at.isoformat()}|{doc_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Inverse of encode_cursor.
+
+    Returns:
+        Tuple (created_at, ObjectId)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, doc_id = base64.urlsafe_b64decode(padded).decode('utf-8').split('|')
+        return datetime.fromisoformat(created_at), ObjectId(doc_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+def paginate_newest_first(queryset, cursor=None, limit=50):
+    """
+    Keyset pagination over a queryset, newest first.
+
+    Orders by (created_at, _id) descending and resumes strictly after the
+    cursor position, so each page is an index range scan no matter how deep
+    it is (unlike skip/offset).
+
+    Args:
+        queryset: mongoengine QuerySet (filters already applied)
+        cursor: Cursor from the previous page, or None for the first page
+        limit: Page size
+
+    Returns:
+        Tuple (documents, next_cursor) — next_cursor is None on the last page
+    """
+    if cursor:
+        created_at, doc_id = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=doc_id)
+        )
+
+    documents = list(queryset.order_by('-created_at', '-id').limit(limit + 1))
+    if len(documents) <= limit:
+        return documents, None
+
+    documents = documents[:limit]
+    last = documents[-1]
+    return documents, encode_cursor(last.created_at, last.pk)
+
+
+def parse_fields(raw, allowed):
+    """
+    Parse a comma-separated ``fields=`` query parameter.
+
+    Args:
+        raw: Parameter value, e.g. "status,score"
+        allowed: Collection of selectable field names
+
+    Returns:
+        List of field names, or None when no fields were requested
+
+    Raises:
+        ValueError: If an unknown field is requested
+    """
+    if not raw:
+        return None
+    fields = [f.strip() for f in raw.split(',') if f.strip()]
+    unknown = sorted(set(fields) - set(allowed))
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return fields
+
+
 def success_response(data=None, message=None, meta=None):
     """
     Create standardized success response